@@ -0,0 +1,51 @@
+"""
+Overhead of the instrumentation of the DLL calls on the read path.
+
+Usage::
+
+    python benchmarks/bench_instrumentation.py
+"""
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+NUMBER = 20000
+REPEAT = 7
+
+
+def benchmark(ev):
+    """
+    Returns the best time of a read of the pressure (in seconds).
+    """
+    times = timeit.repeat(lambda: ev.pressure_Pa, number=NUMBER, repeat=REPEAT)
+    return min(times) / NUMBER
+
+
+def main():
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        baseline = benchmark(ev)
+        ev.start_instrumentation()
+        enabled = benchmark(ev)
+        ev.stop_instrumentation()
+        disabled = benchmark(ev)
+
+    print("never enabled: %8.3f us" % (baseline * 1e6))
+    print(
+        "enabled:       %8.3f us (%+.1f%%)"
+        % (enabled * 1e6, (enabled / baseline - 1) * 100)
+    )
+    print(
+        "disabled:      %8.3f us (%+.1f%%)"
+        % (disabled * 1e6, (disabled / baseline - 1) * 100)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+""""""
+
+# Standard library modules.
+import math
+
+# Third party modules.
+
+# Local modules.
+
+# Globals and constants variables.
+
+
+def percentile(values, q):
+    """
+    Returns the *q* percentile (0-100) of sorted *values* (nearest rank), or
+    NaN if there is no value.
+    """
+    if not values:
+        return float("nan")
+    index = max(int(math.ceil(q / 100.0 * len(values))) - 1, 0)
+    return values[index]
@@ -0,0 +1,303 @@
+"""
+:mod:`asyncio` interface to the Evactron device.
+
+All calls to the device are executed on a single worker thread per
+interface, never on the event loop. The thread is stopped when the interface
+is closed.
+"""
+
+# Standard library modules.
+import asyncio
+import functools
+import collections
+import concurrent.futures
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.waiting import in_states, faults_cleared, IDLE_STATES
+
+# Globals and constants variables.
+DROP_OLDEST = "drop-oldest"
+LATEST_ONLY = "latest-only"
+
+
+class AsyncEvactronInterface(object):
+    def __init__(self, comm_port, dll=None):
+        """
+        Creates the :mod:`asyncio` interface to the Evactron device.
+        The arguments are the same as :class:`EvactronInterface`.
+
+        The interface is used as an asynchronous context manager, which
+        closes it on exit::
+
+            >>> async with AsyncEvactronInterface(comm_port) as ev:
+            ...     pressure = await ev.read("pressure_Pa")
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="evactron-%s" % comm_port
+        )
+        self._interface = EvactronInterface(comm_port, dll, self._executor)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.disconnect()
+        finally:
+            self.close()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
+
+    @property
+    def interface(self):
+        """
+        Underlying :class:`EvactronInterface`.
+        It should not be used directly while the asynchronous interface is
+        in use.
+        """
+        return self._interface
+
+    # - Action methods
+
+    async def connect(self):
+        """
+        Connects to the device.
+        """
+        await self._run(self._interface.connect)
+
+    async def disconnect(self):
+        """
+        Disconnects from the device. The interface can be connected again.
+        """
+        await self._run(self._interface.disconnect)
+
+    def close(self):
+        """
+        Stops the worker thread. The interface cannot be used afterwards.
+        """
+        self._executor.shutdown(wait=False)
+
+    async def is_connected(self):
+        """
+        Returns whether the interface is connected to the device.
+        """
+        return await self._run(self._interface.is_connected)
+
+    async def enable(self, enable=True):
+        """
+        Enables the device.
+        """
+        await self._run(self._interface.enable, enable)
+
+    async def disable(self):
+        """
+        Disables the device.
+        """
+        await self.enable(False)
+
+    async def clear_faults(self):
+        """
+        Clears the faults (equivalent to ``del ev.faults``).
+        """
+        await self._run(delattr, self._interface, "faults")
+
+    # - Properties
+
+    async def read(self, name):
+        """
+        Returns the value of a property of :class:`EvactronInterface`,
+        e.g. ``await ev.read("pressure_Pa")``.
+        """
+        return await self._run(getattr, self._interface, name)
+
+    async def write(self, name, value):
+        """
+        Sets the value of a property of :class:`EvactronInterface`,
+        e.g. ``await ev.write("cycles", 2)``.
+        """
+        await self._run(setattr, self._interface, name, value)
+
+    async def snapshot(self):
+        """
+        Returns a :class:`Snapshot <pyevactron.interface.Snapshot>` of the
+        device.
+        """
+        return await self._run(self._interface.snapshot)
+
+    async def _wait(self, predicate, timeout, faults=False):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(snapshot):
+            if not future.done():
+                future.set_result(snapshot)
+
+        def fail(exception):
+            if not future.done():
+                future.set_exception(exception)
+
+        def callback(snapshot):
+            loop.call_soon_threadsafe(resolve, snapshot)
+
+        def errback(exception):
+            loop.call_soon_threadsafe(fail, exception)
+
+        monitor = self._interface._get_monitor()
+        waiter = monitor.add_waiter(predicate, callback, faults, errback)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            monitor.remove_waiter(waiter)
+
+    async def wait_for_state(self, states, timeout=None):
+        """
+        Waits until the device is in one of the *states* and returns the
+        snapshot of the device in that state.
+        See :meth:`EvactronInterface.wait_for_state`.
+        """
+        return await self._wait(in_states(states), timeout)
+
+    async def wait_until_idle(self, timeout=None):
+        """
+        Waits until the device is back to the ready state.
+        """
+        return await self.wait_for_state(IDLE_STATES, timeout)
+
+    async def wait_for_fault_clear(self, timeout=None):
+        """
+        Waits until the device has neither dynamic nor latched fault.
+        """
+        return await self._wait(faults_cleared, timeout, faults=True)
+
+    async def start_now(self, start_timeout=30.0):
+        """
+        Starts a cleaning run and returns an awaitable resolved with the
+        :class:`RunSummary <pyevactron.run.RunSummary>` of the run::
+
+            >>> run = await ev.start_now()
+            >>> summary = await run
+
+        See :meth:`EvactronInterface.start_now`.
+        """
+        run = await self._run(self._interface.start_now, start_timeout)
+        return asyncio.wrap_future(run)
+
+    def stream(self, interval, maxsize=16, policy=DROP_OLDEST):
+        """
+        Returns a :class:`TelemetryStream` of snapshots taken every
+        *interval* seconds::
+
+            >>> async with ev.stream(0.5) as stream:
+            ...     async for snapshot in stream:
+            ...         print(snapshot.pressure_Pa)
+
+        :arg maxsize: maximum number of snapshots waiting to be consumed
+        :arg policy: what to do when the consumer is slower than the stream,
+            either :data:`DROP_OLDEST` (keep the *maxsize* most recent
+            snapshots) or :data:`LATEST_ONLY` (only keep the most recent one)
+        """
+        return TelemetryStream(self, interval, maxsize, policy)
+
+
+class TelemetryStream(object):
+    def __init__(self, interface, interval, maxsize=16, policy=DROP_OLDEST):
+        """
+        Asynchronous iterator over the snapshots of an
+        :class:`AsyncEvactronInterface`.
+        Snapshots are taken at a fixed rate, independently of the consumer.
+        """
+        if policy == LATEST_ONLY:
+            maxsize = 1
+        elif policy != DROP_OLDEST:
+            raise ValueError("Unknown policy: %s" % policy)
+
+        self._interface = interface
+        self._interval = interval
+        self._queue = collections.deque(maxlen=maxsize)
+        self._event = asyncio.Event()
+        self._exception = None
+        self._task = None
+        self._dropped = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __aiter__(self):
+        self.start()
+        return self
+
+    async def __anext__(self):
+        while not self._queue:
+            if self._exception is not None:
+                raise self._exception
+            if self._task is None or self._task.done():
+                raise StopAsyncIteration
+
+            self._event.clear()
+            await self._event.wait()
+
+        return self._queue.popleft()
+
+    async def _produce(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        try:
+            while True:
+                snapshot = await self._interface.snapshot()
+                if len(self._queue) == self._queue.maxlen:
+                    self._dropped += 1
+                self._queue.append(snapshot)
+                self._event.set()
+
+                deadline += self._interval
+                now = loop.time()
+                if deadline < now:  # skip missed ticks
+                    deadline += (now - deadline) // self._interval * self._interval
+                    deadline += self._interval
+                await asyncio.sleep(deadline - now)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            self._exception = ex
+        finally:
+            self._event.set()
+
+    def start(self):
+        """
+        Starts taking snapshots.
+        Called automatically when the stream is iterated.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._produce())
+
+    async def close(self):
+        """
+        Stops taking snapshots.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    @property
+    def dropped(self):
+        """
+        Number of snapshots discarded because the consumer was too slow.
+        """
+        return self._dropped
@@ -0,0 +1,426 @@
+"""
+Vectorised metrics of the cleaning runs in recorded telemetry.
+
+The series, e.g. the columns of a :class:`TelemetryLogReader
+<pyevactron.telemetrylog.TelemetryLogReader>` or a :class:`TelemetryBuffer
+<pyevactron.ringbuffer.TelemetryBuffer>`, are segmented in runs by their
+state codes: a run is a sequence of snapshots in the active states
+(stabilising pressure, waiting for ignition, cleaning, purging and pumping
+down).
+The metrics of all the runs are then computed with NumPy, without a loop over
+the snapshots, in batches of runs so that the memory used does not depend on
+the length of the series.
+
+As for :class:`Run <pyevactron.run.Run>`, the time between two snapshots is
+attributed to the state of the first one.
+
+The pressure of each pump-down segment can also be fitted (see
+:func:`fit_pumpdowns`) and the fits summarised over days or weeks (see
+:func:`pumpdown_trends`) to follow the leaks of the chamber and the health of
+the pump.
+"""
+
+# Standard library modules.
+import collections
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+from pyevactron.interface import (
+    StabilizingPressureState,
+    WaitForIgnitionState,
+    CleaningState,
+    PurgingState,
+    PumpDownState,
+)
+from pyevactron.ringbuffer import STATE_CODES
+from pyevactron.sampler import ACTIVE_STATES
+
+# Globals and constants variables.
+ACTIVE_CODES = np.array([STATE_CODES[id(state)] for state in ACTIVE_STATES], np.int8)
+
+_STABILIZING = STATE_CODES[id(StabilizingPressureState)]
+_WAITING = STATE_CODES[id(WaitForIgnitionState)]
+_CLEANING = STATE_CODES[id(CleaningState)]
+_PURGING = STATE_CODES[id(PurgingState)]
+_PUMPING_DOWN = STATE_CODES[id(PumpDownState)]
+
+RunMetrics = collections.namedtuple(
+    "RunMetrics",
+    [
+        "start",
+        "end",
+        "duration_s",
+        "complete",
+        "stabilisation_s",
+        "ignition_delay_s",
+        "cleaning_pressure_mean_Pa",
+        "cleaning_pressure_var_Pa2",
+        "rf_energy_J",
+        "purge_s",
+    ],
+)
+
+PumpDownFit = collections.namedtuple(
+    "PumpDownFit",
+    [
+        "start",
+        "duration_s",
+        "samples",
+        "base_pressure_Pa",
+        "amplitude_Pa",
+        "time_constant_s",
+        "leak_rate_Pa_s",
+        "rmse_Pa",
+        "r_squared",
+    ],
+)
+
+PumpDownTrend = collections.namedtuple(
+    "PumpDownTrend",
+    [
+        "start",
+        "fits",
+        "base_pressure_Pa",
+        "time_constant_s",
+        "leak_rate_Pa_s",
+        "r_squared",
+    ],
+)
+
+MIN_PUMPDOWN_SAMPLES = 5
+"""Minimum number of snapshots of a pump-down segment to be fitted."""
+
+# Time constants tried, relative to the duration of the segment, and the
+# number of refinements around the best one
+_TAU_GRID = np.logspace(-3, 1, 41)
+_REFINEMENTS = 6
+
+
+def _segments(mask):
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def segment_runs(state):
+    """
+    Returns the indexes of the first snapshot of each run and of the
+    snapshot following its last one, from the state codes.
+    """
+    return _segments(np.isin(state, ACTIVE_CODES))
+
+
+def _first_times(timestamp, state, labels, code, count):
+    """
+    Returns the time of the first snapshot in the state *code* of each run,
+    or NaN.
+    """
+    indexes = np.flatnonzero((state == code) & (labels >= 0))
+    runs, first = np.unique(labels[indexes], return_index=True)
+    times = np.full(count, np.nan)
+    times[runs] = timestamp[indexes[first]]
+    return times
+
+
+def _batch_metrics(columns, starts, stops):
+    """
+    Returns the metrics of the runs from *starts* to *stops*, as a list of
+    arrays in the order of :class:`RunMetrics`.
+    """
+    length = len(columns.timestamp)
+    count = len(starts)
+    first = starts[0]
+    last = min(stops[-1] + 1, length)
+
+    timestamp = np.asarray(columns.timestamp[first:last], np.float64)
+    state = np.asarray(columns.state[first:last])
+
+    # Label of the run of each snapshot, -1 between runs
+    marks = np.zeros(last - first + 1, np.int64)
+    marks[starts - first] += 1
+    marks[stops - first] -= 1
+    inside = np.cumsum(marks[:-1]) > 0
+    marks[:] = 0
+    marks[starts - first] = 1
+    labels = np.where(inside, np.cumsum(marks[:-1]) - 1, -1)
+
+    # Intervals between consecutive snapshots, labelled by the first one
+    dt = np.diff(timestamp)
+    interval_labels = labels[:-1]
+    interval_state = state[:-1]
+    in_run = interval_labels >= 0
+
+    purging = in_run & (interval_state == _PURGING)
+    purge = np.bincount(interval_labels[purging], dt[purging], minlength=count)
+
+    power = np.asarray(columns.forward_power_W[first:last], np.float64) - np.asarray(
+        columns.reverse_power_W[first:last], np.float64
+    )
+    energy = 0.5 * (power[:-1] + power[1:]) * dt
+    valid = in_run & np.isfinite(energy)
+    rf_energy = np.bincount(interval_labels[valid], energy[valid], minlength=count)
+
+    pressure = np.asarray(columns.pressure_Pa[first:last], np.float64)
+    cleaning = (labels >= 0) & (state == _CLEANING) & np.isfinite(pressure)
+    cleaning_labels = labels[cleaning]
+    cleaning_pressure = pressure[cleaning]
+    n = np.bincount(cleaning_labels, minlength=count).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(cleaning_labels, cleaning_pressure, minlength=count) / n
+        deviation = cleaning_pressure - mean[cleaning_labels]
+        var = np.bincount(cleaning_labels, deviation**2, minlength=count) / n
+
+    stabilizing = _first_times(timestamp, state, labels, _STABILIZING, count)
+    waiting = _first_times(timestamp, state, labels, _WAITING, count)
+    ignited = _first_times(timestamp, state, labels, _CLEANING, count)
+
+    start = timestamp[starts - first]
+    complete = (stops < length) & (starts > 0)
+    end = timestamp[np.minimum(stops, length - 1) - first]
+
+    return [
+        start,
+        end,
+        end - start,
+        complete,
+        waiting - stabilizing,
+        ignited - waiting,
+        mean,
+        var,
+        rf_energy,
+        purge,
+    ]
+
+
+def run_metrics(columns, batch_size=1000000):
+    """
+    Returns the :class:`RunMetrics` of the runs in *columns* (a
+    :class:`TelemetryColumns <pyevactron.ringbuffer.TelemetryColumns>`), as
+    arrays with one value per run:
+
+    * ``start`` and ``end``: time of the first snapshot of the run and of
+      the snapshot following it (in seconds);
+    * ``duration_s``: duration of the run;
+    * ``complete``: whether the series covers the run from start to end;
+    * ``stabilisation_s``: time from the first snapshot stabilising the
+      pressure to the first one waiting for the ignition;
+    * ``ignition_delay_s``: time from the first snapshot waiting for the
+      ignition to the first one cleaning;
+    * ``cleaning_pressure_mean_Pa`` and ``cleaning_pressure_var_Pa2``: mean
+      and variance of the pressure of the snapshots in the cleaning state;
+    * ``rf_energy_J``: RF energy delivered, the integral of the forward minus
+      the reverse power (trapezoidal rule);
+    * ``purge_s``: time spent purging.
+
+    Metrics which do not apply to a run (e.g. no ignition) are NaN.
+    Each batch reads the snapshots from its first run to its last one,
+    including those between the runs, which are ignored; the snapshots
+    before the first run and between the batches are not read.
+
+    :arg batch_size: maximum number of snapshots read at once, unless a
+        single run is longer
+    """
+    starts, stops = segment_runs(columns.state)
+
+    results = [[] for _ in RunMetrics._fields]
+    first = 0
+    while first < len(starts):
+        # Runs spanning at most batch_size snapshots, but at least one run
+        limit = starts[first] + batch_size
+        last = max(int(np.searchsorted(stops, limit, side="right")), first + 1)
+
+        metrics = _batch_metrics(columns, starts[first:last], stops[first:last])
+        for result, values in zip(results, metrics):
+            result.append(values)
+        first = last
+
+    if not starts.size:
+        return RunMetrics(
+            *[
+                np.empty(0, bool if name == "complete" else np.float64)
+                for name in RunMetrics._fields
+            ]
+        )
+    return RunMetrics(*[np.concatenate(result) for result in results])
+
+
+def _weights(t, labels):
+    """
+    Returns the weight of each sample: half of the intervals to its
+    neighbours in the same segment, so that the fit is not biased towards
+    the periods polled more often.
+    """
+    dt = np.diff(t)
+    dt[labels[1:] != labels[:-1]] = 0.0
+    return 0.5 * (np.concatenate(([0.0], dt)) + np.concatenate((dt, [0.0])))
+
+
+def _least_squares(t, p, w, labels, count, taus):
+    """
+    Fits ``p = base + amplitude * exp(-t / tau) + leak * t`` for each time
+    constant of *taus* (shape: (trials, count)), by weighted linear least
+    squares on the three other parameters.
+    Returns the parameters (shape: (trials, count, 3)) and the residual sums
+    of squares (shape: (trials, count)).
+    """
+    trials = len(taus)
+    e = np.exp(-t / taus[:, labels])
+    one = np.broadcast_to(1.0, e.shape)
+    tt = np.broadcast_to(t, e.shape)
+    basis = (one, e, tt)
+
+    offsets = (np.arange(trials) * count)[:, np.newaxis]
+    flat_labels = (labels + offsets).ravel()
+
+    def _sum(values):
+        values = np.broadcast_to(values, e.shape).ravel()
+        return np.bincount(flat_labels, values, trials * count).reshape(trials, count)
+
+    lhs = np.empty((trials, count, 3, 3))
+    rhs = np.empty((trials, count, 3))
+    for i in range(3):
+        rhs[..., i] = _sum(w * basis[i] * p)
+        for j in range(i, 3):
+            lhs[..., i, j] = lhs[..., j, i] = _sum(w * basis[i] * basis[j])
+
+    params = np.einsum("...ij,...j->...i", np.linalg.pinv(lhs), rhs)
+    rss = _sum(w * p * p) - np.einsum("...i,...i->...", params, rhs)
+    return params, np.maximum(rss, 0.0)
+
+
+def _fit_batch(timestamp, pressure, starts, stops):
+    count = len(starts)
+    lengths = stops - starts
+    labels = np.repeat(np.arange(count), lengths)
+    indexes = np.arange(len(labels)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    indexes += np.repeat(starts, lengths)
+
+    t = np.asarray(timestamp[indexes], np.float64)
+    p = np.asarray(pressure[indexes], np.float64)
+    origin = t[np.cumsum(lengths) - lengths]
+    t -= origin[labels]
+
+    valid = np.isfinite(p) & np.isfinite(t)
+    t, p, labels = t[valid], p[valid], labels[valid]
+    w = _weights(t, labels)
+
+    samples = np.bincount(labels, minlength=count)
+    duration = np.zeros(count)
+    np.maximum.at(duration, labels, t)
+    scale = np.where(duration > 0, duration, 1.0)
+
+    # Coarse grid of time constants, then finer grids around the best one
+    taus = _TAU_GRID[:, np.newaxis] * scale
+    step = np.log(_TAU_GRID[1] / _TAU_GRID[0])
+    for refinement in range(_REFINEMENTS + 1):
+        params, rss = _least_squares(t, p, w, labels, count, taus)
+        best = np.argmin(rss, axis=0)
+        tau = taus[best, np.arange(count)]
+        taus = tau * np.exp(np.linspace(-step, step, 9))[:, np.newaxis]
+        step /= 4.0
+
+    columns = np.arange(count)
+    params = params[best, columns]
+    rss = rss[best, columns]
+
+    weight = np.bincount(labels, w, count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(labels, w * p, count) / weight
+        tss = np.bincount(labels, w * (p - mean[labels]) ** 2, count)
+        rmse = np.sqrt(rss / weight)
+        r_squared = 1.0 - rss / tss
+
+    fitted = (samples >= MIN_PUMPDOWN_SAMPLES) & (weight > 0)
+    nan = np.where(fitted, 1.0, np.nan)
+    return [
+        origin,
+        duration,
+        samples,
+        params[:, 0] * nan,
+        params[:, 1] * nan,
+        tau * nan,
+        params[:, 2] * nan,
+        rmse * nan,
+        r_squared * nan,
+    ]
+
+
+def fit_pumpdowns(columns, batch_size=20000):
+    """
+    Fits the pressure of each pump-down segment of *columns* (a
+    :class:`TelemetryColumns <pyevactron.ringbuffer.TelemetryColumns>`) with
+    an exponential decay towards a base pressure plus a linear rise from a
+    leak::
+
+        p(t) = base + amplitude * exp(-t / tau) + leak * t
+
+    where *t* is the time since the first snapshot of the segment.
+    Returns a :class:`PumpDownFit` of arrays with one value per segment:
+
+    * ``start``: time of the first snapshot of the segment (in seconds);
+    * ``duration_s``: time between the first and last snapshots;
+    * ``samples``: number of snapshots with a pressure;
+    * ``base_pressure_Pa``, ``amplitude_Pa``, ``time_constant_s`` and
+      ``leak_rate_Pa_s``: fitted parameters;
+    * ``rmse_Pa`` and ``r_squared``: quality of the fit.
+
+    The actual timestamps are used, so the sampling may be irregular; each
+    snapshot is weighted by the time around it.
+    The time constant is searched from 1/1000 to 10 times the duration of
+    the segment.
+    The segments all are fitted at once, in batches of about *batch_size*
+    snapshots.
+    Segments with fewer than :data:`MIN_PUMPDOWN_SAMPLES` snapshots are NaN.
+    """
+    starts, stops = _segments(np.asarray(columns.state) == _PUMPING_DOWN)
+    if not starts.size:
+        return PumpDownFit(*[np.empty(0) for _ in PumpDownFit._fields])
+
+    results = [[] for _ in PumpDownFit._fields]
+    first = 0
+    while first < len(starts):
+        limit = starts[first] + batch_size
+        last = max(int(np.searchsorted(stops, limit, side="right")), first + 1)
+
+        fits = _fit_batch(
+            columns.timestamp,
+            columns.pressure_Pa,
+            starts[first:last],
+            stops[first:last],
+        )
+        for result, values in zip(results, fits):
+            result.append(values)
+        first = last
+
+    return PumpDownFit(*[np.concatenate(result) for result in results])
+
+
+def pumpdown_trends(fits, period=86400.0, min_r_squared=0.9):
+    """
+    Returns a :class:`PumpDownTrend` of the fits of :func:`fit_pumpdowns`,
+    with one value per *period* (in seconds, aligned on the epoch) holding
+    at least one fit: the start of the period, the number of fits and the
+    median of the base pressure, time constant, leak rate and R squared.
+    Fits with an R squared below *min_r_squared* are left out.
+    """
+    keep = np.isfinite(fits.r_squared) & (fits.r_squared >= min_r_squared)
+    periods = np.floor(fits.start[keep] / period)
+    periods, inverse, counts = np.unique(
+        periods, return_inverse=True, return_counts=True
+    )
+    order = np.argsort(inverse, kind="stable")
+    boundaries = np.cumsum(counts)[:-1]
+
+    def _medians(values):
+        groups = np.split(values[keep][order], boundaries)
+        return np.array([np.median(group) for group in groups if group.size])
+
+    return PumpDownTrend(
+        periods * period,
+        counts,
+        _medians(fits.base_pressure_Pa),
+        _medians(fits.time_constant_s),
+        _medians(fits.leak_rate_Pa_s),
+        _medians(fits.r_squared),
+    )
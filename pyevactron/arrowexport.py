@@ -0,0 +1,274 @@
+"""
+Export of the recorded telemetry to Apache Arrow and Parquet.
+
+The snapshots of a :class:`TelemetryLogReader
+<pyevactron.telemetrylog.TelemetryLogReader>` (or of a :class:`TelemetryBuffer
+<pyevactron.ringbuffer.TelemetryBuffer>`) are converted to Arrow record
+batches of a bounded number of rows, so a year of data is exported without
+loading it in memory.
+The Parquet files are partitioned by unit and by day (UTC), in the Hive
+layout read by Polars, DuckDB and pyarrow::
+
+    port=1/date=2024-05-01/part-0.parquet
+
+The units of the columns are recorded in the metadata of the fields.
+
+Requires ``pyarrow`` (``pip install pyevactron[arrow]``).
+"""
+
+# Standard library modules.
+import os
+import json
+import datetime
+
+# Third party modules.
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+# Local modules.
+from pyevactron.interface import _STATES
+from pyevactron.ringbuffer import TelemetryColumns, STATE_CODES, FAULT_CODES, UNKNOWN
+from pyevactron.telemetrylog import UNITS
+
+# Globals and constants variables.
+DEFAULT_CHUNK = 65536
+"""Default number of rows per record batch."""
+
+_SECONDS_PER_DAY = 86400
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required to export to Arrow or Parquet")
+
+
+def _field(name, type, unit=None):
+    metadata = {"unit": unit} if unit else None
+    return pa.field(name, type, metadata=metadata)
+
+
+def _states_metadata():
+    return json.dumps(dict((str(code), str(state)) for code, state in _STATES.items()))
+
+
+def telemetry_schema(port=True):
+    """
+    Returns the Arrow schema of the snapshots. The timestamps are in
+    microseconds since the epoch (UTC); the states and faults are the codes
+    of the DLL, whose names are in the metadata of the schema.
+
+    :arg port: whether to include the comm port of the unit, which is left
+        out of the partitioned Parquet files
+    """
+    _require_pyarrow()
+    fields = [_field("port", pa.int16())] if port else []
+    return pa.schema(
+        fields
+        + [
+            _field("timestamp", pa.timestamp("us", tz="UTC")),
+            _field("state", pa.int8()),
+            _field("cycle", pa.int16()),
+            _field("pressure_Pa", pa.float32(), UNITS["pressure_Pa"]),
+            _field("forward_power_W", pa.float32(), UNITS["forward_power_W"]),
+            _field("reverse_power_W", pa.float32(), UNITS["reverse_power_W"]),
+            _field(
+                "metering_valve_voltage_V",
+                pa.float32(),
+                UNITS["metering_valve_voltage_V"],
+            ),
+            _field("dynamic_fault", pa.int16()),
+            _field("latched_fault", pa.int16()),
+        ],
+        metadata={"states": _states_metadata()},
+    )
+
+
+def run_summary_schema():
+    """
+    Returns the Arrow schema of the :class:`RunSummary
+    <pyevactron.run.RunSummary>`. The time spent in each state is a map
+    keyed by state code.
+    """
+    _require_pyarrow()
+    return pa.schema(
+        [
+            _field("port", pa.int16()),
+            _field("started", pa.timestamp("us", tz="UTC")),
+            _field("finished", pa.timestamp("us", tz="UTC")),
+            _field("duration_s", pa.float64(), "s"),
+            _field("phases_s", pa.map_(pa.int8(), pa.float64()), "s"),
+            _field("cycles", pa.int16()),
+            _field("faults", pa.list_(pa.int16())),
+            _field("last_clean", pa.timestamp("s")),
+        ],
+        metadata={"states": _states_metadata()},
+    )
+
+
+def _columns_of(source):
+    if isinstance(source, TelemetryColumns):
+        return source
+    if hasattr(source, "columns"):
+        return source.columns()
+    return source.latest()
+
+
+def _batch(port, columns, start, stop):
+    """
+    Returns the record batch of the rows *start* to *stop* of *columns*,
+    without the port if *port* is ``None``.
+    """
+    timestamps = np.round(columns.timestamp[start:stop] * 1e6).astype("int64")
+    arrays = [pa.array(timestamps, pa.timestamp("us", tz="UTC"))]
+    if port is not None:
+        arrays.insert(0, pa.array(np.full(len(timestamps), port, np.int16)))
+
+    arrays += [
+        pa.array(np.asarray(column[start:stop]))
+        for column in columns[TelemetryColumns._fields.index("state") :]
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=telemetry_schema(port is not None))
+
+
+def record_batches(source, port, chunk=DEFAULT_CHUNK):
+    """
+    Yields the snapshots of *source* as Arrow record batches of at most
+    *chunk* rows (see :func:`telemetry_schema`).
+
+    :arg source: :class:`TelemetryLogReader
+        <pyevactron.telemetrylog.TelemetryLogReader>`, :class:`TelemetryBuffer
+        <pyevactron.ringbuffer.TelemetryBuffer>` or :class:`TelemetryColumns
+        <pyevactron.ringbuffer.TelemetryColumns>`
+    :arg port: comm port of the unit
+    """
+    _require_pyarrow()
+    columns = _columns_of(source)
+    for start in range(0, len(columns.timestamp), chunk):
+        yield _batch(port, columns, start, start + chunk)
+
+
+def export_parquet(source, directory, port=None, chunk=DEFAULT_CHUNK, **kwargs):
+    """
+    Writes the snapshots of *source* (see :func:`record_batches`) as Parquet
+    files partitioned by unit and day under *directory*, in bounded chunks.
+    As usual in the Hive layout, the port and date are only in the paths.
+    The timestamps are expected to be non-decreasing, so only one file is
+    open at a time.
+    Returns the paths of the files written.
+
+    :arg port: comm port of the unit (default: from the device identity of
+        a :class:`TelemetryLogReader
+        <pyevactron.telemetrylog.TelemetryLogReader>`)
+    :arg kwargs: passed to :class:`pyarrow.parquet.ParquetWriter`, e.g.
+        ``compression``
+    """
+    _require_pyarrow()
+    if port is None:
+        port = source.device["comm_port"]
+
+    columns = _columns_of(source)
+    filepaths = []
+    writer = None
+    day = None
+
+    try:
+        for start in range(0, len(columns.timestamp), chunk):
+            timestamps = columns.timestamp[start : start + chunk]
+            days = (timestamps // _SECONDS_PER_DAY).astype(np.int64)
+            boundaries = np.flatnonzero(np.diff(days)) + 1
+
+            for first, last in zip(
+                np.concatenate(([0], boundaries)),
+                np.concatenate((boundaries, [len(days)])),
+            ):
+                if days[first] != day:
+                    if writer is not None:
+                        writer.close()
+                    day = days[first]
+                    filepath = _partition_filepath(directory, port, day)
+                    writer = pq.ParquetWriter(
+                        filepath, telemetry_schema(False), **kwargs
+                    )
+                    filepaths.append(filepath)
+
+                writer.write_batch(_batch(None, columns, start + first, start + last))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return filepaths
+
+
+def _partition_filepath(directory, port, day):
+    date = datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day))
+    dirpath = os.path.join(directory, "port=%s" % port, "date=%s" % date.isoformat())
+    os.makedirs(dirpath, exist_ok=True)
+
+    index = 0
+    while os.path.exists(os.path.join(dirpath, "part-%i.parquet" % index)):
+        index += 1
+    return os.path.join(dirpath, "part-%i.parquet" % index)
+
+
+def run_summaries_table(summaries, port):
+    """
+    Returns an Arrow table of the :class:`RunSummary
+    <pyevactron.run.RunSummary>` of a unit (see :func:`run_summary_schema`).
+    """
+    _require_pyarrow()
+
+    def _timestamp(seconds):
+        return int(round(seconds * 1e6))
+
+    rows = {
+        "port": [],
+        "started": [],
+        "finished": [],
+        "duration_s": [],
+        "phases_s": [],
+        "cycles": [],
+        "faults": [],
+        "last_clean": [],
+    }
+    for summary in summaries:
+        rows["port"].append(port)
+        rows["started"].append(_timestamp(summary.started))
+        rows["finished"].append(_timestamp(summary.finished))
+        rows["duration_s"].append(summary.duration_s)
+        rows["phases_s"].append(
+            [
+                (STATE_CODES.get(id(state), UNKNOWN), seconds)
+                for state, seconds in summary.phases.items()
+            ]
+        )
+        rows["cycles"].append(summary.cycles)
+        rows["faults"].append([FAULT_CODES.get(id(f), UNKNOWN) for f in summary.faults])
+        rows["last_clean"].append(summary.last_clean)
+
+    return pa.Table.from_pydict(rows, schema=run_summary_schema())
+
+
+def export_run_summaries(summaries, directory, port, **kwargs):
+    """
+    Writes the :class:`RunSummary <pyevactron.run.RunSummary>` of a unit as a
+    Parquet file under ``directory/port=<port>``, without the port column.
+    The *directory* should not be the one of the snapshots.
+    Returns the path of the file.
+    """
+    _require_pyarrow()
+    dirpath = os.path.join(directory, "port=%s" % port)
+    os.makedirs(dirpath, exist_ok=True)
+
+    index = 0
+    while os.path.exists(os.path.join(dirpath, "runs-%i.parquet" % index)):
+        index += 1
+    filepath = os.path.join(dirpath, "runs-%i.parquet" % index)
+
+    table = run_summaries_table(summaries, port).remove_column(0)
+    pq.write_table(table, filepath, **kwargs)
+    return filepath
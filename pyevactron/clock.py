@@ -0,0 +1,133 @@
+"""
+Synchronisation of the device clock with the host clock.
+
+Setting the clock requires the unit to be disabled, so the clock is only
+written when its drift exceeds a threshold.
+"""
+
+# Standard library modules.
+import time
+import math
+import logging
+import datetime
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import ReadyState
+
+# Globals and constants variables.
+ClockOffset = collections.namedtuple(
+    "ClockOffset", ["offset_s", "uncertainty_s", "round_trip_s"]
+)
+ClockSyncResult = collections.namedtuple(
+    "ClockSyncResult", ["offset_s", "uncertainty_s", "adjusted"]
+)
+
+
+def _timestamp(dt):
+    return time.mktime(dt.timetuple()) + dt.microsecond * 1e-6
+
+
+def _read_time(ev):
+    t0 = time.time()
+    t = ev._get_time()
+    t1 = time.time()
+    return t, (t0 + t1) / 2, t1 - t0
+
+
+def measure_clock_offset(ev, timeout=2.0):
+    """
+    Measures the offset of the device clock relative to the host clock.
+
+    The device clock only reports whole seconds, so its time is read
+    repeatedly until the seconds tick over.
+    The tick is located between the midpoints of the two reads bracketing it,
+    which compensates for the round-trip time of the communication.
+    If no tick is observed within *timeout*, the offset is estimated from a
+    single read, with an uncertainty of half a second.
+
+    :arg ev: connected interface
+    :type ev: :class:`EvactronInterface <pyevactron.interface.EvactronInterface>`
+
+    :arg timeout: maximum duration to wait for a tick (in seconds)
+
+    :return: :class:`ClockOffset` with the offset (device minus host), its
+        uncertainty and the round-trip time of a read, all in seconds
+    """
+    date = ev._get_date()
+    previous, previous_mid, round_trip = _read_time(ev)
+    coarse = _timestamp(datetime.datetime.combine(date, previous)) + 0.5 - previous_mid
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        current, mid, round_trip = _read_time(ev)
+        if current != previous:
+            host = (previous_mid + mid) / 2
+            device = _timestamp(datetime.datetime.combine(date, current))
+
+            # Midnight may have passed since the date was read
+            device += 86400 * round((host + coarse - device) / 86400)
+
+            uncertainty = (mid - previous_mid + round_trip) / 2
+            return ClockOffset(device - host, uncertainty, round_trip)
+
+        previous, previous_mid = current, mid
+
+    return ClockOffset(coarse, 0.5 + round_trip / 2, round_trip)
+
+
+def synchronize_clock(ev, threshold_s=2.0, timeout=2.0):
+    """
+    Sets the device clock to the host clock if it drifted by more than
+    *threshold_s*.
+
+    The clock is only written while the unit is in :data:`ReadyState`.
+    The new time is sent so that it reaches the device on a second boundary
+    of the host clock.
+
+    :arg ev: connected interface
+    :type ev: :class:`EvactronInterface <pyevactron.interface.EvactronInterface>`
+
+    :arg threshold_s: maximum drift tolerated before the clock is set
+        (in seconds)
+
+    :arg timeout: see :func:`measure_clock_offset`
+
+    :return: :class:`ClockSyncResult` with the measured offset, its
+        uncertainty and whether the clock was set
+    """
+    offset = measure_clock_offset(ev, timeout)
+    if abs(offset.offset_s) <= threshold_s:
+        return ClockSyncResult(offset.offset_s, offset.uncertainty_s, False)
+
+    state = ev._get_status()[0]
+    if state is not ReadyState:
+        logging.info(
+            "Clock drift of %.2f s not corrected, unit is not ready (%s)",
+            offset.offset_s,
+            state,
+        )
+        return ClockSyncResult(offset.offset_s, offset.uncertainty_s, False)
+
+    ev.disable()
+    try:
+        time.sleep(0.1)  # required
+
+        latency = offset.round_trip_s / 2
+        target = math.floor(time.time() + 2 * offset.round_trip_s) + 1
+        dt = datetime.datetime.fromtimestamp(target)
+
+        delay = target - latency - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        # Time first, so that a rollover at midnight is fixed by the date
+        ev._set_time(dt)
+        ev._set_date(dt)
+    finally:
+        ev.enable()
+
+    logging.info("Device clock corrected by %.2f s", -offset.offset_s)
+    return ClockSyncResult(offset.offset_s, offset.uncertainty_s, True)
@@ -0,0 +1,1058 @@
+"""
+Daemon owning the connections to the devices, serving local clients over a
+Unix socket.
+
+Clients do not load the DLL nor connect to the device: they send requests to
+the :class:`EvactronDaemon`, which holds the connections leased from the
+handle pool.
+:class:`EvactronClient` exposes the same API as
+:class:`EvactronInterface <pyevactron.interface.EvactronInterface>`, except
+the objects living in the process of the interface (sampler, scheduler,
+supervisor, instrumentation, tracer and runs).
+
+Protocol
+--------
+
+Each message is a header (payload length, request id, comm port, opcode)
+followed by a tagged binary payload.
+Requests are pipelined: a client may send several requests before reading the
+responses, which are matched by request id and can arrive out of order.
+Snapshots are cached by the daemon for a short time, and concurrent identical
+reads are coalesced into a single call to the device.
+Waits (e.g. :meth:`wait_for_state <EvactronClient.wait_for_state>`) are
+answered from the state monitor of the device, without holding a worker, and
+last at most *max_wait* seconds.
+"""
+
+# Standard library modules.
+import os
+import time
+import heapq
+import socket
+import struct
+import logging
+import argparse
+import datetime
+import functools
+import itertools
+import threading
+import concurrent.futures
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import (
+    EvactronInterface,
+    EvactronException,
+    EvactronFault,
+    EvactronState,
+    Snapshot,
+    connect,
+    _STATES,
+    _FAULTS,
+)
+from pyevactron.waiting import IDLE_STATES, in_states, faults_cleared
+
+# Globals and constants variables.
+_HEADER = struct.Struct("<IIHB")
+
+OP_GET = 1
+OP_SET = 2
+OP_DELETE = 3
+OP_CALL = 4
+OP_SNAPSHOT = 5
+OP_RESULT = 0x80
+OP_ERROR = 0x81
+
+_STATE_CODES = dict((id(state), code) for code, state in _STATES.items())
+_FAULT_CODES = dict((id(fault), code) for code, fault in _FAULTS.items())
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+_CODE = struct.Struct("<i")
+_TIME = struct.Struct("<BBB")
+_DATETIME = struct.Struct("<HBBBBBI")
+
+_PROCESS_LOCAL = frozenset(
+    ["sampler", "scheduler", "supervisor", "instrumentation", "tracer"]
+)
+
+GETTERS = frozenset(
+    name
+    for name, value in vars(EvactronInterface).items()
+    if isinstance(value, property)
+    and not name.startswith("_")
+    and name not in _PROCESS_LOCAL
+)
+"""Properties of the interface readable through the daemon."""
+
+SETTERS = frozenset(
+    name for name in GETTERS if getattr(EvactronInterface, name).fset is not None
+)
+"""Properties of the interface writable through the daemon."""
+
+DELETERS = frozenset(
+    name for name in GETTERS if getattr(EvactronInterface, name).fdel is not None
+)
+"""Properties of the interface deletable through the daemon."""
+
+METHODS = frozenset(
+    [
+        "is_connected",
+        "enable",
+        "disable",
+        "configuration",
+        "wait_for_state",
+        "wait_until_idle",
+        "wait_for_fault_clear",
+    ]
+)
+"""Methods of the interface callable through the daemon."""
+
+
+def _wait_for_state(states, timeout=None):
+    return in_states(states), False, timeout
+
+
+def _wait_until_idle(timeout=None):
+    return in_states(IDLE_STATES), False, timeout
+
+
+def _wait_for_fault_clear(timeout=None):
+    return faults_cleared, True, timeout
+
+
+_WAITS = {
+    "wait_for_state": _wait_for_state,
+    "wait_until_idle": _wait_until_idle,
+    "wait_for_fault_clear": _wait_for_fault_clear,
+}
+"""Predicate, whether faults are required and timeout of the arguments of each
+wait method."""
+
+_IDENTITY = frozenset(["dll_version", "firmware_version", "application_version"])
+
+_EXCEPTIONS = {
+    "EvactronException": EvactronException,
+    "TimeoutError": TimeoutError,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+    "AttributeError": AttributeError,
+}
+
+# - Codec
+
+
+def _pack(value, out):
+    """
+    Appends the tagged encoding of *value* to the :class:`bytearray` *out*.
+    """
+    if value is None:
+        out += b"N"
+    elif isinstance(value, bool):
+        out += b"T" if value else b"F"
+    elif isinstance(value, int):
+        out += b"i" + _INT.pack(value)
+    elif isinstance(value, float):
+        out += b"d" + _FLOAT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf8")
+        out += b"s" + _LENGTH.pack(len(data)) + data
+    elif isinstance(value, datetime.datetime):
+        out += b"D" + _DATETIME.pack(
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+        )
+    elif isinstance(value, datetime.time):
+        out += b"t" + _TIME.pack(value.hour, value.minute, value.second)
+    elif isinstance(value, EvactronState):
+        out += b"S" + _CODE.pack(_STATE_CODES[id(value)])
+    elif isinstance(value, EvactronFault):
+        out += b"X" + _CODE.pack(_FAULT_CODES[id(value)])
+    elif isinstance(value, Snapshot):
+        out += b"P"
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, (tuple, list)):
+        out += b"L" + _LENGTH.pack(len(value))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        out += b"M" + _LENGTH.pack(len(value))
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError("Cannot encode %r" % (value,))
+
+
+def _unpack(data, offset=0):
+    """
+    Decodes the value at *offset* of *data* and returns it with the offset
+    of the next value.
+    """
+    tag = data[offset : offset + 1]
+    offset += 1
+
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == b"s":
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        return bytes(data[offset : offset + length]).decode("utf8"), offset + length
+    if tag == b"D":
+        fields = _DATETIME.unpack_from(data, offset)
+        return datetime.datetime(*fields), offset + _DATETIME.size
+    if tag == b"t":
+        fields = _TIME.unpack_from(data, offset)
+        return datetime.time(*fields), offset + _TIME.size
+    if tag == b"S":
+        (code,) = _CODE.unpack_from(data, offset)
+        return _STATES[code], offset + _CODE.size
+    if tag == b"X":
+        (code,) = _CODE.unpack_from(data, offset)
+        return _FAULTS[code], offset + _CODE.size
+    if tag == b"P":
+        fields = []
+        for _ in Snapshot._fields:
+            value, offset = _unpack(data, offset)
+            fields.append(value)
+        return Snapshot(*fields), offset
+    if tag == b"L":
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        items = []
+        for _ in range(length):
+            item, offset = _unpack(data, offset)
+            items.append(item)
+        return tuple(items), offset
+    if tag == b"M":
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        items = {}
+        for _ in range(length):
+            key, offset = _unpack(data, offset)
+            items[key], offset = _unpack(data, offset)
+        return items, offset
+
+    raise ValueError("Unknown tag: %r" % tag)
+
+
+def _encode(value):
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+def _decode(data):
+    return _unpack(data)[0]
+
+
+def _encode_error(exception):
+    if isinstance(exception, EvactronFault) and id(exception) in _FAULT_CODES:
+        return _encode(("EvactronFault", str(exception), exception))
+    name = type(exception).__name__
+    if name not in _EXCEPTIONS:
+        name = "EvactronException"
+    return _encode((name, str(exception), None))
+
+
+def _decode_error(data):
+    name, message, fault = _decode(data)
+    if fault is not None:
+        return fault
+    return _EXCEPTIONS.get(name, EvactronException)(message)
+
+
+def _send(sock, lock, request_id, comm_port, opcode, payload):
+    message = _HEADER.pack(len(payload), request_id, comm_port, opcode) + payload
+    with lock:
+        sock.sendall(message)
+
+
+def _receive_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _receive(sock):
+    """
+    Returns the request id, comm port, opcode and payload of the next message,
+    or ``None`` if the connection was closed.
+    """
+    header = _receive_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+
+    length, request_id, comm_port, opcode = _HEADER.unpack(header)
+    payload = _receive_exactly(sock, length) if length else b""
+    if payload is None:
+        return None
+    return request_id, comm_port, opcode, bytes(payload)
+
+
+# - Server
+
+
+class _Device(object):
+    def __init__(self, lease, max_age):
+        """
+        Connected interface with a snapshot cache and coalesced reads.
+        """
+        self.lease = lease
+        self.interface = lease.acquire()
+        self._max_age = max_age
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._snapshot = None
+        self._identity = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _coalesce(self, key, func):
+        """
+        Calls *func*, unless an identical call is in progress, in which case
+        its result is shared.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = concurrent.futures.Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            self.calls += 1
+            result = func()
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    def get(self, name):
+        if name in self._identity:
+            return self._identity[name]
+
+        value = self._coalesce(("get", name), lambda: getattr(self.interface, name))
+        if name in _IDENTITY:
+            self._identity[name] = value
+        return value
+
+    def _fresh(self, snapshot, measurements):
+        if snapshot is None:
+            return False
+        if measurements and snapshot.pressure_Pa is None:
+            return False
+        return time.time() - snapshot.timestamp <= self._max_age
+
+    def snapshot(self, measurements=True):
+        sampler = self.interface.sampler
+        if sampler is not None and self._fresh(sampler.latest, measurements):
+            return sampler.latest
+
+        snapshot = self._snapshot
+        if self._fresh(snapshot, measurements):
+            return snapshot
+
+        snapshot = self._coalesce(
+            ("snapshot", measurements), lambda: self.interface.snapshot(measurements)
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+
+class _Wait(object):
+    def __init__(self, monitor, predicate, faults, timeout):
+        """
+        Wait of a client for a condition on the device, answered from the
+        callbacks of a waiter of the state *monitor*.
+        """
+        self.monitor = monitor
+        self.timeout = timeout
+        self._predicate = predicate
+        self._faults = faults
+
+        self._lock = threading.Lock()
+        self._answered = False
+        self._answer = None
+        self._waiter = None
+
+    @property
+    def answered(self):
+        return self._answered
+
+    def _claim(self):
+        with self._lock:
+            answered, self._answered = self._answered, True
+        return not answered
+
+    def _resolve(self, snapshot):
+        if self._claim():
+            self._answer(OP_RESULT, _encode(snapshot))
+
+    def _fail(self, exception):
+        if self._claim():
+            self._answer(OP_ERROR, _encode_error(exception))
+
+    def start(self, answer):
+        """
+        Registers the waiter. *answer* is called once with the opcode and
+        payload of the response, possibly before this method returns.
+        """
+        self._answer = answer
+        self._waiter = self.monitor.add_waiter(
+            self._predicate, self._resolve, self._faults, self._fail
+        )
+
+    def cancel(self, exception):
+        """
+        Removes the waiter and fails the wait with *exception*, unless it
+        was answered already.
+        """
+        self.monitor.remove_waiter(self._waiter)
+        self._fail(exception)
+
+
+class EvactronDaemon(object):
+    def __init__(
+        self,
+        path,
+        dll_factory=None,
+        max_age=0.1,
+        max_workers=8,
+        lock_timeout=5.0,
+        max_wait=300.0,
+    ):
+        """
+        Creates the daemon listening on the Unix socket *path*.
+
+        :arg dll_factory: callable returning the library for a port
+            (see :class:`EvactronInterface
+            <pyevactron.interface.EvactronInterface>`), or ``None`` to load
+            the DLL
+        :arg max_age: maximum age of a cached snapshot returned to the clients
+            (in seconds)
+        :arg max_workers: maximum number of requests executed concurrently
+        :arg lock_timeout: maximum time to wait for another process to
+            release a port (in seconds), after which the requests on that
+            port fail, or ``None`` to wait indefinitely
+        :arg max_wait: maximum duration of a wait of a client (in seconds),
+            after which it fails with a :exc:`TimeoutError`, even without
+            timeout
+        """
+        self._path = path
+        self._dll_factory = dll_factory
+        self._max_age = max_age
+        self._max_workers = max_workers
+        self._lock_timeout = lock_timeout
+        self._max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._devices = {}  # future of the device of each port
+        self._socket = None
+        self._thread = None
+        self._executor = None
+        self._connections = {}  # pending waits of each client socket
+
+        self._condition = threading.Condition()
+        self._deadlines = []  # heap of the deadlines of the waits
+        self._sequence = itertools.count()
+        self._expiry = None
+        self._closed = True
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _device(self, comm_port):
+        """
+        Returns the device of *comm_port*, connecting to it on first use.
+        The connection is made outside the lock of the daemon, so a port
+        locked by another process only delays the requests on that port;
+        concurrent requests wait for the same connection.
+        """
+        with self._lock:
+            future = self._devices.get(comm_port)
+            owner = future is None
+            if owner:
+                future = self._devices[comm_port] = concurrent.futures.Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            dll = None
+            if self._dll_factory is not None:
+                dll = self._dll_factory(comm_port)
+            lease = connect(comm_port, dll, lock_timeout=self._lock_timeout)
+            device = _Device(lease, self._max_age)
+        except BaseException as ex:
+            # Not cached, so that the next request tries again
+            with self._lock:
+                if self._devices.get(comm_port) is future:
+                    del self._devices[comm_port]
+            future.set_exception(ex)
+            raise
+
+        future.set_result(device)
+        return device
+
+    def _execute(self, comm_port, opcode, payload):
+        device = self._device(comm_port)
+
+        if opcode == OP_SNAPSHOT:
+            return device.snapshot(_decode(payload))
+
+        if opcode == OP_GET:
+            name = _decode(payload)
+            if name not in GETTERS:
+                raise AttributeError("Cannot read %s" % name)
+            return device.get(name)
+
+        if opcode == OP_SET:
+            name, value = _decode(payload)
+            if name not in SETTERS:
+                raise AttributeError("Cannot set %s" % name)
+            setattr(device.interface, name, value)
+            return None
+
+        if opcode == OP_DELETE:
+            name = _decode(payload)
+            if name not in DELETERS:
+                raise AttributeError("Cannot delete %s" % name)
+            delattr(device.interface, name)
+            return None
+
+        if opcode == OP_CALL:
+            name, args = _decode(payload)
+            if name not in METHODS:
+                raise AttributeError("Cannot call %s" % name)
+            if name in _WAITS:
+                predicate, faults, timeout = _WAITS[name](*args)
+                if timeout is None or timeout > self._max_wait:
+                    timeout = self._max_wait
+                monitor = device.interface._get_monitor()
+                return _Wait(monitor, predicate, faults, timeout)
+            return getattr(device.interface, name)(*args)
+
+        raise ValueError("Unknown opcode: %s" % opcode)
+
+    def _reply(self, sock, lock, request_id, comm_port, opcode, payload):
+        try:
+            _send(sock, lock, request_id, comm_port, opcode, payload)
+        except OSError:
+            logging.debug("Client disconnected before response %s", request_id)
+
+    def _respond(self, sock, lock, request_id, comm_port, opcode, payload):
+        try:
+            result = self._execute(comm_port, opcode, payload)
+        except Exception as ex:
+            opcode, payload = OP_ERROR, _encode_error(ex)
+        else:
+            if isinstance(result, _Wait):
+                self._start_wait(result, sock, lock, request_id, comm_port)
+                return
+            opcode, payload = OP_RESULT, _encode(result)
+
+        self._reply(sock, lock, request_id, comm_port, opcode, payload)
+
+    def _start_wait(self, wait, sock, lock, request_id, comm_port):
+        """
+        Registers *wait* and returns without blocking; the response is sent
+        when the condition is reached, the wait expires or the device is
+        disconnected.
+        """
+        wait.start(
+            functools.partial(
+                self._answer_wait, wait, sock, lock, request_id, comm_port
+            )
+        )
+
+        with self._lock:
+            waits = self._connections.get(sock)
+            if waits is not None and not wait.answered:
+                waits.add(wait)
+        if waits is None:  # client gone
+            wait.cancel(EvactronException("Client disconnected"))
+            return
+        if wait.answered:
+            return
+
+        with self._condition:
+            deadline = time.monotonic() + wait.timeout
+            heapq.heappush(self._deadlines, (deadline, next(self._sequence), wait))
+            self._condition.notify()
+
+    def _answer_wait(self, wait, sock, lock, request_id, comm_port, opcode, payload):
+        with self._lock:
+            waits = self._connections.get(sock)
+            if waits is not None:
+                waits.discard(wait)
+
+        # Not sent from the thread of the monitor, which a slow client would
+        # otherwise block
+        try:
+            self._executor.submit(
+                self._reply, sock, lock, request_id, comm_port, opcode, payload
+            )
+        except RuntimeError:  # closed
+            pass
+
+    def _expire_waits(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._deadlines:
+                        delay = self._deadlines[0][0] - time.monotonic()
+                        if delay <= 0.0:
+                            break
+                    else:
+                        delay = None
+                    self._condition.wait(delay)
+                if self._closed:
+                    return
+                _deadline, _sequence, wait = heapq.heappop(self._deadlines)
+
+            wait.cancel(
+                TimeoutError("Condition not reached within %s s" % wait.timeout)
+            )
+
+    def _serve_client(self, sock):
+        lock = threading.Lock()
+        try:
+            while True:
+                message = _receive(sock)
+                if message is None:
+                    break
+                self._executor.submit(self._respond, sock, lock, *message)
+        except (OSError, RuntimeError):  # closed
+            pass
+        finally:
+            with self._lock:
+                waits = self._connections.pop(sock, ())
+            for wait in waits:
+                wait.cancel(EvactronException("Client disconnected"))
+            sock.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _address = self._socket.accept()
+            except OSError:  # closed
+                return
+
+            with self._lock:
+                self._connections[sock] = set()
+            threading.Thread(
+                target=self._serve_client,
+                args=(sock,),
+                name="evactron-daemon-client",
+                daemon=True,
+            ).start()
+
+    def _remove_stale_socket(self):
+        """
+        Removes the socket file left by a daemon which did not close, and
+        raises an exception if a daemon is still listening on it.
+        """
+        if not os.path.exists(self._path):
+            return
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self._path)
+            return
+        finally:
+            sock.close()
+
+        raise EvactronException("A daemon is already listening on %s" % self._path)
+
+    def start(self):
+        """
+        Starts listening in a background thread.
+        The socket is only accessible to the current user.
+
+        :raise EvactronException: if another daemon listens on the same path
+        """
+        if self._thread is not None:
+            return
+
+        self._remove_stale_socket()
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="evactron-daemon"
+        )
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self._path)
+        os.chmod(self._path, 0o600)
+        self._socket.listen()
+
+        self._thread = threading.Thread(
+            target=self._accept, name="evactron-daemon", daemon=True
+        )
+        self._thread.start()
+
+        self._closed = False
+        self._expiry = threading.Thread(
+            target=self._expire_waits, name="evactron-daemon-expiry", daemon=True
+        )
+        self._expiry.start()
+
+    def serve_forever(self):
+        """
+        Starts the daemon and blocks until it is closed.
+        """
+        self.start()
+        self._thread.join()
+
+    def close(self):
+        """
+        Stops the daemon, closes the client connections and releases the
+        devices.
+        """
+        if self._thread is None:
+            return
+
+        self._socket.shutdown(socket.SHUT_RDWR)
+        self._socket.close()
+        self._thread.join()
+        self._thread = None
+
+        with self._lock:
+            connections = list(self._connections)
+        for sock in connections:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        with self._condition:
+            self._closed = True
+            self._deadlines = []
+            self._condition.notify_all()
+        self._expiry.join()
+        self._expiry = None
+
+        self._executor.shutdown(wait=True)
+
+        with self._lock:
+            futures, self._devices = self._devices, {}
+        for future in futures.values():
+            if future.done() and future.exception() is None:
+                future.result().lease.release()
+
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+    def statistics(self, comm_port):
+        """
+        Returns the number of reads of the device on *comm_port* actually
+        executed and the number of reads served by a concurrent identical
+        read.
+        """
+        future = self._devices.get(comm_port)
+        if future is None or not future.done() or future.exception() is not None:
+            return 0, 0
+        device = future.result()
+        return device.calls, device.coalesced
+
+
+# - Client
+
+
+class EvactronClient(object):
+    def __init__(self, path, comm_port, timeout=None):
+        """
+        Client of the :class:`EvactronDaemon` listening on *path*, with the
+        same API as :class:`EvactronInterface
+        <pyevactron.interface.EvactronInterface>` for the device on
+        *comm_port*::
+
+            >>> with EvactronClient(path, comm_port) as ev:
+            ...     print(ev.pressure_Pa)
+
+        The client can be shared between threads; their requests are
+        pipelined on a single connection.
+
+        :arg timeout: maximum time to wait for a response (in seconds), or
+            ``None``
+        """
+        self._path = path
+        self._comm_port = comm_port
+        self._timeout = timeout
+
+        self._socket = None
+        self._thread = None
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_id = 0
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+
+    def _read_responses(self, sock):
+        try:
+            while True:
+                message = _receive(sock)
+                if message is None:
+                    break
+
+                request_id, _comm_port, opcode, payload = message
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+
+                if opcode == OP_ERROR:
+                    future.set_exception(_decode_error(payload))
+                else:
+                    future.set_result(_decode(payload))
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(EvactronException("Connection to daemon lost"))
+
+    def submit(self, opcode, value):
+        """
+        Sends a request without waiting for its response and returns a
+        :class:`concurrent.futures.Future` of the result.
+        """
+        if self._socket is None:
+            raise EvactronException("Not connected to daemon")
+
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+            request_id = self._next_id
+            self._pending[request_id] = future
+
+        payload = _encode(value)
+        try:
+            _send(
+                self._socket,
+                self._send_lock,
+                request_id,
+                self._comm_port,
+                opcode,
+                payload,
+            )
+        except OSError as ex:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise EvactronException("Connection to daemon lost") from ex
+
+        return future
+
+    def _request(self, opcode, value):
+        return self.submit(opcode, value).result(self._timeout)
+
+    # - Action methods
+
+    def connect(self):
+        """
+        Connects to the daemon.
+        """
+        if self._socket is not None:
+            return
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._path)
+        except OSError as ex:
+            sock.close()
+            raise EvactronException(
+                "Cannot connect to daemon at %s" % self._path
+            ) from ex
+
+        self._socket = sock
+        self._thread = threading.Thread(
+            target=self._read_responses,
+            args=(sock,),
+            name="evactron-client",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def disconnect(self):
+        """
+        Disconnects from the daemon. The device stays connected to the
+        daemon.
+        """
+        if self._socket is None:
+            return
+
+        sock, self._socket = self._socket, None
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._thread.join()
+        self._thread = None
+        sock.close()
+
+    def _call(self, name, *args):
+        return self._request(OP_CALL, (name, args))
+
+    def is_connected(self):
+        return self._call("is_connected")
+
+    def enable(self, enable=True):
+        self._call("enable", enable)
+
+    def disable(self):
+        self._call("disable")
+
+    def configuration(self):
+        return self._call("configuration")
+
+    def snapshot(self, measurements=True):
+        """
+        Returns a :class:`Snapshot <pyevactron.interface.Snapshot>` of the
+        device, possibly cached by the daemon.
+        """
+        return self._request(OP_SNAPSHOT, measurements)
+
+    def _wait_timeout(self, timeout):
+        # The daemon does not wait longer than the client
+        if timeout is None or (self._timeout is not None and timeout > self._timeout):
+            return self._timeout
+        return timeout
+
+    def wait_for_state(self, states, timeout=None):
+        if isinstance(states, EvactronState):
+            states = (states,)
+        timeout = self._wait_timeout(timeout)
+        return self._call("wait_for_state", tuple(states), timeout)
+
+    def wait_until_idle(self, timeout=None):
+        return self._call("wait_until_idle", self._wait_timeout(timeout))
+
+    def wait_for_fault_clear(self, timeout=None):
+        return self._call("wait_for_fault_clear", self._wait_timeout(timeout))
+
+    def read(self, *names):
+        """
+        Reads several properties with pipelined requests and returns their
+        values.
+        """
+        futures = [self.submit(OP_GET, name) for name in names]
+        return tuple(future.result(self._timeout) for future in futures)
+
+
+def _client_property(name):
+    def fget(self):
+        return self._request(OP_GET, name)
+
+    def fset(self, value):
+        self._request(OP_SET, (name, value))
+
+    def fdel(self):
+        self._request(OP_DELETE, name)
+
+    return property(
+        fget,
+        fset if name in SETTERS else None,
+        fdel if name in DELETERS else None,
+        getattr(EvactronInterface, name).__doc__,
+    )
+
+
+for _name in GETTERS:
+    setattr(EvactronClient, _name, _client_property(_name))
+
+for _name in METHODS:
+    getattr(EvactronClient, _name).__doc__ = getattr(EvactronInterface, _name).__doc__
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evactron connection daemon")
+    parser.add_argument("path", help="path of the Unix socket")
+    parser.add_argument("--simulate", action="store_true", help="use simulated devices")
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=0.1,
+        help="maximum age of cached snapshots (in seconds)",
+    )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=5.0,
+        help="maximum time to wait for another process to release a port "
+        "(in seconds)",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=300.0,
+        help="maximum duration of a wait of a client (in seconds)",
+    )
+    args = parser.parse_args(argv)
+
+    dll_factory = None
+    if args.simulate:
+        from pyevactron.simulator import SimulatedDLL
+
+        def dll_factory(comm_port):
+            return SimulatedDLL()
+
+    logging.basicConfig(level=logging.INFO)
+    daemon = EvactronDaemon(
+        args.path,
+        dll_factory,
+        args.max_age,
+        lock_timeout=args.lock_timeout,
+        max_wait=args.max_wait,
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
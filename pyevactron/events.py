@@ -0,0 +1,237 @@
+"""
+Events generated from the changes in the sampled snapshots.
+
+A single :class:`ChangeDetector` compares consecutive snapshots (and
+configurations) of a :class:`Sampler <pyevactron.sampler.Sampler>` and
+dispatches typed events to the subscribers.
+Each subscriber has its own bounded queue and thread, so a slow handler never
+delays the sampling nor the other subscribers.
+"""
+
+# Standard library modules.
+import math
+import logging
+import threading
+import collections
+
+# Third party modules.
+
+# Local modules.
+
+# Globals and constants variables.
+StateChanged = collections.namedtuple(
+    "StateChanged", ["timestamp", "previous", "state"]
+)
+CycleAdvanced = collections.namedtuple(
+    "CycleAdvanced", ["timestamp", "previous", "cycle"]
+)
+FaultRaised = collections.namedtuple("FaultRaised", ["timestamp", "fault", "latched"])
+FaultCleared = collections.namedtuple("FaultCleared", ["timestamp", "fault", "latched"])
+SetpointChanged = collections.namedtuple(
+    "SetpointChanged", ["timestamp", "name", "previous", "value", "external"]
+)
+
+EVENT_TYPES = (StateChanged, CycleAdvanced, FaultRaised, FaultCleared, SetpointChanged)
+
+
+def _equal(value0, value1):
+    if isinstance(value0, float) and isinstance(value1, float):
+        return math.isclose(value0, value1, rel_tol=1e-5)
+    return value0 == value1
+
+
+class Subscription(object):
+    def __init__(self, callback, types=None, maxsize=256):
+        """
+        Queue and thread delivering events to a callback.
+        When the queue is full, the oldest event is discarded.
+        Created by :meth:`ChangeDetector.subscribe`.
+        """
+        self._callback = callback
+        self._types = tuple(types) if types is not None else EVENT_TYPES
+        self._queue = collections.deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._dropped = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="evactron-events", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, event):
+        if not isinstance(event, self._types):
+            return
+
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self._dropped += 1
+            self._queue.append(event)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+
+            try:
+                self._callback(event)
+            except Exception:
+                logging.exception("Event handler %r failed", self._callback)
+
+    def close(self, timeout=None):
+        """
+        Delivers the queued events and stops the thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def dropped(self):
+        """
+        Number of events discarded because the handler was too slow.
+        """
+        return self._dropped
+
+
+class ChangeDetector(object):
+    def __init__(self, interface=None):
+        """
+        Generates events from the changes between consecutive snapshots:
+
+        * :class:`StateChanged`, when the state of the device changes;
+        * :class:`CycleAdvanced`, when the cycle changes;
+        * :class:`FaultRaised` and :class:`FaultCleared`, when a dynamic
+          (``latched=False``) or latched (``latched=True``) fault appears or
+          disappears;
+        * :class:`SetpointChanged`, when a value of the plasma configuration
+          changes. It is ``external`` unless it matches the last value
+          written through *interface*.
+
+        The detector is a sink of a :class:`Sampler
+        <pyevactron.sampler.Sampler>`, see :meth:`attach`.
+        The first snapshot and configuration only serve as reference.
+
+        :arg interface: interface whose written values are not external
+            changes (default: the interface of the attached sampler)
+        """
+        self._interface = interface
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._configuration = None
+
+    def attach(self, sampler):
+        """
+        Registers the detector as snapshot and configuration sink of
+        *sampler*.
+        The configuration is only read if the sampler has a
+        ``configuration_interval``.
+        """
+        if self._interface is None:
+            self._interface = sampler._interface
+        sampler.add_sink(self)
+        sampler.add_configuration_sink(self.update_configuration)
+
+    def detach(self, sampler):
+        sampler.remove_sink(self)
+        sampler.remove_configuration_sink(self.update_configuration)
+
+    def subscribe(self, callback, types=None, maxsize=256):
+        """
+        Subscribes *callback* to the events of *types* (default: all) and
+        returns the :class:`Subscription`.
+        """
+        subscription = Subscription(callback, types, maxsize)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = [
+                s for s in self._subscriptions if s is not subscription
+            ]
+        subscription.close()
+
+    def close(self):
+        """
+        Unsubscribes all subscribers.
+        """
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
+
+    def publish(self, event):
+        """
+        Dispatches *event* to the subscribers, without blocking.
+        """
+        for subscription in self._subscriptions:
+            subscription._put(event)
+
+    def _compare_fault(self, timestamp, previous, fault, latched):
+        if previous is fault:
+            return
+        if previous is not None:
+            self.publish(FaultCleared(timestamp, previous, latched))
+        if fault is not None:
+            self.publish(FaultRaised(timestamp, fault, latched))
+
+    def __call__(self, snapshot):
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return
+
+        timestamp = snapshot.timestamp
+        if snapshot.state != previous.state:
+            self.publish(StateChanged(timestamp, previous.state, snapshot.state))
+
+        if snapshot.cycle != previous.cycle:
+            self.publish(CycleAdvanced(timestamp, previous.cycle, snapshot.cycle))
+
+        # Faults are not read in all states
+        if snapshot.pressure_Pa is None:
+            self._snapshot = previous._replace(
+                timestamp=timestamp, state=snapshot.state, cycle=snapshot.cycle
+            )
+            return
+
+        if previous.pressure_Pa is not None:
+            self._compare_fault(
+                timestamp, previous.dynamic_fault, snapshot.dynamic_fault, False
+            )
+            self._compare_fault(
+                timestamp, previous.latched_fault, snapshot.latched_fault, True
+            )
+
+    def update_configuration(self, configuration, timestamp=None):
+        """
+        Compares *configuration* with the previous one.
+        Called by the sampler.
+        """
+        previous, self._configuration = self._configuration, dict(configuration)
+        if previous is None:
+            return
+
+        if timestamp is None:
+            timestamp = self._snapshot.timestamp if self._snapshot else None
+
+        written = {}
+        if self._interface is not None:
+            written = self._interface._written_configuration
+
+        for name, value in configuration.items():
+            if name not in previous or _equal(previous[name], value):
+                continue
+
+            external = name not in written or not _equal(written[name], value)
+            self.publish(
+                SetpointChanged(timestamp, name, previous[name], value, external)
+            )
@@ -0,0 +1,241 @@
+"""
+Management of several Evactron devices in parallel.
+"""
+
+# Standard library modules.
+import time
+import logging
+import collections
+import concurrent.futures
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, EvactronException
+
+# Globals and constants variables.
+FleetSnapshot = collections.namedtuple(
+    "FleetSnapshot", ["timestamp", "snapshots", "errors"]
+)
+
+
+class EvactronFleet(object):
+    def __init__(self, comm_ports, dll_factory=None, max_workers=None, timeout=5.0):
+        """
+        Creates the interfaces to several Evactron devices, which are
+        connected and polled in parallel.
+
+        A slow or failed unit does not delay the others: its error is
+        reported in the :class:`FleetSnapshot` and it is skipped until its
+        pending call returns.
+
+        :arg comm_ports: numbers of the ports to connect to the devices
+        :arg dll_factory: callable returning the library for a port
+            (see :class:`EvactronInterface`), or ``None`` to load the DLL
+        :arg max_workers: maximum number of units polled simultaneously
+            (default: number of units)
+        :arg timeout: maximum duration to wait for each unit when connecting,
+            polling and disconnecting, from the start of its call (in seconds)
+        """
+        self._interfaces = collections.OrderedDict()
+        for comm_port in comm_ports:
+            dll = dll_factory(comm_port) if dll_factory is not None else None
+            self._interfaces[comm_port] = EvactronInterface(comm_port, dll)
+
+        self._max_workers = max_workers or max(len(self._interfaces), 1)
+        self._timeout = timeout
+        self._executor = None
+        self._connected = set()
+        self._connecting = {}
+        self._pending = {}
+        self._started = {}  # start time of the pending call of each unit
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+
+    def _submit(self, comm_port, func):
+        def call():
+            self._started[comm_port] = time.monotonic()
+            return func()
+
+        self._started.pop(comm_port, None)
+        future = self._executor.submit(call)
+        self._pending[comm_port] = future
+        return future
+
+    def _is_busy(self, comm_port):
+        future = self._pending.get(comm_port)
+        return future is not None and not future.done()
+
+    def _update_connected(self):
+        """
+        Registers the units whose connection completed after the timeout.
+        """
+        for comm_port, future in list(self._connecting.items()):
+            if not future.done():
+                continue
+            if future.exception() is None:
+                self._connected.add(comm_port)
+            del self._connecting[comm_port]
+
+    def _gather(self, futures, timeout):
+        """
+        Waits for the futures (keyed by port) and returns the results and
+        errors.
+        Each unit is given *timeout* seconds from the start of its call, so
+        that the units queued behind slower ones are not timed out before
+        they start; a unit which does not start within *timeout* seconds is
+        timed out.
+        """
+        start = time.monotonic()
+        pending = dict(futures)
+        results = {}
+        errors = {}
+
+        while pending:
+            now = time.monotonic()
+            deadlines = []
+            for comm_port, future in list(pending.items()):
+                deadline = self._started.get(comm_port, start) + timeout
+                if future.done():
+                    if future.exception() is not None:
+                        errors[comm_port] = future.exception()
+                    else:
+                        results[comm_port] = future.result()
+                elif now >= deadline:
+                    errors[comm_port] = concurrent.futures.TimeoutError(
+                        "Unit on port %s did not respond within %.1f s"
+                        % (comm_port, timeout)
+                    )
+                else:
+                    deadlines.append(deadline)
+                    continue
+                del pending[comm_port]
+
+            if pending:
+                concurrent.futures.wait(
+                    pending.values(),
+                    min(deadlines) - now,
+                    concurrent.futures.FIRST_COMPLETED,
+                )
+
+        return results, errors
+
+    def connect(self):
+        """
+        Connects to all the devices concurrently.
+        Returns a :class:`dict` of the errors of the units which could not be
+        connected, keyed by port.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="evactron-fleet",
+            )
+
+        self._update_connected()
+
+        futures = {}
+        for comm_port, interface in self._interfaces.items():
+            if comm_port in self._connected or self._is_busy(comm_port):
+                continue
+            futures[comm_port] = self._submit(comm_port, interface.connect)
+        self._connecting.update(futures)
+
+        _results, errors = self._gather(futures, self._timeout)
+        self._update_connected()
+
+        for comm_port, error in errors.items():
+            logging.warning("Cannot connect to unit on port %s: %s", comm_port, error)
+
+        return errors
+
+    def disconnect(self):
+        """
+        Disconnects from all the devices.
+        The pending connections and polls are waited for, at most for the
+        timeout, so that the units connected meanwhile are disconnected too;
+        the units still busy afterwards are left as they are.
+        """
+        if self._executor is None:
+            return
+
+        busy = [f for f in self._pending.values() if not f.done()]
+        concurrent.futures.wait(busy, self._timeout)
+        self._update_connected()
+
+        futures = {}
+        for comm_port in self._interfaces:
+            if self._is_busy(comm_port):
+                logging.warning(
+                    "Unit on port %s is still busy, not disconnected", comm_port
+                )
+                continue
+            if comm_port not in self._connected:
+                continue
+            futures[comm_port] = self._submit(
+                comm_port, self._interfaces[comm_port].disconnect
+            )
+            self._connected.discard(comm_port)
+
+        _results, errors = self._gather(futures, self._timeout)
+        for comm_port, error in errors.items():
+            logging.warning(
+                "Cannot disconnect from unit on port %s: %s", comm_port, error
+            )
+
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def poll(self):
+        """
+        Takes a snapshot of all connected devices in parallel.
+
+        :return: :class:`FleetSnapshot` with the timestamp of the poll, the
+            :class:`Snapshot <pyevactron.interface.Snapshot>` of each unit
+            and the errors of the units which failed or timed out, both keyed
+            by port
+        """
+        if self._executor is None:
+            raise EvactronException("Fleet is not connected")
+
+        self._update_connected()
+
+        timestamp = time.time()
+        futures = {}
+        errors = {}
+        for comm_port, interface in self._interfaces.items():
+            if comm_port not in self._connected:
+                errors[comm_port] = EvactronException(
+                    "Unit on port %s is not connected" % comm_port
+                )
+            elif self._is_busy(comm_port):
+                errors[comm_port] = EvactronException(
+                    "Unit on port %s is still busy" % comm_port
+                )
+            else:
+                futures[comm_port] = self._submit(comm_port, interface.snapshot)
+
+        snapshots, poll_errors = self._gather(futures, self._timeout)
+        errors.update(poll_errors)
+
+        return FleetSnapshot(timestamp, snapshots, errors)
+
+    @property
+    def interfaces(self):
+        """
+        :class:`dict` of the :class:`EvactronInterface` of each unit, keyed
+        by port.
+        """
+        return dict(self._interfaces)
+
+    @property
+    def connected_ports(self):
+        """
+        Ports of the units which are connected.
+        """
+        return [p for p in self._interfaces if p in self._connected]
@@ -0,0 +1,246 @@
+"""
+Read-only HTTP gateway to the telemetry of a device.
+
+The JSON endpoints are served from the latest snapshot and configuration of a
+:class:`Sampler <pyevactron.sampler.Sampler>`, so any number of viewers cost no
+additional call to the device:
+
+* ``/snapshot``: latest snapshot;
+* ``/faults``: dynamic and latched faults of the latest snapshot;
+* ``/configuration``: latest plasma configuration.
+
+Each response has an ``ETag``; pollers sending it back in ``If-None-Match``
+get a ``304 Not Modified`` while nothing changed.
+The snapshot ETag is weak: it ignores the timestamp of the snapshot.
+"""
+
+# Standard library modules.
+import json
+import hashlib
+import logging
+import datetime
+import threading
+import http.server
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronState, EvactronFault
+
+# Globals and constants variables.
+
+
+def _jsonable(value):
+    if isinstance(value, (EvactronState, EvactronFault)):
+        return str(value)
+    if isinstance(value, (datetime.time, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _snapshot_document(snapshot):
+    return dict((name, _jsonable(value)) for name, value in snapshot._asdict().items())
+
+
+def _faults_document(snapshot):
+    return {
+        "dynamic_fault": _jsonable(snapshot.dynamic_fault),
+        "latched_fault": _jsonable(snapshot.latched_fault),
+    }
+
+
+def _configuration_document(configuration):
+    return dict((name, _jsonable(value)) for name, value in configuration.items())
+
+
+class _Resource(object):
+    def __init__(self, render, weak=False):
+        """
+        JSON representation of a source object, rendered again only when the
+        source object changes.
+        """
+        self._render = render
+        self._weak = weak
+        self._lock = threading.Lock()
+        self._source = None
+        self._body = None
+        self._etag = None
+
+    def get(self, source):
+        """
+        Returns the body and the ETag of *source*.
+        """
+        with self._lock:
+            if source is self._source:
+                return self._body, self._etag
+
+            document = self._render(source)
+            body = json.dumps(document, sort_keys=True).encode("utf8")
+
+            if self._weak:
+                document = dict(document)
+                document.pop("timestamp", None)
+                content = json.dumps(document, sort_keys=True).encode("utf8")
+                etag = 'W/"%s"' % hashlib.sha1(content).hexdigest()[:16]
+            else:
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+
+            self._source, self._body, self._etag = source, body, etag
+            return body, etag
+
+
+def _matches(header, etag):
+    """
+    Returns whether the ``If-None-Match`` *header* matches *etag*
+    (weak comparison).
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    gateway = None
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status, body=b"", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-cache")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode("utf8"))
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/":
+            body = json.dumps(sorted(self.gateway.ENDPOINTS)).encode("utf8")
+            self._send(200, body)
+            return
+
+        if path not in self.gateway.ENDPOINTS:
+            self._error(404, "Unknown endpoint: %s" % path)
+            return
+
+        representation = self.gateway._get(path)
+        if representation is None:
+            self._error(503, "No data sampled yet")
+            return
+
+        body, etag = representation
+        if _matches(self.headers.get("If-None-Match"), etag):
+            self._send(304, etag=etag)
+        else:
+            self._send(200, body, etag)
+
+    do_HEAD = do_GET
+
+
+class TelemetryGateway(object):
+    ENDPOINTS = ("/snapshot", "/faults", "/configuration")
+
+    def __init__(self, sampler, host="127.0.0.1", port=0):
+        """
+        Creates the HTTP gateway serving the telemetry of *sampler*.
+        The configuration is only available if the sampler reads it
+        (see *configuration_interval*) or if it was read or written through
+        the interface.
+
+        :arg host: address to listen on (default: local connections only)
+        :arg port: port to listen on (default: any free port)
+        """
+        self._sampler = sampler
+        self._resources = {
+            "/snapshot": _Resource(_snapshot_document, weak=True),
+            "/faults": _Resource(_faults_document),
+            "/configuration": _Resource(_configuration_document),
+        }
+        self._configuration = None
+
+        handler = type("Handler", (_Handler,), {"gateway": self})
+        self._server = http.server.ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _latest_configuration(self):
+        configuration = self._sampler.latest_configuration
+        if configuration is None:
+            cache = self._sampler.interface.configuration(cached=True)
+            if not cache:
+                return None
+            # Only replaced when the cache of the interface changes
+            if cache != self._configuration:
+                self._configuration = cache
+            configuration = self._configuration
+        return configuration
+
+    def _get(self, path):
+        """
+        Returns the body and ETag of an endpoint, or ``None`` if no data is
+        available.
+        """
+        if path == "/configuration":
+            source = self._latest_configuration()
+        else:
+            source = self._sampler.latest
+            if path == "/faults" and source is not None:
+                if source.pressure_Pa is None:  # faults not read
+                    source = self._resources[path]._source
+
+        if source is None:
+            return None
+        return self._resources[path].get(source)
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="evactron-gateway", daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """
+        Stops serving and closes the socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    @property
+    def url(self):
+        """
+        Base URL of the gateway.
+        """
+        host, port = self._server.server_address[:2]
+        return "http://%s:%i" % (host, port)
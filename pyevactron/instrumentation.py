@@ -0,0 +1,159 @@
+"""
+Opt-in instrumentation of the calls to the library.
+
+While enabled, every ``evb*`` call goes through a proxy counting the calls and
+the errors (by return code) and recording the latency in a histogram with
+logarithmic buckets (powers of two microseconds), per function.
+When disabled, the proxy is removed from the chain of wrappers around the
+library, so the calls do not execute any instrumentation code.
+"""
+
+# Standard library modules.
+import math
+import time
+import threading
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import (
+    _DLLProxy,
+    _BYREF_STATUS_FUNCTIONS,
+    EVR_OK,
+    EVR_COMMANDIGNORED,
+)
+
+# Globals and constants variables.
+BUCKETS = 32
+"""Number of latency buckets."""
+
+BUCKET_BOUNDS = tuple(2.0**index * 1e-6 for index in range(BUCKETS - 1)) + (
+    float("inf"),
+)
+"""Upper bounds of the latency buckets (in seconds): 1 us, 2 us, 4 us, ..."""
+
+
+class _FunctionStatistics(object):
+    __slots__ = ("calls", "errors", "buckets", "total", "maximum")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = {}
+        self.buckets = [0] * BUCKETS
+        self.total = 0.0
+        self.maximum = 0.0
+
+
+class _InstrumentedDLL(_DLLProxy):
+    """
+    Records each call to the library in an :class:`Instrumentation`.
+    """
+
+    def __init__(self, dll, instrumentation):
+        super().__init__(dll)
+        self._instrumentation = instrumentation
+
+    def _wrap(self, name, func):
+        record = self._instrumentation._record
+        clock = time.perf_counter
+        check = name not in _BYREF_STATUS_FUNCTIONS
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                retval = func(*args)
+            except Exception as ex:
+                record(name, clock() - start, type(ex).__name__)
+                raise
+
+            error = None
+            if check and retval != EVR_OK and retval != EVR_COMMANDIGNORED:
+                error = retval
+            record(name, clock() - start, error)
+            return retval
+
+        return wrapper
+
+
+class Instrumentation(object):
+    def __init__(self):
+        """
+        Statistics of the calls to the library, per function.
+        Usually created with :meth:`EvactronInterface.start_instrumentation
+        <pyevactron.interface.EvactronInterface.start_instrumentation>`.
+        """
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def _record(self, name, elapsed, error):
+        index = math.frexp(elapsed * 1e6)[1] if elapsed >= 1e-6 else 0
+        if index >= BUCKETS:
+            index = BUCKETS - 1
+
+        with self._lock:
+            statistics = self._functions.get(name)
+            if statistics is None:
+                statistics = self._functions[name] = _FunctionStatistics()
+
+            statistics.calls += 1
+            statistics.buckets[index] += 1
+            statistics.total += elapsed
+            if elapsed > statistics.maximum:
+                statistics.maximum = elapsed
+            if error is not None:
+                statistics.errors[error] = statistics.errors.get(error, 0) + 1
+
+    def as_dict(self):
+        """
+        Returns a :class:`dict`, keyed by function name, of :class:`dict`
+        with:
+
+        * ``calls``: number of calls;
+        * ``errors``: number of errors, keyed by return code (or exception
+          name);
+        * ``buckets``: number of calls in each latency bucket, keyed by the
+          upper bound of the bucket (in seconds), without the empty buckets;
+        * ``total_s`` and ``max_s``: total and maximum latency (in seconds).
+        """
+        with self._lock:
+            return dict(
+                (
+                    name,
+                    {
+                        "calls": s.calls,
+                        "errors": dict(s.errors),
+                        "buckets": dict(
+                            (BUCKET_BOUNDS[index], count)
+                            for index, count in enumerate(s.buckets)
+                            if count
+                        ),
+                        "total_s": s.total,
+                        "max_s": s.maximum,
+                    },
+                )
+                for name, s in self._functions.items()
+            )
+
+    def histograms(self):
+        """
+        Returns the latency histograms, keyed by function name, as tuples of
+        the cumulative counts of the buckets (see :data:`BUCKET_BOUNDS`), the
+        number of calls and the total latency (in seconds).
+        """
+        histograms = {}
+        with self._lock:
+            for name, s in self._functions.items():
+                cumulative = []
+                total = 0
+                for count in s.buckets:
+                    total += count
+                    cumulative.append(total)
+                histograms[name] = (cumulative, s.calls, s.total)
+        return histograms
+
+    def reset(self):
+        """
+        Clears the statistics.
+        """
+        with self._lock:
+            self._functions = {}
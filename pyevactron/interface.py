@@ -3,9 +3,13 @@
 # Standard library modules.
 import os
 import sys
+import math
 import time
 import logging
 import datetime
+import threading
+import contextlib
+import collections
 import ctypes as c
 
 # Third party modules.
@@ -18,6 +22,11 @@ TORR2PA = 133.322
 EVR_OK = 0
 EVR_COMMANDIGNORED = 1403
 
+# Functions returning their status through an argument, not their return value
+_BYREF_STATUS_FUNCTIONS = frozenset(["evbConnect", "evbIsConnected"])
+
+_NO_SPAN = contextlib.nullcontext()
+
 
 class EvactronException(Exception):
     pass
@@ -101,29 +110,158 @@ _STATES = {
 
 _PRESSURE_UNITS = {0: "Torr", 1: "Pa", 2: "mbar"}
 
+CONFIGURATION_PROPERTIES = (
+    "cycles",
+    "ignite_pressure_setpoint_Pa",
+    "plasma_pressure_setpoint_Pa",
+    "plasma_power_setpoint_W",
+    "plasma_time",
+    "purge",
+    "purge_pressure_setpoint_Pa",
+    "purge_time",
+)
+
+Snapshot = collections.namedtuple(
+    "Snapshot",
+    [
+        "timestamp",
+        "state",
+        "cycle",
+        "time_remaining",
+        "pressure_Pa",
+        "forward_power_W",
+        "reverse_power_W",
+        "metering_valve_voltage_V",
+        "dynamic_fault",
+        "latched_fault",
+    ],
+)
+
 
-def connect(comm_port):
+class _DLLProxy(object):
     """
-    Connect to the device and returns the :class:`EvactronInterface`
+    Base class of the wrappers around the functions of the library.
+    Each function is wrapped on first access and cached as an attribute, so
+    the wrapping cost is paid once.
     """
-    return EvactronInterface(comm_port)
+
+    def __init__(self, dll):
+        self._dll = dll
+        self._cache_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        dll = self._dll
+        func = self._wrap(name, getattr(dll, name))
+
+        # Not cached if the library was replaced meanwhile
+        with self._cache_lock:
+            if self._dll is dll:
+                setattr(self, name, func)
+        return func
+
+    def _wrap(self, name, func):
+        raise NotImplementedError
+
+    def _set_dll(self, dll):
+        """
+        Replaces the wrapped library and discards the cached functions.
+        """
+        with self._cache_lock:
+            self._dll = dll
+            for name in [name for name in vars(self) if not name.startswith("_")]:
+                delattr(self, name)
+
+
+class _LockedDLL(_DLLProxy):
+    """
+    Serialises the calls to the library, so that a handle can be shared
+    between threads.
+    """
+
+    def __init__(self, dll, lock):
+        super().__init__(dll)
+        self._lock = lock
+
+    def _wrap(self, name, func):
+        lock = self._lock
+
+        def wrapper(*args):
+            with lock:
+                return func(*args)
+
+        return wrapper
+
+
+def connect(comm_port, dll=None, linger=0.0, lock_timeout=None):
+    """
+    Returns a :class:`Lease <pyevactron.pool.Lease>` of the connection to the
+    device from the process-wide pool.
+    Nested or concurrent leases on the same *comm_port* share one connected
+    :class:`EvactronInterface`, which is disconnected when the last lease is
+    released, or *linger* seconds later if it is not leased again::
+
+        >>> with connect(comm_port) as ev:
+        ...     print(ev.pressure_Pa)
+
+    While connected, the port is locked against other processes, which wait
+    at most *lock_timeout* seconds for it (see :mod:`pyevactron.portlock`).
+    """
+    from pyevactron.pool import POOL
+
+    return POOL.lease(comm_port, dll, linger, lock_timeout)
 
 
 class EvactronInterface(object):
-    def __init__(self, comm_port):
+
+    def __init__(self, comm_port, dll=None, executor=None):
         """
         Creates the interface to the Evactron device.
-        
+
         :arg comm_port: number of the port to connect to the device
         :type comm_port: :class:`int`
+
+        :arg dll: library exposing the ``evb*`` functions. By default, the
+            bundled EvactronComm DLL is loaded. A
+            :class:`SimulatedDLL <pyevactron.simulator.SimulatedDLL>` can be
+            given to use the interface without the device.
+
+        :arg executor: :class:`concurrent.futures.Executor` on which the
+            waiters and the runs read the device (see
+            :mod:`pyevactron.waiting`), or ``None`` to read it from their own
+            thread
         """
         self._comm_port = comm_port
+        self._executor = executor
+
+        if dll is None:
+            dirname = os.path.dirname(sys.modules[__name__].__file__)
+            path = os.path.join(dirname, "EvactronComm_VB6.dll")
+            dll = c.WinDLL(path)
+
+        self._lock = threading.RLock()
+        self._dll = _LockedDLL(dll, self._lock)
 
-        dirname = os.path.dirname(sys.modules[__name__].__file__)
-        path = os.path.join(dirname, "EvactronComm_VB6.dll")
-        self._dll = c.WinDLL(path)
+        # Held by the setters from disabling the unit to enabling it again.
+        # Separate from the lock of the calls, which a scheduler takes from
+        # its own thread
+        self._transaction_lock = threading.RLock()
 
         self._handle = None
+        self._sampler = None
+        self._scheduler = None
+        self._scheduler_dll = None
+        self._supervisor = None
+        self._supervisor_dll = None
+        self._instrumentation = None
+        self._instrumentation_dll = None
+        self._tracer = None
+        self._tracing_dll = None
+        self._monitor = None
+        self._configuration = {}
+        self._written_configuration = {}
+        self._pool = None  # pool the interface is leased from, if any
 
     def __enter__(self):
         self.connect()
@@ -145,7 +283,9 @@ class EvactronInterface(object):
         retval = c.c_int()
         handle = self._dll.evbConnect(c.c_int(self._comm_port), c.byref(retval))
         if retval.value != EVR_OK:
-            raise EvactronException, "Cannot connect to device on port %i" % self._comm_port
+            raise EvactronException(
+                "Cannot connect to device on port %i" % self._comm_port
+            )
 
         logging.debug("Connected to handle=%s" % handle)
         self._handle = c.c_long(handle)
@@ -157,17 +297,34 @@ class EvactronInterface(object):
            It is recommended to use the context manager ("with" statement) instead.
 
         Disconnects from the device.
+
+        :raise EvactronException: if the interface is leased from a
+            :class:`HandlePool <pyevactron.pool.HandlePool>`; the lease must be
+            released instead
         """
         if self._handle is None:
             return
+        self._check_leases("disconnect", 0)
+        self._disconnect()
+
+    def _disconnect(self):
+        """
+        Disconnects from the device, even if leased (used by the pool).
+        """
+        self.stop_supervisor()
+        self._stop_sampler()
+        if self._monitor is not None:
+            self._monitor.stop()
 
         retval = self._dll.evbDisconnect(self._handle)
         if retval != EVR_OK:
-            raise EvactronException, "Cannot disconnect from device"
+            raise EvactronException("Cannot disconnect from device")
 
         logging.debug("Disconnected")
         self._handle = None
 
+        self.stop_scheduler()
+
     def is_connected(self):
         """
         Returns whether the interface is connected to the device.
@@ -180,6 +337,350 @@ class EvactronInterface(object):
 
         return bool(is_connected)
 
+    def _reconnect(self):
+        """
+        Drops the current handle, if any, and connects again.
+        """
+        if self._handle is not None:
+            try:
+                self._dll.evbDisconnect(self._handle)
+            except Exception:
+                pass
+        self.connect()
+
+    def _remove_proxy(self, proxy):
+        """
+        Removes a :class:`_DLLProxy` from the chain of wrappers around the
+        library.
+        """
+        if self._dll is proxy:
+            self._dll = proxy._dll
+            return
+
+        outer = self._dll
+        while outer._dll is not proxy:
+            outer = outer._dll
+        outer._set_dll(proxy._dll)
+
+    def start_sampler(self, interval, sinks=(), **kwargs):
+        """
+        Starts a :class:`Sampler <pyevactron.sampler.Sampler>` taking a
+        snapshot of the device every *interval* seconds in a background
+        thread and returns it.
+        The snapshots are passed to the *sinks*, callables taking a
+        :class:`Snapshot` as argument.
+        Other keyword arguments (e.g. per-state *intervals*) are passed to
+        the sampler.
+        The sampler is stopped when the interface is disconnected.
+        """
+        from pyevactron.sampler import Sampler
+
+        if self._sampler is not None:
+            raise EvactronException("Sampler is already running")
+
+        sinks = list(sinks)
+        if self._monitor is not None:
+            sinks.append(self._monitor)
+
+        self._sampler = Sampler(self, interval, sinks, **kwargs)
+        self._sampler.start()
+        return self._sampler
+
+    def _check_leases(self, action, max_leases):
+        if self._pool is None:
+            return
+        leases = self._pool.references(self)
+        if leases > max_leases:
+            raise EvactronException(
+                "Cannot %s: interface is shared by %i lease(s) of the pool"
+                % (action, leases)
+            )
+
+    def stop_sampler(self):
+        """
+        Stops the sampler, if running.
+
+        :raise EvactronException: if the interface is leased from a
+            :class:`HandlePool <pyevactron.pool.HandlePool>` by other leases,
+            which may use the sampler
+        """
+        if self._sampler is None:
+            return
+        self._check_leases("stop sampler", 1)
+        self._stop_sampler()
+
+    def _stop_sampler(self):
+        if self._sampler is None:
+            return
+
+        self._sampler.stop()
+        self._sampler = None
+
+        if self._monitor is not None:
+            self._monitor.resume()
+
+    @property
+    def sampler(self):
+        """
+        Returns the running :class:`Sampler <pyevactron.sampler.Sampler>`, or
+        ``None``.
+        """
+        return self._sampler
+
+    def _get_monitor(self):
+        from pyevactron.waiting import StateMonitor
+
+        if self._monitor is None:
+            self._monitor = StateMonitor(self, executor=self._executor)
+            if self._sampler is not None:
+                self._sampler.add_sink(self._monitor)
+
+        return self._monitor
+
+    def wait_for_state(self, states, timeout=None):
+        """
+        Blocks until the device is in one of the *states* and returns the
+        :class:`Snapshot` of the device in that state.
+
+        The snapshots of the sampler are used if it is running, otherwise the
+        device is polled with an adaptive backoff.
+        Concurrent waiters share the same stream of snapshots.
+
+        :arg states: :class:`EvactronState` or sequence of them
+        :arg timeout: maximum waiting time (in seconds), or ``None``
+
+        :raise TimeoutError: if the states are not reached within *timeout*
+        """
+        from pyevactron.waiting import in_states
+
+        return self._get_monitor().wait(in_states(states), timeout)
+
+    def wait_until_idle(self, timeout=None):
+        """
+        Blocks until the device is back to the :data:`ReadyState`.
+        See :meth:`wait_for_state`.
+        """
+        from pyevactron.waiting import IDLE_STATES
+
+        return self.wait_for_state(IDLE_STATES, timeout)
+
+    def wait_for_fault_clear(self, timeout=None):
+        """
+        Blocks until the device has neither dynamic nor latched fault.
+        See :meth:`wait_for_state`.
+        """
+        from pyevactron.waiting import faults_cleared
+
+        return self._get_monitor().wait(faults_cleared, timeout, faults=True)
+
+    def start_now(self, start_timeout=30.0):
+        """
+        Starts a cleaning run and returns a :class:`Run <pyevactron.run.Run>`
+        future, without blocking.
+        The future is resolved with a :class:`RunSummary
+        <pyevactron.run.RunSummary>` when the device returns to the
+        :data:`ReadyState`, or fails with the :class:`EvactronFault` raised
+        during the run.
+
+        :arg start_timeout: maximum time for the run to start (in seconds)
+        """
+        from pyevactron.run import Run
+
+        initial_faults = self.faults
+
+        retval = self._dll.evbStartNow(self._handle)
+        if retval != EVR_OK:
+            raise EvactronException("Cannot start run")
+
+        monitor = self._get_monitor()
+        run = Run(self, initial_faults, start_timeout, self._executor)
+        monitor.add_waiter(run._update, run._finish, faults=True, errback=run._fail)
+        return run
+
+    def start_scheduler(self, maxsize=64):
+        """
+        Starts a :class:`CommandScheduler
+        <pyevactron.scheduler.CommandScheduler>` through which all calls to
+        the device are executed by priority class, and returns it.
+        Control commands (enable/disable, clearing faults) pre-empt the
+        configuration setters, which pre-empt the reads of the caller, which
+        pre-empt the reads of the sampler.
+        The scheduler is stopped when the interface is disconnected.
+
+        :arg maxsize: maximum number of pending calls per priority class
+        """
+        from pyevactron.scheduler import CommandScheduler, _ScheduledDLL
+
+        if self._scheduler is not None:
+            raise EvactronException("Scheduler is already running")
+
+        self._scheduler = CommandScheduler(maxsize)
+        self._scheduler.start()
+        self._dll = self._scheduler_dll = _ScheduledDLL(self._dll, self._scheduler)
+        return self._scheduler
+
+    def stop_scheduler(self):
+        """
+        Stops the scheduler, if running.
+        """
+        if self._scheduler is None:
+            return
+
+        self._remove_proxy(self._scheduler_dll)
+        self._scheduler.stop()
+        self._scheduler = None
+        self._scheduler_dll = None
+
+    @property
+    def scheduler(self):
+        """
+        Returns the running :class:`CommandScheduler
+        <pyevactron.scheduler.CommandScheduler>`, or ``None``.
+        """
+        return self._scheduler
+
+    def start_supervisor(self, **kwargs):
+        """
+        Starts a :class:`ConnectionSupervisor
+        <pyevactron.supervisor.ConnectionSupervisor>` and returns it.
+        The supervisor probes the device when the interface is idle and,
+        when the link is lost, reconnects with an exponential backoff and
+        restores the plasma configuration written through the interface.
+        The keyword arguments are passed to the supervisor.
+        The supervisor is stopped when the interface is disconnected.
+        """
+        from pyevactron.supervisor import ConnectionSupervisor, _SupervisedDLL
+
+        if self._supervisor is not None:
+            raise EvactronException("Supervisor is already running")
+
+        self._supervisor = ConnectionSupervisor(self, **kwargs)
+        self._supervisor_dll = _SupervisedDLL(self._dll, self._supervisor)
+        self._dll = self._supervisor_dll
+        self._supervisor.start()
+        return self._supervisor
+
+    def stop_supervisor(self):
+        """
+        Stops the supervisor, if running.
+        """
+        if self._supervisor is None:
+            return
+
+        self._supervisor.stop()
+        self._remove_proxy(self._supervisor_dll)
+        self._supervisor = None
+        self._supervisor_dll = None
+
+    @property
+    def supervisor(self):
+        """
+        Returns the running :class:`ConnectionSupervisor
+        <pyevactron.supervisor.ConnectionSupervisor>`, or ``None``.
+        """
+        return self._supervisor
+
+    def start_instrumentation(self):
+        """
+        Starts recording the number of calls, errors and latencies of the
+        calls to the DLL, per function, and returns the
+        :class:`Instrumentation <pyevactron.instrumentation.Instrumentation>`.
+        The instrumentation has no cost until it is started, nor after it is
+        stopped.
+        """
+        from pyevactron.instrumentation import Instrumentation, _InstrumentedDLL
+
+        if self._instrumentation is not None:
+            raise EvactronException("Instrumentation is already running")
+
+        self._instrumentation = Instrumentation()
+        self._instrumentation_dll = _InstrumentedDLL(self._dll, self._instrumentation)
+        self._dll = self._instrumentation_dll
+        return self._instrumentation
+
+    def stop_instrumentation(self):
+        """
+        Stops the instrumentation, if running.
+        """
+        if self._instrumentation is None:
+            return
+
+        self._remove_proxy(self._instrumentation_dll)
+        self._instrumentation = None
+        self._instrumentation_dll = None
+
+    @property
+    def instrumentation(self):
+        """
+        Returns the running :class:`Instrumentation
+        <pyevactron.instrumentation.Instrumentation>`, or ``None``.
+        """
+        return self._instrumentation
+
+    def start_tracing(self, tracer=None):
+        """
+        Starts recording spans of the calls to the DLL, of the phases of the
+        configuration setters and of the waits for the lock of the handle,
+        and returns the :class:`Tracer <pyevactron.tracing.Tracer>`.
+        A *tracer* can be given to record several interfaces in one trace.
+        The tracing has no cost until it is started, nor after it is stopped.
+        """
+        from pyevactron.tracing import Tracer, _TracedDLL, _TracedLock
+
+        if self._tracer is not None:
+            raise EvactronException("Tracing is already running")
+
+        if tracer is None:
+            tracer = Tracer()
+        tracer._register(self._comm_port, "Evactron (port %s)" % self._comm_port)
+
+        locked = self._locked_dll()
+        locked._lock = _TracedLock(self._lock, tracer, self._comm_port)
+        locked._set_dll(locked._dll)
+
+        self._tracer = tracer
+        self._tracing_dll = _TracedDLL(self._dll, tracer, self._comm_port)
+        self._dll = self._tracing_dll
+        return tracer
+
+    def stop_tracing(self):
+        """
+        Stops the tracing, if running.
+        The recorded spans remain in the tracer.
+        """
+        if self._tracer is None:
+            return
+
+        self._remove_proxy(self._tracing_dll)
+        locked = self._locked_dll()
+        locked._lock = self._lock
+        locked._set_dll(locked._dll)
+
+        self._tracer = None
+        self._tracing_dll = None
+
+    @property
+    def tracer(self):
+        """
+        Returns the :class:`Tracer <pyevactron.tracing.Tracer>` of the running
+        tracing, or ``None``.
+        """
+        return self._tracer
+
+    def _locked_dll(self):
+        dll = self._dll
+        while not isinstance(dll, _LockedDLL):
+            dll = dll._dll
+        return dll
+
+    def _span(self, name):
+        """
+        Returns a context manager recording a span if tracing.
+        """
+        if self._tracer is None:
+            return _NO_SPAN
+        return self._tracer.span(name, pid=self._comm_port)
+
     def enable(self, enable=True):
         """
         Enables the device.
@@ -259,6 +760,44 @@ class EvactronInterface(object):
 
     # - Read only
 
+    def snapshot(self, measurements=True):
+        """
+        Returns a :class:`Snapshot` of the status, measurements and faults of
+        the device.
+        The timestamp is the host time (:func:`time.time`) at which the
+        reading started.
+
+        :arg measurements: whether to read the measurements and faults.
+            If ``False``, only the status is read and the other fields are
+            ``None``.
+        """
+        timestamp = time.time()
+        return self._snapshot(timestamp, self._get_status(), measurements)
+
+    def _snapshot(self, timestamp, status, measurements=True):
+        """
+        Returns a :class:`Snapshot` from a status already read with
+        :meth:`_get_status`.
+        """
+        state, cycle, time_remaining, _units, _status = status
+        if not measurements:
+            return Snapshot(timestamp, state, cycle, time_remaining, *([None] * 6))
+
+        dynamic, latched = self.faults
+
+        return Snapshot(
+            timestamp,
+            state,
+            cycle,
+            time_remaining,
+            self.pressure_Pa,
+            self.forward_power_W,
+            self.reverse_power_W,
+            self.metering_valve_voltage_V,
+            dynamic,
+            latched,
+        )
+
     def _get_status(self):
         """
         Returns the status of the device.
@@ -453,12 +992,32 @@ class EvactronInterface(object):
         The clock is set and returned as a Python :class:`datetime.datetime` 
         object.
         """
+        date = self._get_date()
+        t = self._get_time()
+        return datetime.datetime.combine(date, t)
+
+    @clock.setter
+    def clock(self, dt):
+        with self._transaction_lock, self._span("set clock"):
+            with self._span("disable"):
+                self.disable()
+            with self._span("sleep"):
+                time.sleep(0.1)  # required
+
+            with self._span("write"):
+                self._set_date(dt)
+                self._set_time(dt)
+
+            with self._span("enable"):
+                self.enable()
+
+    def _get_date(self):
+        """
+        Returns the date of the device clock.
+        """
         day = c.c_int()
         month = c.c_int()
         year = c.c_int()
-        hour = c.c_int()
-        minute = c.c_int()
-        second = c.c_int()
 
         retval = self._dll.evbGetDate(
             self._handle, c.byref(month), c.byref(day), c.byref(year)
@@ -466,37 +1025,111 @@ class EvactronInterface(object):
         if retval != EVR_OK:
             raise EvactronException
 
+        return datetime.date(year.value, month.value, day.value)
+
+    def _get_time(self):
+        """
+        Returns the time of the device clock.
+        """
+        hour = c.c_int()
+        minute = c.c_int()
+        second = c.c_int()
+
         retval = self._dll.evbGetTime(
             self._handle, c.byref(hour), c.byref(minute), c.byref(second)
         )
         if retval != EVR_OK:
             raise EvactronException
 
-        return datetime.datetime(
-            year.value, month.value, day.value, hour.value, minute.value, second.value
-        )
-
-    @clock.setter
-    def clock(self, dt):
-        self.disable()
-        time.sleep(0.1)  # required
+        return datetime.time(hour.value, minute.value, second.value)
 
-        day = c.c_int(dt.day)
-        month = c.c_int(dt.month)
-        year = c.c_int(dt.year)
-        hour = c.c_int(dt.hour)
-        minute = c.c_int(dt.minute)
-        second = c.c_int(dt.second)
+    def _set_date(self, d):
+        """
+        Sets the date of the device clock.
+        The unit must be disabled.
+        """
+        day = c.c_int(d.day)
+        month = c.c_int(d.month)
+        year = c.c_int(d.year)
 
         retval = self._dll.evbSetDate(self._handle, month, day, year)
         if retval != EVR_OK:
             raise EvactronException
 
+    def _set_time(self, t):
+        """
+        Sets the time of the device clock.
+        The unit must be disabled.
+        """
+        hour = c.c_int(t.hour)
+        minute = c.c_int(t.minute)
+        second = c.c_int(t.second)
+
         retval = self._dll.evbSetTime(self._handle, hour, minute, second)
         if retval != EVR_OK:
             raise EvactronException
 
-        self.enable()
+    def configuration(self, cached=False):
+        """
+        Reads and returns a :class:`dict` of the plasma configuration
+        (see :data:`CONFIGURATION_PROPERTIES`).
+
+        :arg cached: if ``True``, returns the values last read or written
+            through the interface instead, without reading the device (only
+            those known, possibly none)
+        """
+        if cached:
+            return dict(self._configuration)
+
+        configuration = dict(
+            (name, getattr(self, name)) for name in CONFIGURATION_PROPERTIES
+        )
+        self._configuration.update(configuration)
+        return configuration
+
+    def _configure(self, name, value, func_name, *args):
+        """
+        Sets a value of the plasma configuration with the function
+        *func_name* of the DLL.
+        The unit is disabled while the value is set; concurrent setters wait
+        until it is enabled again.
+        """
+        with self._transaction_lock, self._span("set %s" % name):
+            with self._span("disable"):
+                self.disable()
+            with self._span("sleep"):
+                time.sleep(0.1)  # required
+
+            with self._span("write"):
+                retval = getattr(self._dll, func_name)(self._handle, *args)
+            if retval != EVR_OK:
+                raise EvactronException
+
+            with self._span("enable"):
+                self.enable()
+
+        self._configuration[name] = value
+        self._written_configuration[name] = value
+
+    def _restore_configuration(self):
+        """
+        Writes back the values of the plasma configuration set through the
+        interface which differ on the device, e.g. after it was reset.
+        """
+        for name in CONFIGURATION_PROPERTIES:
+            if name not in self._written_configuration:
+                continue
+
+            value = self._written_configuration[name]
+            current = getattr(self, name)
+            if isinstance(value, float):
+                if math.isclose(current, value, rel_tol=1e-5):
+                    continue
+            elif current == value:
+                continue
+
+            logging.debug("Restoring %s=%s", name, value)
+            setattr(self, name, value)
 
     # - Plasma configuration
 
@@ -515,14 +1148,7 @@ class EvactronInterface(object):
 
     @cycles.setter
     def cycles(self, cycles):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbSetCycleCount(self._handle, c.c_int(cycles))
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
+        self._configure("cycles", cycles, "evbSetCycleCount", c.c_int(cycles))
 
     @property
     def ignite_pressure_setpoint_Pa(self):
@@ -540,16 +1166,12 @@ class EvactronInterface(object):
 
     @ignite_pressure_setpoint_Pa.setter
     def ignite_pressure_setpoint_Pa(self, pressure):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbSetIgnitePressureSetpoint(
-            self._handle, c.c_float(pressure / TORR2PA)
+        self._configure(
+            "ignite_pressure_setpoint_Pa",
+            pressure,
+            "evbSetIgnitePressureSetpoint",
+            c.c_float(pressure / TORR2PA),
         )
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
 
     @property
     def plasma_pressure_setpoint_Pa(self):
@@ -566,16 +1188,12 @@ class EvactronInterface(object):
 
     @plasma_pressure_setpoint_Pa.setter
     def plasma_pressure_setpoint_Pa(self, pressure):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbSetPlasmaPressureSetpoint(
-            self._handle, c.c_float(pressure / TORR2PA)
+        self._configure(
+            "plasma_pressure_setpoint_Pa",
+            pressure,
+            "evbSetPlasmaPressureSetpoint",
+            c.c_float(pressure / TORR2PA),
         )
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
 
     @property
     def plasma_power_setpoint_W(self):
@@ -592,14 +1210,12 @@ class EvactronInterface(object):
 
     @plasma_power_setpoint_W.setter
     def plasma_power_setpoint_W(self, power):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbSetPlasmaPowerSetpoint(self._handle, c.c_float(power))
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
+        self._configure(
+            "plasma_power_setpoint_W",
+            power,
+            "evbSetPlasmaPowerSetpoint",
+            c.c_float(power),
+        )
 
     @property
     def plasma_time(self):
@@ -627,18 +1243,13 @@ class EvactronInterface(object):
 
     @plasma_time.setter
     def plasma_time(self, t):
-        self.disable()
-        time.sleep(0.1)
+        t = datetime.time(t.hour, t.minute, (t.second // 10) * 10)  # round down
 
         hour = c.c_int(t.hour)
         minute = c.c_int(t.minute)
-        second = c.c_int((t.second / 10) * 10)  # round down to closest ten
-
-        retval = self._dll.evbSetPlasmaTime(self._handle, hour, minute, second)
-        if retval != EVR_OK:
-            raise EvactronException
+        second = c.c_int(t.second)
 
-        self.enable()
+        self._configure("plasma_time", t, "evbSetPlasmaTime", hour, minute, second)
 
     @property
     def purge(self):
@@ -655,14 +1266,7 @@ class EvactronInterface(object):
 
     @purge.setter
     def purge(self, enabled):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbEnablePurge(self._handle, c.c_int(enabled))
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
+        self._configure("purge", enabled, "evbEnablePurge", c.c_int(enabled))
 
     @property
     def purge_pressure_setpoint_Pa(self):
@@ -680,16 +1284,12 @@ class EvactronInterface(object):
 
     @purge_pressure_setpoint_Pa.setter
     def purge_pressure_setpoint_Pa(self, pressure):
-        self.disable()
-        time.sleep(0.1)
-
-        retval = self._dll.evbSetPurgePressureSetpoint(
-            self._handle, c.c_float(pressure / TORR2PA)
+        self._configure(
+            "purge_pressure_setpoint_Pa",
+            pressure,
+            "evbSetPurgePressureSetpoint",
+            c.c_float(pressure / TORR2PA),
         )
-        if retval != EVR_OK:
-            raise EvactronException
-
-        self.enable()
 
     @property
     def purge_time(self):
@@ -717,15 +1317,10 @@ class EvactronInterface(object):
 
     @purge_time.setter
     def purge_time(self, t):
-        self.disable()
-        time.sleep(0.1)
+        t = datetime.time(t.hour, t.minute, (t.second // 10) * 10)  # round down
 
         hour = c.c_int(t.hour)
         minute = c.c_int(t.minute)
-        second = c.c_int((t.second / 10) * 10)  # round down to closest ten
-
-        retval = self._dll.evbSetPurgeTime(self._handle, hour, minute, second)
-        if retval != EVR_OK:
-            raise EvactronException
+        second = c.c_int(t.second)
 
-        self.enable()
+        self._configure("purge_time", t, "evbSetPurgeTime", hour, minute, second)
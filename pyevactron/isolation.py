@@ -0,0 +1,319 @@
+"""
+Isolation of each device in its own worker process.
+
+The worker publishes its latest snapshot in a shared memory slot protected by
+a sequence lock, which the parent process reads without any inter-process
+round-trip.
+A supervisor restarts dead or hung workers; meanwhile the last good snapshot
+remains available.
+"""
+
+# Standard library modules.
+import time
+import struct
+import logging
+import datetime
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, Snapshot, _STATES, _FAULTS
+
+# Globals and constants variables.
+_SEQUENCE = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<diiiddddii")
+SLOT_SIZE = _SEQUENCE.size + _PAYLOAD.size
+
+_STATE_CODES = dict((state, code) for code, state in _STATES.items())
+_FAULT_CODES = dict((id(fault), code) for code, fault in _FAULTS.items())
+
+
+def _encode(snapshot):
+    t = snapshot.time_remaining
+    state = snapshot.state
+    return _PAYLOAD.pack(
+        snapshot.timestamp,
+        state if isinstance(state, int) else _STATE_CODES[state],
+        snapshot.cycle,
+        t.hour * 3600 + t.minute * 60 + t.second,
+        snapshot.pressure_Pa,
+        snapshot.forward_power_W,
+        snapshot.reverse_power_W,
+        snapshot.metering_valve_voltage_V,
+        _FAULT_CODES.get(id(snapshot.dynamic_fault), 0),
+        _FAULT_CODES.get(id(snapshot.latched_fault), 0),
+    )
+
+
+def _decode(payload):
+    (
+        timestamp,
+        state,
+        cycle,
+        seconds,
+        pressure,
+        forward_power,
+        reverse_power,
+        voltage,
+        dynamic,
+        latched,
+    ) = _PAYLOAD.unpack(payload)
+
+    return Snapshot(
+        timestamp,
+        _STATES.get(state, state),
+        cycle,
+        datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60),
+        pressure,
+        forward_power,
+        reverse_power,
+        voltage,
+        _FAULTS.get(dynamic),
+        _FAULTS.get(latched),
+    )
+
+
+class SnapshotSlot(object):
+    def __init__(self, buffer):
+        """
+        Fixed layout slot holding one :class:`Snapshot
+        <pyevactron.interface.Snapshot>` in a shared buffer of
+        :data:`SLOT_SIZE` bytes.
+
+        A single writer increments the sequence number to an odd value,
+        writes the snapshot and increments it again to an even value.
+        Readers retry until they copy the snapshot between two identical even
+        sequence numbers.
+        """
+        self._buffer = buffer
+        self._sequence = None
+
+    def sequence(self):
+        """
+        Returns the current sequence number.
+        It increases by two for every snapshot written.
+        """
+        return _SEQUENCE.unpack_from(self._buffer, 0)[0]
+
+    def write(self, snapshot):
+        if self._sequence is None:
+            # A previous writer may have died in the middle of a write
+            self._sequence = self.sequence() + self.sequence() % 2
+
+        payload = _encode(snapshot)
+
+        self._sequence += 1
+        _SEQUENCE.pack_into(self._buffer, 0, self._sequence)
+        self._buffer[_SEQUENCE.size : SLOT_SIZE] = payload
+        self._sequence += 1
+        _SEQUENCE.pack_into(self._buffer, 0, self._sequence)
+
+    def read(self, retries=100):
+        """
+        Returns the snapshot in the slot, or ``None`` if no snapshot was
+        written or no consistent copy could be made within *retries*.
+        """
+        for _ in range(retries):
+            before = self.sequence()
+            if before % 2:
+                time.sleep(0)
+                continue
+
+            payload = bytes(self._buffer[_SEQUENCE.size : SLOT_SIZE])
+            if self.sequence() == before:
+                return _decode(payload) if before else None
+
+        return None
+
+
+def _publish(comm_port, dll_factory, name, interval, stop):
+    logging.debug("Worker for port %s started", comm_port)
+
+    memory = shared_memory.SharedMemory(name)
+
+    try:
+        slot = SnapshotSlot(memory.buf)
+        dll = dll_factory(comm_port) if dll_factory is not None else None
+
+        with EvactronInterface(comm_port, dll) as ev:
+            deadline = time.monotonic()
+            while not stop.is_set():
+                slot.write(ev.snapshot())
+
+                deadline += interval
+                delay = deadline - time.monotonic()
+                if delay < 0:
+                    deadline -= delay
+                    delay = 0.0
+                stop.wait(delay)
+    finally:
+        memory.close()
+
+
+class IsolatedEvactron(object):
+    def __init__(
+        self,
+        comm_port,
+        dll_factory=None,
+        interval=0.5,
+        hang_timeout=10.0,
+        restart_delay=1.0,
+        context=None,
+    ):
+        """
+        Runs the interface to an Evactron device in a worker process, which
+        publishes snapshots every *interval* seconds.
+
+        :arg comm_port: number of the port to connect to the device
+        :arg dll_factory: picklable callable returning the library for a port
+            (see :class:`EvactronInterface`), or ``None`` to load the DLL
+        :arg interval: interval between snapshots (in seconds)
+        :arg hang_timeout: duration without new snapshot after which the
+            worker is considered hung and restarted (in seconds)
+        :arg restart_delay: delay before restarting a worker (in seconds)
+        :arg context: :mod:`multiprocessing` context (default: the default
+            context)
+        """
+        self._comm_port = comm_port
+        self._dll_factory = dll_factory
+        self._interval = interval
+        self._hang_timeout = hang_timeout
+        self._restart_delay = restart_delay
+        self._context = context or multiprocessing.get_context()
+
+        self._memory = None
+        self._slot = None
+        self._last = None
+        self._process = None
+        self._stop = None
+        self._supervisor = None
+        self._supervisor_stop = None
+        self._restarts = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _spawn(self):
+        self._stop = self._context.Event()
+        self._process = self._context.Process(
+            target=_publish,
+            args=(
+                self._comm_port,
+                self._dll_factory,
+                self._memory.name,
+                self._interval,
+                self._stop,
+            ),
+            name="evactron-%s" % self._comm_port,
+            daemon=True,
+        )
+        self._process.start()
+
+    def _supervise(self, stop):
+        sequence = self._slot.sequence()
+        progress = time.monotonic()
+
+        while not stop.wait(min(self._interval, 1.0)):
+            current = self._slot.sequence()
+            if current != sequence:
+                sequence = current
+                progress = time.monotonic()
+
+            alive = self._process.is_alive()
+            hung = time.monotonic() - progress > self._hang_timeout
+            if alive and not hung:
+                continue
+
+            if alive:
+                logging.warning("Worker for port %s is hung", self._comm_port)
+                self._process.kill()
+            else:
+                logging.warning(
+                    "Worker for port %s exited with code %s",
+                    self._comm_port,
+                    self._process.exitcode,
+                )
+            self._process.join()
+
+            if stop.wait(self._restart_delay):
+                break
+
+            self._restarts += 1
+            self._spawn()
+            progress = time.monotonic()
+
+    def start(self):
+        """
+        Starts the worker process and its supervisor.
+        """
+        if self._supervisor is not None:
+            return
+
+        self._memory = shared_memory.SharedMemory(create=True, size=SLOT_SIZE)
+        self._memory.buf[:SLOT_SIZE] = bytes(SLOT_SIZE)
+        self._slot = SnapshotSlot(self._memory.buf)
+        self._spawn()
+
+        self._supervisor_stop = threading.Event()
+        self._supervisor = threading.Thread(
+            target=self._supervise,
+            args=(self._supervisor_stop,),
+            name="evactron-supervisor-%s" % self._comm_port,
+            daemon=True,
+        )
+        self._supervisor.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Stops the worker process and releases the shared memory.
+        """
+        if self._supervisor is None:
+            return
+
+        self._supervisor_stop.set()
+        self._supervisor.join()
+        self._supervisor = None
+
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+        self._slot = None
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+    def snapshot(self):
+        """
+        Returns the latest :class:`Snapshot <pyevactron.interface.Snapshot>`
+        published by the worker, or ``None`` if none was published yet.
+        While the worker is restarted, the last good snapshot is returned.
+        """
+        if self._slot is not None:
+            snapshot = self._slot.read()
+            if snapshot is not None:
+                self._last = snapshot
+        return self._last
+
+    @property
+    def restarts(self):
+        """
+        Number of times the worker process was restarted.
+        """
+        return self._restarts
+
+    @property
+    def pid(self):
+        """
+        Process id of the current worker.
+        """
+        return self._process.pid if self._process is not None else None
@@ -0,0 +1,354 @@
+"""
+Prometheus/OpenMetrics exporter of the telemetry of the devices.
+
+The exporter is fed by the shared :class:`Sampler
+<pyevactron.sampler.Sampler>` of each unit, so a scrape only formats the
+latest values: its cost is constant and it never calls the device.
+The units are labelled by comm port.
+"""
+
+# Standard library modules.
+import logging
+import threading
+import http.server
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron import interface as _interface
+from pyevactron.interface import EvactronFault, ReadyState, _STATES
+from pyevactron.instrumentation import BUCKET_BOUNDS
+from pyevactron.sampler import ACTIVE_STATES
+
+# Globals and constants variables.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_STATE_CODES = dict((id(state), code) for code, state in _STATES.items())
+_FAULT_NAMES = dict(
+    (id(value), name)
+    for name, value in vars(_interface).items()
+    if isinstance(value, EvactronFault)
+)
+
+_GAUGES = (
+    ("pressure_pascals", "Chamber pressure", "pressure_Pa"),
+    ("forward_power_watts", "RF forward power", "forward_power_W"),
+    ("reverse_power_watts", "RF reverse power", "reverse_power_W"),
+    (
+        "metering_valve_voltage_volts",
+        "Metering valve voltage",
+        "metering_valve_voltage_V",
+    ),
+    ("cycle", "Current cycle", "cycle"),
+)
+
+
+class _Unit(object):
+    def __init__(self, interface, latencies):
+        self.interface = interface
+        self.comm_port = interface._comm_port
+        self.latest = None
+        self.runs = 0
+        self.faults = collections.Counter()
+        self.latencies = latencies
+        self.started_instrumentation = False
+
+        if latencies and interface.instrumentation is None:
+            interface.start_instrumentation()
+            self.started_instrumentation = True
+
+    def __call__(self, snapshot):
+        previous, self.latest = self.latest, snapshot
+        if previous is None:
+            return
+
+        if previous.state is ReadyState and snapshot.state in ACTIVE_STATES:
+            self.runs += 1
+
+        # Faults are not read in all states
+        if snapshot.pressure_Pa is None:
+            self.latest = previous._replace(
+                timestamp=snapshot.timestamp,
+                state=snapshot.state,
+                cycle=snapshot.cycle,
+                time_remaining=snapshot.time_remaining,
+            )
+            return
+        if previous.pressure_Pa is None:
+            return
+
+        for latched, fault, previous_fault in (
+            (False, snapshot.dynamic_fault, previous.dynamic_fault),
+            (True, snapshot.latched_fault, previous.latched_fault),
+        ):
+            if fault is not None and fault is not previous_fault:
+                self.faults[(_FAULT_NAMES.get(id(fault), str(fault)), latched)] += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, _escape(value)) for name, value in labels.items()
+    )
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    return repr(float(value))
+
+
+class MetricsExporter(object):
+    def __init__(self, prefix="evactron"):
+        """
+        Exports the metrics of the units in the Prometheus text format or in
+        the OpenMetrics format:
+
+        * gauges: pressure, forward and reverse power, metering valve voltage,
+          state code, cycle, time remaining and timestamp of the latest
+          snapshot;
+        * counters: faults raised by type, runs started, reconnections (if a
+          supervisor is running) and sampling errors;
+        * histograms: latency of the calls to the DLL, by function.
+
+        The units are added with :meth:`add_unit`; the metrics are returned
+        by :meth:`render` or served over HTTP with :meth:`serve`.
+        """
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._units = collections.OrderedDict()
+        self._server = None
+        self._thread = None
+
+    def add_unit(self, interface, latencies=True):
+        """
+        Adds the unit of *interface*, whose sampler must be running.
+
+        :arg latencies: whether to export the latency of the calls to the
+            DLL, recorded by the :meth:`instrumentation
+            <pyevactron.interface.EvactronInterface.start_instrumentation>` of
+            the interface (started if needed)
+        """
+        sampler = interface.sampler
+        if sampler is None:
+            raise ValueError("Sampler of port %s is not running" % interface._comm_port)
+
+        unit = _Unit(interface, latencies)
+        with self._lock:
+            self._units[unit.comm_port] = unit
+        sampler.add_sink(unit)
+
+    def remove_unit(self, interface):
+        with self._lock:
+            unit = self._units.pop(interface._comm_port)
+
+        if interface.sampler is not None:
+            interface.sampler.remove_sink(unit)
+        if unit.started_instrumentation:
+            interface.stop_instrumentation()
+
+    def _family(self, lines, name, kind, help, samples, openmetrics):
+        """
+        Appends a metric family and its *samples* (suffix, labels, value).
+        """
+        if not samples:
+            return
+
+        name = "%s_%s" % (self._prefix, name)
+        if kind == "counter" and not openmetrics:
+            name += "_total"
+        lines.append("# HELP %s %s" % (name, help))
+        lines.append("# TYPE %s %s" % (name, kind))
+        for suffix, labels, value in samples:
+            lines.append("%s%s%s %s" % (name, suffix, _labels(**labels), value))
+
+    def render(self, openmetrics=False):
+        """
+        Returns the metrics as text, in the OpenMetrics format if
+        *openmetrics*, otherwise in the Prometheus text format.
+        """
+        with self._lock:
+            units = list(self._units.values())
+
+        counter = "_total" if openmetrics else ""
+        lines = []
+
+        for name, help, field in _GAUGES:
+            samples = [
+                ("", {"port": u.comm_port}, _number(getattr(u.latest, field)))
+                for u in units
+                if u.latest is not None
+            ]
+            self._family(lines, name, "gauge", help, samples, openmetrics)
+
+        samples = []
+        for unit in units:
+            if unit.latest is None:
+                continue
+            state = unit.latest.state
+            code = _STATE_CODES.get(id(state), state)
+            samples.append(
+                ("", {"port": unit.comm_port, "state": state}, _number(code))
+            )
+        self._family(
+            lines, "state", "gauge", "State code of the unit", samples, openmetrics
+        )
+
+        samples = []
+        for unit in units:
+            if unit.latest is None:
+                continue
+            t = unit.latest.time_remaining
+            seconds = t.hour * 3600 + t.minute * 60 + t.second
+            samples.append(("", {"port": unit.comm_port}, _number(seconds)))
+        self._family(
+            lines,
+            "time_remaining_seconds",
+            "gauge",
+            "Time remaining in the current state",
+            samples,
+            openmetrics,
+        )
+
+        samples = [
+            ("", {"port": u.comm_port}, _number(u.latest.timestamp))
+            for u in units
+            if u.latest is not None
+        ]
+        self._family(
+            lines,
+            "snapshot_timestamp_seconds",
+            "gauge",
+            "Host time of the latest snapshot",
+            samples,
+            openmetrics,
+        )
+
+        samples = [(counter, {"port": u.comm_port}, _number(u.runs)) for u in units]
+        self._family(
+            lines, "runs", "counter", "Cleaning runs started", samples, openmetrics
+        )
+
+        samples = []
+        for unit in units:
+            for (fault, latched), count in sorted(unit.faults.items()):
+                labels = {
+                    "port": unit.comm_port,
+                    "fault": fault,
+                    "latched": str(latched).lower(),
+                }
+                samples.append((counter, labels, _number(count)))
+        self._family(lines, "faults", "counter", "Faults raised", samples, openmetrics)
+
+        samples = []
+        for unit in units:
+            sampler = unit.interface.sampler
+            if sampler is not None:
+                errors = sampler.statistics().errors
+                samples.append((counter, {"port": unit.comm_port}, _number(errors)))
+        self._family(
+            lines,
+            "sampler_errors",
+            "counter",
+            "Snapshots which could not be read",
+            samples,
+            openmetrics,
+        )
+
+        samples = []
+        for unit in units:
+            supervisor = unit.interface.supervisor
+            if supervisor is not None:
+                reconnects = supervisor.statistics().reconnects
+                samples.append((counter, {"port": unit.comm_port}, _number(reconnects)))
+        self._family(
+            lines,
+            "reconnects",
+            "counter",
+            "Reconnections after the link was lost",
+            samples,
+            openmetrics,
+        )
+
+        samples = []
+        for unit in units:
+            instrumentation = unit.interface.instrumentation
+            if not unit.latencies or instrumentation is None:
+                continue
+            histograms = instrumentation.histograms()
+            for function, (cumulative, count, total) in sorted(histograms.items()):
+                labels = {"port": unit.comm_port, "function": function}
+                bounds = [repr(b) for b in BUCKET_BOUNDS[:-1]] + ["+Inf"]
+                for bound, value in zip(bounds, cumulative):
+                    samples.append(("_bucket", dict(labels, le=bound), value))
+                samples.append(("_count", labels, count))
+                samples.append(("_sum", labels, _number(total)))
+        self._family(
+            lines,
+            "dll_call_duration_seconds",
+            "histogram",
+            "Duration of the calls to the DLL",
+            samples,
+            openmetrics,
+        )
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host="127.0.0.1", port=9410):
+        """
+        Serves the metrics over HTTP, at any path (typically ``/metrics``),
+        in a background thread.
+        The OpenMetrics format is used if the scraper accepts it.
+        Returns the address of the server.
+        """
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logging.debug("%s - %s", self.address_string(), format % args)
+
+            def do_GET(self):
+                accept = self.headers.get("Accept", "")
+                openmetrics = "application/openmetrics-text" in accept
+                body = exporter.render(openmetrics).encode("utf8")
+
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    (
+                        OPENMETRICS_CONTENT_TYPE
+                        if openmetrics
+                        else PROMETHEUS_CONTENT_TYPE
+                    ),
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="evactron-metrics", daemon=True
+        )
+        self._thread.start()
+        return self._server.server_address[:2]
+
+    def close(self):
+        """
+        Stops serving the metrics.
+        """
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,325 @@
+"""
+Process-wide pool of the connections to the devices.
+
+The interfaces are keyed by comm port and reference counted: nested or
+concurrent leases on the same port share one connected
+:class:`EvactronInterface <pyevactron.interface.EvactronInterface>`, which is
+only disconnected when the last lease is released (optionally after an idle
+linger).
+"""
+
+# Standard library modules.
+import atexit
+import logging
+import threading
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.portlock import PortLock, fcntl
+
+# Globals and constants variables.
+PoolStatistics = collections.namedtuple(
+    "PoolStatistics",
+    [
+        "acquisitions",
+        "connects",
+        "disconnects",
+        "ports",
+        "lock_waits",
+        "lock_wait_s",
+        "lock_wait_max_s",
+    ],
+)
+
+
+class _Entry(object):
+    __slots__ = ("interface", "references", "timer", "port_lock")
+
+    def __init__(self, interface):
+        self.interface = interface
+        self.references = 0
+        self.timer = None
+        self.port_lock = None
+
+
+class Lease(object):
+    def __init__(self, pool, comm_port, dll=None, linger=0.0, lock_timeout=None):
+        """
+        Lease of the connection to a device from a :class:`HandlePool`.
+        Used as a context manager, it returns the connected
+        :class:`EvactronInterface
+        <pyevactron.interface.EvactronInterface>`::
+
+            >>> with connect(comm_port) as ev:
+            ...     print(ev.pressure_Pa)
+
+        The interface is shared with the other leases of the port: it cannot
+        be disconnected, only released, and its sampler cannot be stopped
+        while other leases hold it.
+        """
+        self._pool = pool
+        self._comm_port = comm_port
+        self._dll = dll
+        self._linger = linger
+        self._lock_timeout = lock_timeout
+        self._interface = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self):
+        """
+        Acquires the connection and returns the interface.
+        """
+        if self._interface is None:
+            self._interface = self._pool.acquire(
+                self._comm_port, self._dll, self._lock_timeout
+            )
+        return self._interface
+
+    def release(self):
+        """
+        Releases the connection. The interface must not be used afterwards.
+        """
+        if self._interface is None:
+            return
+
+        interface, self._interface = self._interface, None
+        self._pool.release(interface, self._linger)
+
+    @property
+    def interface(self):
+        """
+        Leased interface, or ``None`` if the lease is not acquired.
+        """
+        return self._interface
+
+
+class HandlePool(object):
+    def __init__(self, lock_ports=True, lock_directory=None, stale_after=None):
+        """
+        Pool of connected interfaces, keyed by comm port.
+        Usually accessed through :func:`connect
+        <pyevactron.interface.connect>`, which uses the process-wide pool.
+
+        While a port is connected, the pool holds its
+        :class:`PortLock <pyevactron.portlock.PortLock>`, so that other
+        processes wait for the port to be released.
+
+        :arg lock_ports: whether to lock the ports, if supported by the
+            platform
+        :arg lock_directory: directory of the lease files
+        :arg stale_after: time after which a lease which was not renewed can
+            be taken over (in seconds)
+        """
+        self._lock_ports = lock_ports and fcntl is not None
+        self._lock_directory = lock_directory
+        self._stale_after = stale_after
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._port_locks = collections.defaultdict(threading.Lock)
+
+        self._acquisitions = 0
+        self._connects = 0
+        self._disconnects = 0
+        self._lock_waits = 0
+        self._lock_wait = 0.0
+        self._lock_wait_max = 0.0
+
+    def lease(self, comm_port, dll=None, linger=0.0, lock_timeout=None):
+        """
+        Returns a :class:`Lease` of the connection to the device on
+        *comm_port*.
+
+        :arg dll: library used if the port is not in the pool yet
+            (see :class:`EvactronInterface
+            <pyevactron.interface.EvactronInterface>`)
+        :arg linger: time the connection is kept after the last lease is
+            released, so that it can be reused (in seconds)
+        :arg lock_timeout: maximum time to wait for another process to
+            release the port (in seconds), or ``None`` to wait indefinitely
+        """
+        return Lease(self, comm_port, dll, linger, lock_timeout)
+
+    def _lock_port(self, comm_port, entry, timeout):
+        if not self._lock_ports:
+            return
+
+        entry.port_lock = PortLock(comm_port, self._lock_directory, self._stale_after)
+        wait = entry.port_lock.acquire(timeout)
+        with self._lock:
+            self._lock_waits += 1
+            self._lock_wait += wait
+            self._lock_wait_max = max(wait, self._lock_wait_max)
+
+    def _unlock_port(self, entry):
+        if entry.port_lock is not None:
+            entry.port_lock.release()
+            entry.port_lock = None
+
+    def acquire(self, comm_port, dll=None, lock_timeout=None):
+        """
+        Returns the connected interface of *comm_port* and increments its
+        reference count.
+        The port is locked before connecting, waiting at most *lock_timeout*
+        seconds for other processes to release it.
+        """
+        with self._lock:
+            entry = self._entries.get(comm_port)
+            if entry is None:
+                entry = _Entry(EvactronInterface(comm_port, dll))
+                entry.interface._pool = self
+                self._entries[comm_port] = entry
+
+            entry.references += 1
+            if entry.timer is not None:
+                entry.timer.cancel()
+                entry.timer = None
+            port_lock = self._port_locks[comm_port]
+            self._acquisitions += 1
+
+        interface = entry.interface
+        try:
+            with port_lock:
+                if interface._handle is not None:
+                    return interface
+
+                self._lock_port(comm_port, entry, lock_timeout)
+                try:
+                    interface.connect()
+                except Exception:
+                    self._unlock_port(entry)
+                    raise
+        except Exception:
+            self._release_entry(comm_port, entry, 0.0)
+            raise
+
+        with self._lock:
+            self._connects += 1
+        return interface
+
+    def release(self, interface, linger=0.0):
+        """
+        Decrements the reference count of *interface*.
+        When it reaches zero, the interface is disconnected after *linger*
+        seconds, unless it is acquired again in the meantime.
+        """
+        comm_port = interface._comm_port
+        with self._lock:
+            entry = self._entries.get(comm_port)
+            if entry is None or entry.interface is not interface:
+                raise ValueError("Interface is not in the pool")
+
+        self._release_entry(comm_port, entry, linger)
+
+    def references(self, interface):
+        """
+        Returns the number of leases holding *interface*.
+        """
+        with self._lock:
+            entry = self._entries.get(interface._comm_port)
+            if entry is None or entry.interface is not interface:
+                return 0
+            return entry.references
+
+    def _release_entry(self, comm_port, entry, linger):
+        with self._lock:
+            entry.references -= 1
+            if entry.references > 0:
+                return
+
+            if linger > 0.0:
+                entry.timer = threading.Timer(linger, self._expire, (comm_port, entry))
+                entry.timer.daemon = True
+                entry.timer.start()
+                return
+
+        self._disconnect(comm_port, entry)
+
+    def _expire(self, comm_port, entry):
+        with self._lock:
+            if entry.references > 0 or self._entries.get(comm_port) is not entry:
+                return
+            entry.timer = None
+
+        self._disconnect(comm_port, entry)
+
+    def _disconnect(self, comm_port, entry):
+        """
+        Disconnects the interface of *entry* and unlocks its port, then
+        removes the entry from the pool, unless it was acquired again in the
+        meantime.
+        The entry stays in the pool until its port is unlocked, so that a
+        concurrent :meth:`acquire` of the port reuses it and waits for the
+        disconnection, instead of waiting for a port lock held by this
+        process.
+        """
+        with self._port_locks[comm_port]:
+            with self._lock:
+                if entry.references > 0:
+                    return
+
+            disconnected = entry.interface._handle is not None
+            if disconnected:
+                try:
+                    entry.interface._disconnect()
+                except Exception:
+                    logging.exception("Cannot disconnect from port %s", comm_port)
+                finally:
+                    self._unlock_port(entry)
+
+            with self._lock:
+                if entry.references == 0 and self._entries.get(comm_port) is entry:
+                    del self._entries[comm_port]
+                if disconnected:
+                    self._disconnects += 1
+
+    def close(self):
+        """
+        Disconnects the interfaces which are no longer leased but still
+        lingering.
+        """
+        with self._lock:
+            idle = [
+                (comm_port, entry)
+                for comm_port, entry in self._entries.items()
+                if entry.references == 0
+            ]
+            for comm_port, entry in idle:
+                if entry.timer is not None:
+                    entry.timer.cancel()
+                    entry.timer = None
+
+        for comm_port, entry in idle:
+            self._disconnect(comm_port, entry)
+
+    def statistics(self):
+        """
+        Returns the :class:`PoolStatistics`: the number of acquisitions, of
+        actual connections and disconnections, the ports in the pool, as well
+        as the number of port locks, the total and the maximum time spent
+        waiting for other processes to release the ports.
+        """
+        with self._lock:
+            return PoolStatistics(
+                self._acquisitions,
+                self._connects,
+                self._disconnects,
+                tuple(sorted(self._entries)),
+                self._lock_waits,
+                self._lock_wait,
+                self._lock_wait_max,
+            )
+
+
+POOL = HandlePool()
+"""Process-wide pool used by :func:`connect <pyevactron.interface.connect>`."""
+
+atexit.register(POOL.close)
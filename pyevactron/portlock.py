@@ -0,0 +1,232 @@
+"""
+Advisory lock of a comm port shared between processes.
+
+The lock is a lease file per comm port, locked with :func:`fcntl.flock`, so
+that tools opening the same port queue instead of failing mid-run.
+The lock is released by the kernel if the holder dies; a lease which is not
+renewed within *stale_after* seconds (e.g. hung holder, network file system)
+can also be taken over.
+Locking is only available on platforms providing :mod:`fcntl`.
+"""
+
+# Standard library modules.
+import os
+import time
+import socket
+import logging
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronException
+
+# Globals and constants variables.
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PortLock(object):
+    def __init__(self, comm_port, directory=None, stale_after=None, poll_interval=0.05):
+        """
+        Creates the lock of *comm_port*.
+
+        :arg directory: directory of the lease files (default: temporary
+            directory)
+        :arg stale_after: time after which a lease which was not renewed can
+            be taken over (in seconds), or ``None`` to only take over the
+            leases of dead processes. The holder renews its lease every third
+            of this time.
+        :arg poll_interval: interval between the attempts to lock the port
+            while it is held by another process (in seconds)
+        """
+        if fcntl is None:
+            raise EvactronException("Port locking is not supported")
+
+        if directory is None:
+            directory = tempfile.gettempdir()
+        self.path = os.path.join(directory, "pyevactron-port%s.lock" % comm_port)
+        self._stale_after = stale_after
+        self._poll_interval = poll_interval
+
+        self._file = None
+        self._renewer = None
+        self._released = threading.Event()
+        self.wait_s = 0.0
+        self.takeovers = 0
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _try_lock(self):
+        file = open(self.path, "a+")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        return file
+
+    def _write_owner(self, file):
+        """
+        Writes the owner of the lease locked in *file*, unless a takeover
+        removed it meanwhile. Returns whether it was written.
+        Serialised with the takeovers, so that none removes the lease
+        between both steps.
+        """
+        with open(self.path + ".takeover", "a") as guard:
+            fcntl.flock(guard.fileno(), fcntl.LOCK_EX)
+
+            try:
+                current = os.stat(self.path).st_ino == os.fstat(file.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if not current:
+                return False
+
+            file.seek(0)
+            file.truncate()
+            file.write("%i %s %f\n" % (os.getpid(), socket.gethostname(), time.time()))
+            file.flush()
+
+        return True
+
+    def _read_owner(self):
+        """
+        Returns the inode, pid, host and last renewal of the lease, or
+        ``None`` if it is empty or unreadable, i.e. released or being
+        acquired, in which case it is never stale.
+        """
+        try:
+            with open(self.path) as fp:
+                stat = os.fstat(fp.fileno())
+                pid, host = fp.read().split()[:2]
+            return stat.st_ino, int(pid), host, stat.st_mtime
+        except (OSError, ValueError):
+            return None
+
+    def _is_stale(self, owner):
+        _inode, pid, host, mtime = owner
+        if host == socket.gethostname() and not _pid_alive(pid):
+            return True
+        if self._stale_after is not None:
+            return time.time() - mtime > self._stale_after
+        return False
+
+    def _take_over(self):
+        """
+        Removes the lease file if it is stale, so that a new one can be
+        locked. Returns whether it was removed.
+        """
+        with open(self.path + ".takeover", "a") as guard:
+            fcntl.flock(guard.fileno(), fcntl.LOCK_EX)
+
+            # Checked again, in case another process took over first
+            owner = self._read_owner()
+            if owner is None or not self._is_stale(owner):
+                return False
+
+            try:
+                if os.stat(self.path).st_ino != owner[0]:
+                    return False
+                os.unlink(self.path)
+            except FileNotFoundError:
+                return False
+
+        logging.warning(
+            "Took over stale lease of %s (pid %s on %s)", self.path, owner[1], owner[2]
+        )
+        self.takeovers += 1
+        return True
+
+    def _renew(self):
+        interval = self._stale_after / 3.0
+        while not self._released.wait(interval):
+            try:
+                os.utime(self._file.fileno())
+            except (OSError, AttributeError):
+                return
+
+    def acquire(self, timeout=None):
+        """
+        Waits until the port is locked and returns the waiting time
+        (in seconds).
+
+        :raise EvactronException: if the port is still locked by another
+            process after *timeout* seconds
+        """
+        if self._file is not None:
+            return 0.0
+
+        start = time.monotonic()
+        while True:
+            file = self._try_lock()
+            if file is not None:
+                if self._write_owner(file):
+                    break
+                file.close()  # removed by a takeover
+                continue
+
+            owner = self._read_owner()
+            if owner is not None and self._is_stale(owner) and self._take_over():
+                continue
+
+            if timeout is not None and time.monotonic() - start >= timeout:
+                holder = "pid %s on %s" % owner[1:3] if owner else "another process"
+                raise EvactronException("%s is locked by %s" % (self.path, holder))
+
+            time.sleep(self._poll_interval)
+
+        self._file = file
+        self.wait_s = time.monotonic() - start
+
+        if self._stale_after is not None:
+            self._released.clear()
+            self._renewer = threading.Thread(
+                target=self._renew, name="evactron-lease", daemon=True
+            )
+            self._renewer.start()
+
+        return self.wait_s
+
+    def release(self):
+        if self._file is None:
+            return
+
+        self._released.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+
+        # Cleared first, so that the next holder is not mistaken for this
+        # one, which may be stale, before writing its own lease
+        self._file.seek(0)
+        self._file.truncate()
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    @property
+    def locked(self):
+        """
+        Whether the port is locked by this instance.
+        """
+        return self._file is not None
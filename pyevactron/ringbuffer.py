@@ -0,0 +1,229 @@
+"""
+Fixed-capacity, column-oriented store of the recent snapshots.
+
+Each field of the :class:`Snapshot <pyevactron.interface.Snapshot>` is kept
+in its own preallocated NumPy array (31 bytes per snapshot), used as a ring:
+appending is O(1) and never allocates, the oldest snapshots are overwritten
+once the buffer is full.
+Windows are returned as views of the arrays whenever they do not wrap around
+the end of the ring, and time ranges are found by binary search.
+"""
+
+# Standard library modules.
+import threading
+import collections
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+from pyevactron.interface import _STATES, _FAULTS
+
+# Globals and constants variables.
+DEFAULT_CAPACITY = 864000
+"""Default capacity: one day at 10 Hz (about 27 MB)."""
+
+UNKNOWN = -128
+"""Code of a state or fault which was not read (or is not known), outside of
+the codes of the DLL (e.g. -1 is the invalid state) and within the range of
+the smallest column type (int8)."""
+
+NO_FAULT = 0
+"""Code of the absence of fault."""
+
+STATE_CODES = dict((id(state), code) for code, state in _STATES.items())
+FAULT_CODES = dict((id(fault), code) for code, fault in _FAULTS.items())
+
+TelemetryColumns = collections.namedtuple(
+    "TelemetryColumns",
+    [
+        "timestamp",
+        "state",
+        "cycle",
+        "pressure_Pa",
+        "forward_power_W",
+        "reverse_power_W",
+        "metering_valve_voltage_V",
+        "dynamic_fault",
+        "latched_fault",
+    ],
+)
+
+COLUMN_DTYPES = TelemetryColumns(
+    np.float64,
+    np.int8,
+    np.int16,
+    np.float32,
+    np.float32,
+    np.float32,
+    np.float32,
+    np.int16,
+    np.int16,
+)
+"""Data type of each column."""
+
+_MEASUREMENTS = (
+    "pressure_Pa",
+    "forward_power_W",
+    "reverse_power_W",
+    "metering_valve_voltage_V",
+)
+
+
+def encode_snapshot(snapshot):
+    """
+    Returns the row of a :class:`Snapshot <pyevactron.interface.Snapshot>`
+    as a :class:`TelemetryColumns` of codes and numbers: missing measurements
+    are NaN, states and faults are coded with the keys of the DLL (see
+    :data:`UNKNOWN` and :data:`NO_FAULT`).
+    """
+    if snapshot.pressure_Pa is None:
+        dynamic = latched = UNKNOWN
+    else:
+        dynamic = FAULT_CODES.get(id(snapshot.dynamic_fault), NO_FAULT)
+        latched = FAULT_CODES.get(id(snapshot.latched_fault), NO_FAULT)
+
+    return TelemetryColumns(
+        snapshot.timestamp,
+        STATE_CODES.get(id(snapshot.state), UNKNOWN),
+        UNKNOWN if snapshot.cycle is None else snapshot.cycle,
+        *[
+            float("nan") if value is None else value
+            for value in (getattr(snapshot, name) for name in _MEASUREMENTS)
+        ],
+        dynamic,
+        latched
+    )
+
+
+class TelemetryBuffer(object):
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Ring buffer of the latest *capacity* snapshots, stored in columns.
+        It is a callable, so it can be registered as a sink of a
+        :class:`Sampler <pyevactron.sampler.Sampler>`; the sampler keeps one
+        by default (see :attr:`Sampler.history
+        <pyevactron.sampler.Sampler.history>`).
+
+        The timestamps are expected to be non-decreasing, as those of the
+        sampler are.
+
+        .. note::
+
+           The views returned by :meth:`latest` and :meth:`between` share the
+           memory of the buffer: their values are overwritten once the
+           buffer wraps around. Copy them to keep them longer.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+
+        self._capacity = capacity
+        self._columns = TelemetryColumns(
+            *[np.empty(capacity, dtype) for dtype in COLUMN_DTYPES]
+        )
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def __call__(self, snapshot):
+        self.append(snapshot)
+
+    def __len__(self):
+        return min(self._count, self._capacity)
+
+    def append(self, snapshot):
+        """
+        Appends a :class:`Snapshot <pyevactron.interface.Snapshot>`,
+        overwriting the oldest one if the buffer is full.
+        """
+        row = encode_snapshot(snapshot)
+        with self._lock:
+            index = self._count % self._capacity
+            for column, value in zip(self._columns, row):
+                column[index] = value
+            self._count += 1
+
+    def _slice(self, first, last):
+        """
+        Returns the columns of the snapshots *first* to *last* (excluded),
+        counted since the first append.
+        """
+        start = first % self._capacity
+        stop = start + (last - first)
+        if stop <= self._capacity:
+            return TelemetryColumns(*[column[start:stop] for column in self._columns])
+
+        stop -= self._capacity
+        return TelemetryColumns(
+            *[
+                np.concatenate((column[start:], column[:stop]))
+                for column in self._columns
+            ]
+        )
+
+    def _bounds(self):
+        count = self._count
+        return max(count - self._capacity, 0), count
+
+    def latest(self, n=None):
+        """
+        Returns the :class:`TelemetryColumns` of the last *n* snapshots (all
+        if ``None``), oldest first.
+        The arrays are views of the buffer, unless the window wraps around
+        the end of the ring.
+        """
+        with self._lock:
+            first, last = self._bounds()
+            if n is not None:
+                first = max(last - n, first)
+            return self._slice(first, last)
+
+    def between(self, start=None, end=None):
+        """
+        Returns the :class:`TelemetryColumns` of the snapshots whose
+        timestamp is in [*start*, *end*), oldest first.
+        The arrays are views of the buffer, unless the window wraps around
+        the end of the ring.
+        """
+        with self._lock:
+            first, last = self._bounds()
+            if start is not None:
+                first = self._search(first, last, start)
+            if end is not None:
+                last = self._search(first, last, end)
+            return self._slice(first, last)
+
+    def _search(self, first, last, timestamp):
+        """
+        Returns the position of the first snapshot from *first* to *last*
+        whose timestamp is not before *timestamp*.
+        """
+        timestamps = self._columns.timestamp
+        start = first % self._capacity
+        head = min(self._capacity - start, last - first)
+        index = int(np.searchsorted(timestamps[start : start + head], timestamp))
+        if index < head:
+            return first + index
+
+        tail = last - first - head
+        return first + head + int(np.searchsorted(timestamps[:tail], timestamp))
+
+    def clear(self):
+        """
+        Discards the snapshots.
+        """
+        with self._lock:
+            self._count = 0
+
+    @property
+    def capacity(self):
+        """
+        Maximum number of snapshots kept.
+        """
+        return self._capacity
+
+    @property
+    def nbytes(self):
+        """
+        Memory allocated for the columns (in bytes).
+        """
+        return sum(column.nbytes for column in self._columns)
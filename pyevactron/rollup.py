@@ -0,0 +1,164 @@
+"""
+Streaming aggregation of the snapshots in fixed time windows.
+
+A :class:`Downsampler` keeps, for each window length (e.g. 1 s, 1 min and
+1 h), the minimum, maximum, mean and last value of the measurements of the
+current window, and the number of values read, updated as the snapshots
+arrive.
+When a snapshot falls in a new window, the :class:`Aggregate` of the previous
+one is passed to a callback.
+Unlike a decimation, the minimum and maximum keep the pressure spikes and the
+plasma dropouts visible in the coarse tiers.
+"""
+
+# Standard library modules.
+import math
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.ringbuffer import STATE_CODES
+
+# Globals and constants variables.
+DEFAULT_WINDOWS = (1.0, 60.0, 3600.0)
+"""Default window lengths (in seconds): 1 s, 1 min and 1 h."""
+
+MEASUREMENTS = (
+    "pressure_Pa",
+    "forward_power_W",
+    "reverse_power_W",
+    "metering_valve_voltage_V",
+)
+
+STATISTICS = ("min", "max", "mean", "last", "count")
+
+Aggregate = collections.namedtuple(
+    "Aggregate",
+    ["window", "start", "count"]
+    + ["%s_%s" % (name, statistic) for name in MEASUREMENTS for statistic in STATISTICS]
+    + ["state", "faults"],
+)
+
+
+class _Bucket(object):
+    __slots__ = (
+        "window",
+        "start",
+        "count",
+        "minimums",
+        "maximums",
+        "sums",
+        "counts",
+        "lasts",
+        "state",
+        "faults",
+    )
+
+    def __init__(self, window, start):
+        self.window = window
+        self.start = start
+        self.count = 0
+        size = len(MEASUREMENTS)
+        self.minimums = [math.inf] * size
+        self.maximums = [-math.inf] * size
+        self.sums = [0.0] * size
+        self.counts = [0] * size
+        self.lasts = [None] * size
+        self.state = None
+        self.faults = 0
+
+    def add(self, values, state, fault):
+        self.count += 1
+        self.state = state
+        if fault:
+            self.faults += 1
+
+        for index, value in enumerate(values):
+            if value is None or value != value:
+                continue
+            if value < self.minimums[index]:
+                self.minimums[index] = value
+            if value > self.maximums[index]:
+                self.maximums[index] = value
+            self.sums[index] += value
+            self.counts[index] += 1
+            self.lasts[index] = value
+
+    def aggregate(self):
+        statistics = []
+        for index in range(len(MEASUREMENTS)):
+            count = self.counts[index]
+            if count:
+                statistics += [
+                    self.minimums[index],
+                    self.maximums[index],
+                    self.sums[index] / count,
+                    self.lasts[index],
+                    count,
+                ]
+            else:
+                statistics += [None] * (len(STATISTICS) - 1) + [0]
+
+        return Aggregate(
+            self.window, self.start, self.count, *statistics, self.state, self.faults
+        )
+
+
+class Downsampler(object):
+    def __init__(self, callback, windows=DEFAULT_WINDOWS):
+        """
+        Aggregates the snapshots in windows of each length of *windows* (in
+        seconds), aligned on the epoch.
+        The :class:`Aggregate` of a window is passed to *callback* when the
+        first snapshot of the next window arrives, or on :meth:`flush`.
+        It holds the length and start of the window (in seconds), the number
+        of snapshots, the minimum, maximum, mean and last value of each
+        measurement (``None`` if never read) and the number of snapshots in
+        which it was read, the last state code and the number of snapshots
+        with a dynamic fault.
+
+        The downsampler is a callable, so it can be registered as a sink of a
+        :class:`Sampler <pyevactron.sampler.Sampler>`.
+        The timestamps are expected to be non-decreasing.
+        """
+        self._callback = callback
+        self._windows = tuple(sorted(windows))
+        self._buckets = [None] * len(self._windows)
+
+    def __call__(self, snapshot):
+        self.add(
+            snapshot.timestamp,
+            [getattr(snapshot, name) for name in MEASUREMENTS],
+            STATE_CODES.get(id(snapshot.state)),
+            snapshot.dynamic_fault is not None,
+        )
+
+    def add(self, timestamp, values, state, fault=False):
+        """
+        Adds a sample: the *values* of the :data:`MEASUREMENTS` (``None`` or
+        NaN if not read), the state code and whether a fault is present.
+        """
+        for index, window in enumerate(self._windows):
+            start = math.floor(timestamp / window) * window
+            bucket = self._buckets[index]
+            if bucket is not None and bucket.start != start:
+                self._callback(bucket.aggregate())
+                bucket = None
+            if bucket is None:
+                bucket = self._buckets[index] = _Bucket(window, start)
+            bucket.add(values, state, fault)
+
+    def flush(self):
+        """
+        Passes the aggregates of the current windows, possibly incomplete, to
+        the callback.
+        """
+        for index, bucket in enumerate(self._buckets):
+            if bucket is not None:
+                self._callback(bucket.aggregate())
+                self._buckets[index] = None
+
+    @property
+    def windows(self):
+        return self._windows
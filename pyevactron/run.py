@@ -0,0 +1,166 @@
+"""
+Tracking of the cleaning runs started with
+:meth:`EvactronInterface.start_now
+<pyevactron.interface.EvactronInterface.start_now>`.
+"""
+
+# Standard library modules.
+import time
+import logging
+import collections
+import concurrent.futures
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronException, ReadyState
+
+# Globals and constants variables.
+RunSummary = collections.namedtuple(
+    "RunSummary",
+    ["started", "finished", "duration_s", "phases", "cycles", "faults", "last_clean"],
+)
+
+
+class Run(concurrent.futures.Future):
+    def __init__(
+        self, interface, initial_faults=(None, None), start_timeout=30.0, executor=None
+    ):
+        """
+        Future of a cleaning run, resolved with a :class:`RunSummary` when
+        the device returns to the ready state, or failed with the
+        :class:`EvactronFault <pyevactron.interface.EvactronFault>` raised
+        during the run.
+
+        The run is tracked from the snapshots shared by all the waiters of
+        the interface (see :mod:`pyevactron.waiting`), so tracking several
+        runs does not require a thread per run.
+        Use :func:`asyncio.wrap_future` to await the run.
+
+        :arg interface: interface which started the run
+        :arg initial_faults: faults present before the run, which are ignored
+        :arg start_timeout: maximum time for the device to leave the ready
+            state (in seconds)
+        :arg executor: executor on which the device is read when the run
+            finishes, or ``None`` to read it from the thread publishing the
+            snapshots
+        """
+        super().__init__()
+        self.set_running_or_notify_cancel()
+
+        self._interface = interface
+        self._initial_faults = set(f for f in initial_faults if f is not None)
+        self._start_timeout = start_timeout
+        self._executor = executor
+
+        self._started = time.time()
+        self._previous = None
+        self._left_ready = False
+        self._phases = collections.OrderedDict()
+        self._cycles = 0
+        self._faults = []
+        self._exception = None
+        self._finished = None
+
+    def _fail(self, exception):
+        if not self.done():
+            self.set_exception(exception)
+
+    def _update(self, snapshot):
+        """
+        Updates the run with a new snapshot.
+        Returns ``True`` when the run is finished or failed; :meth:`_finish`
+        then resolves the future.
+
+        Called by the :class:`StateMonitor <pyevactron.waiting.StateMonitor>`
+        while holding its lock, so the device is not read here.
+        """
+        if self._exception is not None or self._finished is not None:
+            return True
+        if self.done():
+            return True
+        if snapshot.timestamp < self._started:
+            return False
+
+        previous, self._previous = self._previous, snapshot
+        if previous is not None:
+            elapsed = snapshot.timestamp - previous.timestamp
+            self._phases[previous.state] = (
+                self._phases.get(previous.state, 0.0) + elapsed
+            )
+
+        if snapshot.pressure_Pa is not None:
+            for fault in (snapshot.dynamic_fault, snapshot.latched_fault):
+                if fault is None or fault in self._initial_faults:
+                    continue
+                self._faults.append(fault)
+                self._exception = fault
+                return True
+
+        if snapshot.state is not ReadyState:
+            self._left_ready = True
+            self._cycles = max(self._cycles, snapshot.cycle)
+            return False
+
+        if not self._left_ready:
+            if snapshot.timestamp - self._started > self._start_timeout:
+                self._exception = EvactronException("Run did not start")
+                return True
+            return False
+
+        self._finished = snapshot
+        return True
+
+    def _finish(self, snapshot):
+        """
+        Resolves the future once :meth:`_update` returned ``True``.
+        Called outside the lock of the monitor; the last clean time is read
+        on the executor, if any.
+        """
+        if self._executor is not None:
+            try:
+                self._executor.submit(self._resolve)
+                return
+            except RuntimeError:  # Executor shut down
+                pass
+        self._resolve()
+
+    def _resolve(self):
+        if self.done():
+            return
+        if self._exception is not None:
+            self.set_exception(self._exception)
+            return
+
+        try:
+            last_clean = self._interface.last_clean
+        except Exception:
+            logging.exception("Cannot read last clean time")
+            last_clean = None
+
+        finished = self._finished.timestamp
+        self.set_result(
+            RunSummary(
+                self._started,
+                finished,
+                finished - self._started,
+                dict(self._phases),
+                self._cycles,
+                tuple(self._faults),
+                last_clean,
+            )
+        )
+
+    @property
+    def state(self):
+        """
+        Last state of the device during the run, or ``None``.
+        """
+        return self._previous.state if self._previous is not None else None
+
+    @property
+    def phases(self):
+        """
+        :class:`dict` of the time spent in each state so far (in seconds).
+        """
+        return dict(self._phases)
@@ -0,0 +1,371 @@
+"""
+Background sampling of the device at a fixed rate.
+"""
+
+# Standard library modules.
+import time
+import logging
+import threading
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron._statistics import percentile
+from pyevactron.scheduler import priority, TELEMETRY
+from pyevactron.ringbuffer import TelemetryBuffer, DEFAULT_CAPACITY
+from pyevactron.interface import (
+    StabilizingPressureState,
+    WaitForIgnitionState,
+    CleaningState,
+    PurgingState,
+    PumpDownState,
+    ConfigurationState,
+    _STATES,
+)
+
+# Globals and constants variables.
+ACTIVE_STATES = (
+    StabilizingPressureState,
+    WaitForIgnitionState,
+    CleaningState,
+    PurgingState,
+    PumpDownState,
+)
+"""States during which the measurements change."""
+
+SUSPENDED_STATES = (ConfigurationState,)
+"""States during which the front panel owns the unit."""
+
+SamplerStatistics = collections.namedtuple(
+    "SamplerStatistics",
+    [
+        "samples",
+        "transitions",
+        "errors",
+        "overruns",
+        "skipped",
+        "rate_Hz",
+        "jitter_p50_s",
+        "jitter_p90_s",
+        "jitter_p99_s",
+        "jitter_max_s",
+    ],
+)
+
+
+def adaptive_intervals(active_interval, idle_interval, active_states=ACTIVE_STATES):
+    """
+    Returns per-state intervals for a :class:`Sampler`: *active_interval*
+    for the *active_states* and *idle_interval* for the other states.
+    """
+    return dict(
+        (state, active_interval if state in active_states else idle_interval)
+        for state in _STATES.values()
+    )
+
+
+class Sampler(object):
+    def __init__(
+        self,
+        interface,
+        interval,
+        sinks=(),
+        window=1024,
+        intervals=None,
+        status_interval=None,
+        suspended_states=SUSPENDED_STATES,
+        configuration_interval=None,
+        history=DEFAULT_CAPACITY,
+    ):
+        """
+        Takes snapshots of the device at a fixed rate in a background thread.
+
+        Snapshots are scheduled on absolute deadlines of the monotonic clock,
+        so the period does not drift with the duration of the reads.
+        When a snapshot takes longer than the interval, the missed deadlines
+        are skipped rather than sampled in a burst.
+
+        The interval can depend on the state of the device (see
+        :func:`adaptive_intervals`).
+        The new interval applies as soon as a state transition is read.
+        With a *status_interval*, only the status is read between snapshots,
+        so that transitions are caught quickly even when the interval of the
+        current state is long.
+        In the *suspended_states*, only the status is read; the measurements
+        and faults of the snapshots are ``None``.
+
+        Usually created with
+        :meth:`EvactronInterface.start_sampler
+        <pyevactron.interface.EvactronInterface.start_sampler>`.
+
+        :arg interface: connected interface
+        :arg interval: interval between snapshots (in seconds), for the states
+            not in *intervals*
+        :arg sinks: callables receiving each :class:`Snapshot
+            <pyevactron.interface.Snapshot>`
+        :arg window: number of recent samples used for the rate and jitter
+            statistics
+        :arg intervals: :class:`dict` of the interval between snapshots for
+            each state (in seconds)
+        :arg status_interval: interval between the reads of the status
+            (in seconds), or ``None`` to only read it with the snapshots
+        :arg suspended_states: states during which the measurements are not
+            read
+        :arg configuration_interval: interval between the reads of the
+            plasma configuration (in seconds), or ``None`` to never read it.
+            The configuration is passed to the sinks registered with
+            :meth:`add_configuration_sink`.
+        :arg history: number of snapshots kept in memory in a
+            :class:`TelemetryBuffer <pyevactron.ringbuffer.TelemetryBuffer>`
+            (see :attr:`history`), or ``None`` to keep none
+        """
+        self._interface = interface
+        self._interval = interval
+        self._intervals = dict(intervals or {})
+        self._status_interval = status_interval
+        self._suspended_states = tuple(suspended_states)
+        self._sinks = list(sinks)
+        self._latest = None
+        self._history = TelemetryBuffer(history) if history else None
+        self._state = None
+        self._configuration_interval = configuration_interval
+        self._configuration_sinks = []
+        self._configuration_due = None
+        self._latest_configuration = None
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self._samples = 0
+        self._errors = 0
+        self._overruns = 0
+        self._skipped = 0
+        self._transitions = 0
+        self._starts = collections.deque(maxlen=window)
+        self._jitters = collections.deque(maxlen=window)
+
+    def interval_for(self, state):
+        """
+        Returns the interval between snapshots in *state* (in seconds).
+        """
+        return self._intervals.get(state, self._interval)
+
+    def add_sink(self, sink):
+        """
+        Registers a callable receiving each snapshot.
+        Sinks are called in the sampling thread and should return quickly.
+        """
+        with self._lock:
+            self._sinks = self._sinks + [sink]
+
+    def remove_sink(self, sink):
+        """
+        Unregisters a sink.
+        """
+        with self._lock:
+            self._sinks = [s for s in self._sinks if s is not sink]
+
+    def add_configuration_sink(self, sink):
+        """
+        Registers a callable receiving the :class:`dict` of the plasma
+        configuration each time it is read (see *configuration_interval*).
+        """
+        with self._lock:
+            self._configuration_sinks = self._configuration_sinks + [sink]
+
+    def remove_configuration_sink(self, sink):
+        """
+        Unregisters a configuration sink.
+        """
+        with self._lock:
+            self._configuration_sinks = [
+                s for s in self._configuration_sinks if s is not sink
+            ]
+
+    def _publish_configuration(self, configuration):
+        self._latest_configuration = configuration
+        for sink in self._configuration_sinks:
+            try:
+                sink(configuration)
+            except Exception:
+                logging.exception("Configuration sink %r failed", sink)
+
+    def _publish(self, snapshot):
+        self._latest = snapshot
+        if self._history is not None:
+            self._history.append(snapshot)
+        for sink in self._sinks:
+            try:
+                sink(snapshot)
+            except Exception:
+                logging.exception("Sink %r failed", sink)
+
+    def _run(self):
+        with priority(TELEMETRY):
+            self._loop()
+
+    def _tick(self, deadline, due):
+        """
+        Reads the status and, if due or on a state transition, takes and
+        publishes a snapshot.
+        Returns the deadline of the next snapshot.
+        """
+        timestamp = time.time()
+        status = self._interface._get_status()
+
+        state = status[0]
+        transition = state != self._state
+        self._state = state
+        if transition:
+            self._transitions += 1
+
+        if not transition and deadline < due - 1e-6:
+            return due
+
+        measurements = state not in self._suspended_states
+        snapshot = self._interface._snapshot(timestamp, status, measurements)
+        self._publish(snapshot)
+        self._samples += 1
+
+        if self._configuration_interval is not None and measurements:
+            if self._configuration_due is None or deadline >= self._configuration_due:
+                self._configuration_due = deadline + self._configuration_interval
+                self._publish_configuration(self._interface.configuration())
+
+        return deadline + self.interval_for(state)
+
+    def _loop(self):
+        deadline = due = time.monotonic()
+
+        while True:
+            delay = deadline - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            if self._stop.is_set():
+                break
+
+            start = time.monotonic()
+            try:
+                due = self._tick(deadline, due)
+            except Exception:
+                logging.exception("Cannot take snapshot")
+                self._errors += 1
+                due = deadline + self.interval_for(self._state)
+
+            with self._lock:
+                self._starts.append(start)
+                self._jitters.append(start - deadline)
+
+            period = self._status_interval or self.interval_for(self._state)
+            deadline = min(deadline + period, due)
+
+            end = time.monotonic()
+            if end > deadline:
+                missed = int((end - deadline) // period) + 1
+                self._overruns += 1
+                self._skipped += missed
+                deadline += missed * period
+
+    def start(self):
+        """
+        Starts sampling.
+        """
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="evactron-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and waits for the thread to finish.
+        """
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    @property
+    def interface(self):
+        """
+        Sampled interface.
+        """
+        return self._interface
+
+    @property
+    def interval(self):
+        """
+        Interval between snapshots (in seconds).
+        """
+        return self._interval
+
+    @property
+    def state(self):
+        """
+        Last state read from the device, or ``None``.
+        """
+        return self._state
+
+    @property
+    def latest_configuration(self):
+        """
+        Most recent :class:`dict` of the plasma configuration, or ``None``.
+        """
+        return self._latest_configuration
+
+    @property
+    def latest(self):
+        """
+        Most recent :class:`Snapshot <pyevactron.interface.Snapshot>`, or
+        ``None``.
+        """
+        return self._latest
+
+    @property
+    def history(self):
+        """
+        :class:`TelemetryBuffer <pyevactron.ringbuffer.TelemetryBuffer>` of
+        the recent snapshots, or ``None``.
+        """
+        return self._history
+
+    def statistics(self):
+        """
+        Returns the :class:`SamplerStatistics`: the number of samples, state
+        transitions, errors, overruns (reads longer than the interval) and
+        skipped deadlines, as well as the achieved rate and the percentiles of
+        the jitter (delay between the deadline and the start of a read) over
+        the recent reads.
+        """
+        with self._lock:
+            starts = list(self._starts)
+            jitters = sorted(self._jitters)
+
+        rate = float("nan")
+        if len(starts) > 1 and starts[-1] > starts[0]:
+            rate = (len(starts) - 1) / (starts[-1] - starts[0])
+
+        return SamplerStatistics(
+            self._samples,
+            self._transitions,
+            self._errors,
+            self._overruns,
+            self._skipped,
+            rate,
+            percentile(jitters, 50),
+            percentile(jitters, 90),
+            percentile(jitters, 99),
+            jitters[-1] if jitters else float("nan"),
+        )
@@ -0,0 +1,293 @@
+"""
+Priority scheduling of the calls to the device.
+
+All calls are executed by a single worker thread, which always runs the
+pending call of the highest priority class next.
+A control command therefore waits at most for the call in flight, however
+many telemetry reads are queued.
+"""
+
+# Standard library modules.
+import time
+import threading
+import contextlib
+import collections
+import concurrent.futures
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronException, _DLLProxy
+from pyevactron._statistics import percentile
+
+# Globals and constants variables.
+CONTROL = 0
+CONFIGURATION = 1
+INTERACTIVE = 2
+TELEMETRY = 3
+
+PRIORITY_NAMES = {
+    CONTROL: "control",
+    CONFIGURATION: "configuration",
+    INTERACTIVE: "interactive",
+    TELEMETRY: "telemetry",
+}
+
+_FUNCTION_PRIORITIES = {
+    "evbEnableUnit": CONTROL,
+    "evbClearFaults": CONTROL,
+    "evbStartNow": CONTROL,
+    "evbDisconnect": CONTROL,
+    "evbEnablePurge": CONFIGURATION,
+}
+
+PriorityStatistics = collections.namedtuple(
+    "PriorityStatistics",
+    [
+        "submitted",
+        "completed",
+        "rejected",
+        "pending",
+        "wait_p50_s",
+        "wait_p99_s",
+        "wait_max_s",
+        "latency_p50_s",
+        "latency_p99_s",
+        "latency_max_s",
+    ],
+)
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def priority(level):
+    """
+    Context manager setting the priority class of the calls made by the
+    current thread, for functions without a fixed priority::
+
+        >>> with priority(CONTROL):
+        ...     ev.pressure_Pa
+    """
+    previous = getattr(_local, "priority", None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def current_priority(default=INTERACTIVE):
+    """
+    Returns the priority class of the current thread.
+    """
+    level = getattr(_local, "priority", None)
+    return default if level is None else level
+
+
+def function_priority(name):
+    """
+    Returns the fixed priority class of a function of the library, or
+    ``None`` if it depends on the calling thread.
+    Control functions (enable, clear faults, start) have the highest
+    priority, followed by the configuration setters.
+    """
+    if name in _FUNCTION_PRIORITIES:
+        return _FUNCTION_PRIORITIES[name]
+    if name.startswith("evbSet"):
+        return CONFIGURATION
+    return None
+
+
+class _Command(object):
+    __slots__ = ("func", "args", "future", "submitted")
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.future = concurrent.futures.Future()
+        self.submitted = time.monotonic()
+
+
+class CommandScheduler(object):
+    def __init__(self, maxsize=64, window=1024):
+        """
+        Executes commands on a worker thread by priority class:
+        :data:`CONTROL` > :data:`CONFIGURATION` > :data:`INTERACTIVE` >
+        :data:`TELEMETRY`.
+        Commands of the same class are executed in submission order.
+
+        :arg maxsize: maximum number of pending commands per class, either an
+            :class:`int` or a :class:`dict` keyed by class
+        :arg window: number of recent commands per class used for the latency
+            statistics
+        """
+        if not isinstance(maxsize, dict):
+            maxsize = dict.fromkeys(PRIORITY_NAMES, maxsize)
+        self._maxsize = maxsize
+
+        self._queues = dict((level, collections.deque()) for level in PRIORITY_NAMES)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self._submitted = collections.Counter()
+        self._completed = collections.Counter()
+        self._rejected = collections.Counter()
+        self._waits = dict(
+            (level, collections.deque(maxlen=window)) for level in PRIORITY_NAMES
+        )
+        self._latencies = dict(
+            (level, collections.deque(maxlen=window)) for level in PRIORITY_NAMES
+        )
+
+    def submit(self, func, *args, priority=INTERACTIVE):
+        """
+        Queues the command ``func(*args)`` and returns a
+        :class:`concurrent.futures.Future` of its result.
+
+        :raise EvactronException: if the queue of the priority class is full
+            or the scheduler is not running
+        """
+        command = _Command(func, args)
+
+        with self._condition:
+            if not self._running:
+                raise EvactronException("Scheduler is not running")
+
+            queue = self._queues[priority]
+            maxsize = self._maxsize.get(priority)
+            if maxsize is not None and len(queue) >= maxsize:
+                self._rejected[priority] += 1
+                raise EvactronException(
+                    "Queue of %s commands is full" % PRIORITY_NAMES[priority]
+                )
+
+            queue.append(command)
+            self._submitted[priority] += 1
+            self._condition.notify()
+
+        return command.future
+
+    def call(self, func, *args, priority=INTERACTIVE):
+        """
+        Executes the command ``func(*args)`` and returns its result.
+        When called from the worker thread, the command is executed directly.
+        """
+        if threading.current_thread() is self._thread:
+            return func(*args)
+        return self.submit(func, *args, priority=priority).result()
+
+    def _next(self):
+        with self._condition:
+            while True:
+                for level in sorted(self._queues):
+                    queue = self._queues[level]
+                    if queue:
+                        return level, queue.popleft()
+
+                if not self._running:
+                    return None, None
+
+                self._condition.wait()
+
+    def _run(self):
+        while True:
+            level, command = self._next()
+            if command is None:
+                break
+
+            if not command.future.set_running_or_notify_cancel():
+                continue
+
+            start = time.monotonic()
+            try:
+                result = command.func(*command.args)
+            except BaseException as ex:
+                command.future.set_exception(ex)
+            else:
+                command.future.set_result(result)
+            end = time.monotonic()
+
+            with self._condition:
+                self._completed[level] += 1
+                self._waits[level].append(start - command.submitted)
+                self._latencies[level].append(end - command.submitted)
+
+    def start(self):
+        """
+        Starts the worker thread.
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = threading.Thread(
+            target=self._run, name="evactron-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Executes the pending commands and stops the worker thread.
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def statistics(self):
+        """
+        Returns a :class:`dict` of :class:`PriorityStatistics` keyed by the
+        name of the priority class, with the number of commands and the
+        percentiles of their waiting time in the queue and of their total
+        latency (from submission to completion).
+        """
+        statistics = {}
+        with self._condition:
+            for level, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[level])
+                latencies = sorted(self._latencies[level])
+                statistics[name] = PriorityStatistics(
+                    self._submitted[level],
+                    self._completed[level],
+                    self._rejected[level],
+                    len(self._queues[level]),
+                    percentile(waits, 50),
+                    percentile(waits, 99),
+                    waits[-1] if waits else float("nan"),
+                    percentile(latencies, 50),
+                    percentile(latencies, 99),
+                    latencies[-1] if latencies else float("nan"),
+                )
+        return statistics
+
+
+class _ScheduledDLL(_DLLProxy):
+    """
+    Routes the calls to the library through a :class:`CommandScheduler`.
+    """
+
+    def __init__(self, dll, scheduler):
+        super().__init__(dll)
+        self._scheduler = scheduler
+
+    def _wrap(self, name, func):
+        scheduler = self._scheduler
+        fixed = function_priority(name)
+
+        def wrapper(*args):
+            level = fixed if fixed is not None else current_priority()
+            return scheduler.call(func, *args, priority=level)
+
+        return wrapper
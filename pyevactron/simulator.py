@@ -0,0 +1,461 @@
+""""""
+
+# Standard library modules.
+import time
+import math
+import datetime
+import threading
+import functools
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EVR_OK, EVR_COMMANDIGNORED
+
+# Globals and constants variables.
+EVR_SIMULATEDERROR = -1
+
+
+def _value(arg):
+    return getattr(arg, "value", arg)
+
+
+def _store(ref, value):
+    ref._obj.value = value
+
+
+def _simulated(func):
+    """
+    Decorator for the simulated ``evb*`` functions.
+    It applies the communication latency, counts the calls and checks that
+    the handle is connected.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.calls[func.__name__] += 1
+
+            if not self.link_up:
+                self.connected = False
+            if func.__name__ not in _UNCONNECTED_FUNCTIONS:
+                if not self.connected or _value(args[0]) != self.handle:
+                    return EVR_SIMULATEDERROR
+
+            self._advance()
+            return func(self, *args)
+
+    return wrapper
+
+
+_UNCONNECTED_FUNCTIONS = frozenset(["evbConnect", "evbIsConnected", "evbGetDLLVersion"])
+
+
+class SimulatedDLL(object):
+    """
+    Pure Python stand-in for the EvactronComm DLL.
+    It implements the ``evb*`` functions used by
+    :class:`EvactronInterface <pyevactron.interface.EvactronInterface>` with
+    the same calling convention (outputs passed with :func:`ctypes.byref`),
+    so the interface can be used on any platform, without the device.
+
+    The attributes of the simulated device (e.g. :attr:`state`,
+    :attr:`pressure_Torr`) can be modified directly.
+    Setting :attr:`link_up` to ``False`` simulates the loss of the serial
+    link: all calls fail until it is restored and the device reconnected.
+    A run started with ``evbStartNow`` goes through the states of each
+    cycle, pumps down and returns to the ready state, with durations divided
+    by *time_scale*.
+    """
+
+    def __init__(self, latency=0.0, clock_offset=0.0, time_scale=1.0):
+        """
+        :arg latency: duration of each call (in seconds)
+        :arg clock_offset: offset of the device clock relative to the host
+            clock (in seconds)
+        :arg time_scale: speed-up factor of the runs
+        """
+        self.latency = latency
+        self.clock_offset = clock_offset
+        self.time_scale = time_scale
+
+        self.handle = 1
+        self.connected = False
+        self.link_up = True
+        self.enabled = True
+        self.calls = collections.Counter()
+
+        self.state = 10
+        self.cycle = 0
+        self.units = 0
+        self.timer = datetime.time(0, 0, 0)
+        self.last_clean = datetime.datetime(2020, 1, 1, 12, 0, 0)
+
+        self.pressure_Torr = 0.4
+        self.forward_power_W = 0.0
+        self.reverse_power_W = 0.0
+        self.metering_valve_voltage_V = 0.0
+
+        self.dynamic_fault = 0
+        self.latched_fault = 0
+
+        self.cycles = 1
+        self.ignite_pressure_setpoint_Torr = 0.5
+        self.plasma_pressure_setpoint_Torr = 0.4
+        self.plasma_power_setpoint_W = 14.0
+        self.plasma_time = datetime.time(0, 2, 0)
+        self.purge = True
+        self.purge_pressure_setpoint_Torr = 0.6
+        self.purge_time = datetime.time(0, 0, 30)
+
+        self.stabilizing_time_s = 5.0
+        self.ignition_time_s = 2.0
+        self.pumpdown_time_s = 20.0
+        self.pumpdown_time_constant_s = 4.0
+        self.base_pressure_Torr = 0.01
+
+        self._schedule = None
+        self._run_start = None
+        self._lock = threading.RLock()
+
+    # - Run
+
+    def _build_schedule(self):
+        def seconds(t):
+            return t.hour * 3600 + t.minute * 60 + t.second
+
+        schedule = []
+        for cycle in range(1, self.cycles + 1):
+            schedule.append((11, cycle, self.stabilizing_time_s))
+            schedule.append((12, cycle, self.ignition_time_s))
+            schedule.append((13, cycle, seconds(self.plasma_time)))
+            if self.purge:
+                schedule.append((14, cycle, seconds(self.purge_time)))
+        schedule.append((15, self.cycles, self.pumpdown_time_s))
+        return schedule
+
+    def _advance(self):
+        """
+        Updates the state and measurements of the run in progress.
+        """
+        if self._run_start is None:
+            return
+
+        elapsed = (time.monotonic() - self._run_start) * self.time_scale
+        for state, cycle, duration in self._schedule:
+            if elapsed < duration:
+                break
+            elapsed -= duration
+        else:
+            self._run_start = None
+            self.state = 10
+            self.timer = datetime.time(0, 0, 0)
+            self.forward_power_W = self.reverse_power_W = 0.0
+            return
+
+        if state == 13 and self.state != 13:
+            self.last_clean = self.device_now().replace(microsecond=0)
+
+        self.state = state
+        self.cycle = cycle
+
+        remaining = int(math.ceil(duration - elapsed)) if state in (13, 14) else 0
+        self.timer = datetime.time(
+            remaining // 3600, remaining // 60 % 60, remaining % 60
+        )
+
+        plasma = state == 13
+        self.forward_power_W = self.plasma_power_setpoint_W if plasma else 0.0
+        self.reverse_power_W = 0.5 if plasma else 0.0
+
+        if state == 11:
+            self.pressure_Torr = self.ignite_pressure_setpoint_Torr
+        elif state in (12, 13):
+            self.pressure_Torr = self.plasma_pressure_setpoint_Torr
+        elif state == 14:
+            self.pressure_Torr = self.purge_pressure_setpoint_Torr
+        elif state == 15:
+            decay = math.exp(-elapsed / self.pumpdown_time_constant_s)
+            self.pressure_Torr = self.base_pressure_Torr + decay * (
+                self.purge_pressure_setpoint_Torr - self.base_pressure_Torr
+            )
+
+    @_simulated
+    def evbStartNow(self, handle):
+        if not self.enabled or self.state != 10 or self.latched_fault:
+            return EVR_COMMANDIGNORED
+        self._schedule = self._build_schedule()
+        self._run_start = time.monotonic()
+        self._advance()
+        return EVR_OK
+
+    # - Device clock
+
+    def device_now(self):
+        """
+        Returns the current time of the device clock, as a
+        :class:`datetime.datetime`.
+        """
+        return datetime.datetime.fromtimestamp(time.time() + self.clock_offset)
+
+    def _set_device_now(self, dt):
+        timestamp = time.mktime(dt.timetuple()) + dt.microsecond * 1e-6
+        self.clock_offset = timestamp - time.time()
+
+    # - Connection
+
+    @_simulated
+    def evbConnect(self, comm_port, retval):
+        if not self.link_up:
+            _store(retval, EVR_SIMULATEDERROR)
+            return 0
+        self.connected = True
+        _store(retval, EVR_OK)
+        return self.handle
+
+    @_simulated
+    def evbDisconnect(self, handle):
+        self.connected = False
+        return EVR_OK
+
+    @_simulated
+    def evbIsConnected(self, handle, retval):
+        _store(retval, EVR_OK)
+        return int(self.connected and _value(handle) == self.handle)
+
+    @_simulated
+    def evbEnableUnit(self, handle, enable):
+        self.enabled = bool(_value(enable))
+        return EVR_OK
+
+    # - Faults
+
+    @_simulated
+    def evbGetFaults(self, handle, latched, dynamic):
+        _store(latched, self.latched_fault)
+        _store(dynamic, self.dynamic_fault)
+        return EVR_OK
+
+    @_simulated
+    def evbClearFaults(self, handle):
+        if not self.latched_fault:
+            return EVR_COMMANDIGNORED
+        if not self.dynamic_fault:
+            self.latched_fault = 0
+        return EVR_OK
+
+    # - Read only
+
+    @_simulated
+    def evbGetStatusEx(self, handle, state, cycle, hour, minute, second, units, status):
+        _store(state, self.state)
+        _store(cycle, self.cycle)
+        _store(hour, self.timer.hour)
+        _store(minute, self.timer.minute)
+        _store(second, self.timer.second)
+        _store(units, self.units)
+        _store(status, int(self.enabled))
+        return EVR_OK
+
+    @_simulated
+    def evbGetDLLVersion(self, major, minor):
+        _store(major, 1)
+        _store(minor, 0)
+        return EVR_OK
+
+    @_simulated
+    def evbGetFirmwareVersion(self, handle, major, minor):
+        _store(major, 1)
+        _store(minor, 0)
+        return EVR_OK
+
+    @_simulated
+    def evbGetApplicationVersion(self, handle, major, minor):
+        _store(major, 1)
+        _store(minor, 0)
+        return EVR_OK
+
+    @_simulated
+    def evbGetLastCleanTime(self, handle, month, day, year, hour, minute, second):
+        dt = self.last_clean
+        _store(month, dt.month)
+        _store(day, dt.day)
+        _store(year, dt.year)
+        _store(hour, dt.hour)
+        _store(minute, dt.minute)
+        _store(second, dt.second)
+        return EVR_OK
+
+    @_simulated
+    def evbGetPressure(self, handle, pressure):
+        _store(pressure, self.pressure_Torr)
+        return EVR_OK
+
+    @_simulated
+    def evbGetForwardPower(self, handle, power):
+        _store(power, self.forward_power_W)
+        return EVR_OK
+
+    @_simulated
+    def evbGetReversePower(self, handle, power):
+        _store(power, self.reverse_power_W)
+        return EVR_OK
+
+    @_simulated
+    def evbGetMeteringValveVoltage(self, handle, voltage):
+        _store(voltage, self.metering_valve_voltage_V)
+        return EVR_OK
+
+    @_simulated
+    def evbGetRunTimer(self, handle, hour, minute, second):
+        _store(hour, self.timer.hour)
+        _store(minute, self.timer.minute)
+        _store(second, self.timer.second)
+        return EVR_OK
+
+    # - General configuration
+
+    @_simulated
+    def evbGetDate(self, handle, month, day, year):
+        dt = self.device_now()
+        _store(month, dt.month)
+        _store(day, dt.day)
+        _store(year, dt.year)
+        return EVR_OK
+
+    @_simulated
+    def evbGetTime(self, handle, hour, minute, second):
+        dt = self.device_now()
+        _store(hour, dt.hour)
+        _store(minute, dt.minute)
+        _store(second, dt.second)
+        return EVR_OK
+
+    @_simulated
+    def evbSetDate(self, handle, month, day, year):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        dt = self.device_now().replace(
+            year=_value(year), month=_value(month), day=_value(day)
+        )
+        self._set_device_now(dt)
+        return EVR_OK
+
+    @_simulated
+    def evbSetTime(self, handle, hour, minute, second):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        dt = self.device_now().replace(
+            hour=_value(hour),
+            minute=_value(minute),
+            second=_value(second),
+            microsecond=0,
+        )
+        self._set_device_now(dt)
+        return EVR_OK
+
+    # - Plasma configuration
+
+    @_simulated
+    def evbGetCycleCount(self, handle, cycles):
+        _store(cycles, self.cycles)
+        return EVR_OK
+
+    @_simulated
+    def evbSetCycleCount(self, handle, cycles):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.cycles = _value(cycles)
+        return EVR_OK
+
+    @_simulated
+    def evbGetIgnitePressureSetpoint(self, handle, pressure):
+        _store(pressure, self.ignite_pressure_setpoint_Torr)
+        return EVR_OK
+
+    @_simulated
+    def evbSetIgnitePressureSetpoint(self, handle, pressure):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.ignite_pressure_setpoint_Torr = _value(pressure)
+        return EVR_OK
+
+    @_simulated
+    def evbGetPlasmaPressureSetpoint(self, handle, pressure):
+        _store(pressure, self.plasma_pressure_setpoint_Torr)
+        return EVR_OK
+
+    @_simulated
+    def evbSetPlasmaPressureSetpoint(self, handle, pressure):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.plasma_pressure_setpoint_Torr = _value(pressure)
+        return EVR_OK
+
+    @_simulated
+    def evbGetPlasmaPowerSetpoint(self, handle, power):
+        _store(power, self.plasma_power_setpoint_W)
+        return EVR_OK
+
+    @_simulated
+    def evbSetPlasmaPowerSetpoint(self, handle, power):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.plasma_power_setpoint_W = _value(power)
+        return EVR_OK
+
+    @_simulated
+    def evbGetPlasmaTime(self, handle, hour, minute, second):
+        _store(hour, self.plasma_time.hour)
+        _store(minute, self.plasma_time.minute)
+        _store(second, self.plasma_time.second)
+        return EVR_OK
+
+    @_simulated
+    def evbSetPlasmaTime(self, handle, hour, minute, second):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.plasma_time = datetime.time(_value(hour), _value(minute), _value(second))
+        return EVR_OK
+
+    @_simulated
+    def evbGetPurgeEnable(self, handle, enabled):
+        _store(enabled, int(self.purge))
+        return EVR_OK
+
+    @_simulated
+    def evbEnablePurge(self, handle, enabled):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.purge = bool(_value(enabled))
+        return EVR_OK
+
+    @_simulated
+    def evbGetPurgePressureSetpoint(self, handle, pressure):
+        _store(pressure, self.purge_pressure_setpoint_Torr)
+        return EVR_OK
+
+    @_simulated
+    def evbSetPurgePressureSetpoint(self, handle, pressure):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.purge_pressure_setpoint_Torr = _value(pressure)
+        return EVR_OK
+
+    @_simulated
+    def evbGetPurgeTime(self, handle, hour, minute, second):
+        _store(hour, self.purge_time.hour)
+        _store(minute, self.purge_time.minute)
+        _store(second, self.purge_time.second)
+        return EVR_OK
+
+    @_simulated
+    def evbSetPurgeTime(self, handle, hour, minute, second):
+        if self.enabled:
+            return EVR_COMMANDIGNORED
+        self.purge_time = datetime.time(_value(hour), _value(minute), _value(second))
+        return EVR_OK
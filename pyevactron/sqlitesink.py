@@ -0,0 +1,631 @@
+"""
+SQLite history of the telemetry of the devices.
+
+The :class:`SQLiteSink` records the snapshots, the state transitions, the
+faults and the changes of the plasma configuration of the units in an SQLite
+database in WAL mode.
+The sampler only appends to a bounded queue; a background thread inserts the
+rows in batches, once enough of them are queued or the oldest is old enough,
+so a slow disk never delays the sampling.
+
+Optionally, the snapshots are also aggregated in tiers of time windows (see
+:mod:`pyevactron.rollup`), which are kept after the raw snapshots are
+compacted, and :func:`query_history` reads the coarsest tier adequate for a
+time range.
+"""
+
+# Standard library modules.
+import math
+import time
+import logging
+import sqlite3
+import threading
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.events import (
+    ChangeDetector,
+    StateChanged,
+    FaultRaised,
+    FaultCleared,
+    SetpointChanged,
+)
+from pyevactron.ringbuffer import STATE_CODES, FAULT_CODES, UNKNOWN
+from pyevactron.rollup import Downsampler, Aggregate, MEASUREMENTS
+
+# Globals and constants variables.
+SQLiteSinkStatistics = collections.namedtuple(
+    "SQLiteSinkStatistics",
+    ["received", "written", "dropped", "pending", "batches", "purged", "compacted"],
+)
+
+History = collections.namedtuple("History", ["window", "columns", "rows"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    port INTEGER NOT NULL,
+    time REAL NOT NULL,
+    state INTEGER,
+    cycle INTEGER,
+    time_remaining_s INTEGER,
+    pressure_Pa REAL,
+    forward_power_W REAL,
+    reverse_power_W REAL,
+    metering_valve_voltage_V REAL,
+    dynamic_fault INTEGER,
+    latched_fault INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_port_time ON snapshots (port, time);
+
+CREATE TABLE IF NOT EXISTS transitions (
+    port INTEGER NOT NULL,
+    time REAL NOT NULL,
+    previous_state INTEGER,
+    state INTEGER
+);
+CREATE INDEX IF NOT EXISTS transitions_port_time ON transitions (port, time);
+
+CREATE TABLE IF NOT EXISTS faults (
+    port INTEGER NOT NULL,
+    time REAL NOT NULL,
+    fault INTEGER NOT NULL,
+    latched INTEGER NOT NULL,
+    raised INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS faults_port_time ON faults (port, time);
+
+CREATE TABLE IF NOT EXISTS configuration (
+    port INTEGER NOT NULL,
+    time REAL NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    external INTEGER
+);
+CREATE INDEX IF NOT EXISTS configuration_port_time ON configuration (port, time);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    port INTEGER NOT NULL,
+    %s
+);
+CREATE UNIQUE INDEX IF NOT EXISTS rollups_port_window_time
+    ON rollups (port, window, time);
+""" % ",\n    ".join(
+    ["window REAL NOT NULL", "time REAL NOT NULL", "count INTEGER NOT NULL"]
+    + [
+        "%s %s" % (name, "INTEGER" if name.endswith("_count") else "REAL")
+        for name in Aggregate._fields[3:-2]
+    ]
+    + ["state INTEGER", "faults INTEGER"]
+)
+"""Tables of the database. States and faults are stored as the codes of the
+DLL. The ``time`` of a rollup is the start of its window."""
+
+TABLES = ("snapshots", "transitions", "faults", "configuration")
+
+_INSERTS = {
+    "snapshots": "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "transitions": "INSERT INTO transitions VALUES (?, ?, ?, ?)",
+    "faults": "INSERT INTO faults VALUES (?, ?, ?, ?, ?)",
+    "configuration": "INSERT INTO configuration VALUES (?, ?, ?, ?, ?)",
+    "rollups": "INSERT INTO rollups VALUES (%s) "
+    "ON CONFLICT (port, window, time) DO UPDATE SET %s"
+    % (
+        ", ".join(["?"] * (len(Aggregate._fields) + 1)),
+        ", ".join(
+            ["count = count + excluded.count"]
+            + [
+                "{0}_min = coalesce(min({0}_min, excluded.{0}_min), {0}_min, "
+                "excluded.{0}_min)".format(name)
+                for name in MEASUREMENTS
+            ]
+            + [
+                "{0}_max = coalesce(max({0}_max, excluded.{0}_max), {0}_max, "
+                "excluded.{0}_max)".format(name)
+                for name in MEASUREMENTS
+            ]
+            + [
+                "{0}_mean = coalesce(({0}_mean * {0}_count + excluded.{0}_mean * "
+                "excluded.{0}_count) / ({0}_count + excluded.{0}_count), "
+                "{0}_mean, excluded.{0}_mean)".format(name)
+                for name in MEASUREMENTS
+            ]
+            + [
+                "{0}_count = {0}_count + excluded.{0}_count".format(name)
+                for name in MEASUREMENTS
+            ]
+            + [
+                "{0}_last = coalesce(excluded.{0}_last, {0}_last)".format(name)
+                for name in MEASUREMENTS
+            ]
+            + [
+                "state = coalesce(excluded.state, state)",
+                "faults = faults + excluded.faults",
+            ]
+        ),
+    ),
+}
+"""Inserts of the rows of each table. A rollup of a window already recorded,
+e.g. an incomplete window written on close, is merged into it."""
+
+_REPLACE_ROLLUPS = "INSERT OR REPLACE INTO rollups VALUES (%s)" % ", ".join(
+    ["?"] * (len(Aggregate._fields) + 1)
+)
+
+
+def _fault_code(fault):
+    return None if fault is None else FAULT_CODES.get(id(fault), UNKNOWN)
+
+
+class _Recorder(ChangeDetector):
+    """
+    Change detector of one unit, run in the thread of the sink, which turns
+    the events into rows.
+    """
+
+    def __init__(self, interface, rollups):
+        super().__init__(interface)
+        self.port = interface._comm_port
+        self.rows = []
+        self.downsampler = None
+        if rollups:
+            self.downsampler = Downsampler(self._rollup, rollups)
+
+    def _rollup(self, aggregate):
+        self.rows.append(("rollups", (self.port,) + aggregate))
+
+    def publish(self, event):
+        port = self.port
+        if isinstance(event, StateChanged):
+            self.rows.append(
+                (
+                    "transitions",
+                    (
+                        port,
+                        event.timestamp,
+                        STATE_CODES.get(id(event.previous)),
+                        STATE_CODES.get(id(event.state)),
+                    ),
+                )
+            )
+        elif isinstance(event, (FaultRaised, FaultCleared)):
+            raised = isinstance(event, FaultRaised)
+            self.rows.append(
+                (
+                    "faults",
+                    (
+                        port,
+                        event.timestamp,
+                        _fault_code(event.fault),
+                        int(event.latched),
+                        int(raised),
+                    ),
+                )
+            )
+        elif isinstance(event, SetpointChanged):
+            self.rows.append(
+                (
+                    "configuration",
+                    (
+                        port,
+                        event.timestamp,
+                        event.name,
+                        str(event.value),
+                        int(event.external),
+                    ),
+                )
+            )
+
+    def snapshot(self, snapshot):
+        t = snapshot.time_remaining
+        self.rows.append(
+            (
+                "snapshots",
+                (
+                    self.port,
+                    snapshot.timestamp,
+                    STATE_CODES.get(id(snapshot.state)),
+                    snapshot.cycle,
+                    t.hour * 3600 + t.minute * 60 + t.second,
+                    snapshot.pressure_Pa,
+                    snapshot.forward_power_W,
+                    snapshot.reverse_power_W,
+                    snapshot.metering_valve_voltage_V,
+                    _fault_code(snapshot.dynamic_fault),
+                    _fault_code(snapshot.latched_fault),
+                ),
+            )
+        )
+        self(snapshot)
+        if self.downsampler is not None:
+            self.downsampler(snapshot)
+
+    def configuration(self, timestamp, configuration):
+        # The first configuration is recorded as is, the next ones as changes
+        if self._configuration is None:
+            for name, value in sorted(configuration.items()):
+                self.rows.append(
+                    ("configuration", (self.port, timestamp, name, str(value), None))
+                )
+        self.update_configuration(configuration, timestamp)
+
+
+class _Unit(object):
+    def __init__(self, sink, interface):
+        self.sink = sink
+        self.recorder = _Recorder(interface, sink._rollups)
+
+    def __call__(self, snapshot):
+        self.sink._put((self.recorder.snapshot, snapshot))
+
+    def configuration(self, configuration):
+        self.sink._put((self.recorder.configuration, time.time(), dict(configuration)))
+
+
+class SQLiteSink(object):
+    def __init__(
+        self,
+        filepath,
+        batch_size=500,
+        max_age=1.0,
+        maxsize=100000,
+        retention=None,
+        retention_interval=3600.0,
+        rollups=None,
+        raw_retention=None,
+    ):
+        """
+        Records the telemetry of the units in the SQLite database
+        *filepath* (see :data:`SCHEMA`), from a background thread.
+        The units are added with :meth:`add_unit`.
+
+        :arg batch_size: number of queued items triggering an insert
+        :arg max_age: maximum time an item stays queued (in seconds)
+        :arg maxsize: maximum number of queued items; when the queue is full,
+            the oldest item is discarded
+        :arg retention: age after which the rows are deleted (in seconds),
+            or ``None`` to keep them
+        :arg retention_interval: interval between the deletions of the old
+            rows (in seconds)
+        :arg rollups: lengths of the windows in which the snapshots are
+            aggregated (in seconds), e.g.
+            :data:`DEFAULT_WINDOWS <pyevactron.rollup.DEFAULT_WINDOWS>`, or
+            ``None``. The rollups are not subject to the *retention*.
+        :arg raw_retention: age after which the snapshots are compacted
+            into the rollups (in seconds): their windows are aggregated again
+            and the snapshots are deleted
+        """
+        if raw_retention is not None and not rollups:
+            raise ValueError("Compaction requires rollups")
+
+        self._filepath = filepath
+        self._batch_size = batch_size
+        self._max_age = max_age
+        self._retention = retention
+        self._retention_interval = retention_interval
+        self._rollups = tuple(sorted(rollups)) if rollups else ()
+        self._raw_retention = raw_retention
+
+        self._condition = threading.Condition()
+        self._queue = collections.deque(maxlen=maxsize)
+        self._oldest = None
+        self._units = {}
+        self._removed = []
+        self._closed = False
+        self._flushing = 0
+
+        self._received = 0
+        self._done = 0
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+        self._purged = 0
+        self._compacted = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="evactron-sqlite", daemon=True
+        )
+        self._thread.start()
+
+    def add_unit(self, interface):
+        """
+        Records the unit of *interface*, whose sampler must be running.
+        The configuration is only recorded if the sampler has a
+        ``configuration_interval``.
+        """
+        sampler = interface.sampler
+        if sampler is None:
+            raise ValueError("Sampler of port %s is not running" % interface._comm_port)
+
+        unit = _Unit(self, interface)
+        with self._condition:
+            self._units[interface._comm_port] = unit
+        sampler.add_sink(unit)
+        sampler.add_configuration_sink(unit.configuration)
+
+    def remove_unit(self, interface):
+        with self._condition:
+            unit = self._units.pop(interface._comm_port)
+            self._removed.append(unit)
+
+        if interface.sampler is not None:
+            interface.sampler.remove_sink(unit)
+            interface.sampler.remove_configuration_sink(unit.configuration)
+
+    def _put(self, item):
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self._dropped += 1
+                self._done += 1
+            if not self._queue:
+                self._oldest = time.monotonic()
+                self._condition.notify_all()
+            self._queue.append(item)
+            self._received += 1
+            if len(self._queue) >= self._batch_size:
+                self._condition.notify_all()
+
+    def _take(self, deadline):
+        """
+        Waits until a batch is due, or until the monotonic time *deadline*,
+        and returns the queued items.
+        """
+        with self._condition:
+            while not self._closed:
+                if len(self._queue) >= self._batch_size:
+                    break
+                if self._queue and self._flushing:
+                    break
+
+                now = time.monotonic()
+                delay = None
+                if self._queue:
+                    delay = self._oldest + self._max_age - now
+                if deadline is not None:
+                    delay = (
+                        deadline - now if delay is None else min(delay, deadline - now)
+                    )
+                if delay is not None and delay <= 0:
+                    break
+                self._condition.wait(delay)
+
+            items = list(self._queue)
+            self._queue.clear()
+            return items
+
+    def _insert(self, connection, items):
+        rows = collections.defaultdict(list)
+        for item in items:
+            method, args = item[0], item[1:]
+            recorder = method.__self__
+            method(*args)
+            for table, row in recorder.rows:
+                rows[table].append(row)
+            recorder.rows.clear()
+
+        with connection:
+            for table, values in rows.items():
+                connection.executemany(_INSERTS[table], values)
+
+        with self._condition:
+            self._written += sum(len(values) for values in rows.values())
+            self._batches += 1
+
+    def _purge(self, connection):
+        limit = time.time() - self._retention
+        purged = 0
+        with connection:
+            for table in TABLES:
+                cursor = connection.execute(
+                    "DELETE FROM %s WHERE time < ?" % table, (limit,)
+                )
+                purged += cursor.rowcount
+
+        with self._condition:
+            self._purged += purged
+
+    def _compact(self, connection):
+        """
+        Aggregates the snapshots older than the raw retention, up to the
+        start of a window of the coarsest tier, and deletes them.
+        The raw snapshots hold all the snapshots of these windows, so their
+        aggregates replace the rollups, possibly incomplete, of the same
+        windows.
+        """
+        coarsest = self._rollups[-1]
+        limit = time.time() - self._raw_retention
+        limit = math.floor(limit / coarsest) * coarsest
+
+        ports = connection.execute(
+            "SELECT DISTINCT port FROM snapshots WHERE time < ?", (limit,)
+        ).fetchall()
+        for (port,) in ports:
+            rows = []
+            downsampler = Downsampler(
+                lambda aggregate: rows.append((port,) + aggregate), self._rollups
+            )
+            cursor = connection.execute(
+                "SELECT time, %s, state, dynamic_fault FROM snapshots "
+                "WHERE port = ? AND time < ? ORDER BY time" % ", ".join(MEASUREMENTS),
+                (port, limit),
+            )
+            for row in cursor:
+                downsampler.add(row[0], row[1:-2], row[-2], row[-1] is not None)
+            downsampler.flush()
+
+            with connection:
+                connection.executemany(_REPLACE_ROLLUPS, rows)
+                cursor = connection.execute(
+                    "DELETE FROM snapshots WHERE port = ? AND time < ?", (port, limit)
+                )
+
+            with self._condition:
+                self._compacted += cursor.rowcount
+
+    def _maintain(self, connection):
+        if self._raw_retention is not None:
+            try:
+                self._compact(connection)
+            except Exception:
+                logging.exception("Cannot compact snapshots")
+
+        if self._retention is not None:
+            try:
+                self._purge(connection)
+            except Exception:
+                logging.exception("Cannot delete old rows")
+
+    def _run(self):
+        connection = sqlite3.connect(self._filepath)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+
+        next_purge = time.monotonic()
+        try:
+            maintenance = self._retention is not None or self._raw_retention is not None
+            while True:
+                deadline = next_purge if maintenance else None
+                items = self._take(deadline)
+                if items:
+                    try:
+                        self._insert(connection, items)
+                    except Exception:
+                        logging.exception("Cannot insert %i items", len(items))
+
+                    with self._condition:
+                        self._done += len(items)
+                        self._condition.notify_all()
+
+                if maintenance and time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + self._retention_interval
+                    self._maintain(connection)
+
+                with self._condition:
+                    if self._closed and not self._queue:
+                        break
+
+            self._flush_rollups(connection)
+        finally:
+            connection.close()
+
+    def _flush_rollups(self, connection):
+        """
+        Writes the rollups of the current windows, possibly incomplete.
+        """
+        with self._condition:
+            units = list(self._units.values()) + self._removed
+            self._removed = []
+
+        rows = []
+        for unit in units:
+            recorder = unit.recorder
+            if recorder.downsampler is None:
+                continue
+            recorder.downsampler.flush()
+            rows += [row for _table, row in recorder.rows]
+            recorder.rows.clear()
+
+        if rows:
+            with connection:
+                connection.executemany(_INSERTS["rollups"], rows)
+
+    def flush(self, timeout=None):
+        """
+        Writes the queued items without waiting for a batch to be due and
+        waits until they are written, at most *timeout* seconds.
+        Returns ``True`` if they were.
+        """
+        with self._condition:
+            target = self._received
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                self._condition.wait_for(
+                    lambda: self._done >= target or not self._thread.is_alive(),
+                    timeout,
+                )
+            finally:
+                self._flushing -= 1
+            return self._done >= target
+
+    def close(self, timeout=None):
+        """
+        Writes the queued items and the rollups of the current windows, and
+        stops the thread.
+        Units are not removed from their samplers.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def statistics(self):
+        """
+        Returns the :class:`SQLiteSinkStatistics`: the number of items
+        received from the samplers, rows written, items dropped because the
+        queue was full, items pending, insert transactions, rows deleted
+        by the retention and snapshots compacted into the rollups.
+        """
+        with self._condition:
+            return SQLiteSinkStatistics(
+                self._received,
+                self._written,
+                self._dropped,
+                len(self._queue),
+                self._batches,
+                self._purged,
+                self._compacted,
+            )
+
+
+def query_history(filepath, port, start, end, max_points=1000):
+    """
+    Reads the history of a unit between the times *start* and *end* from
+    the database *filepath* written by a :class:`SQLiteSink`, and returns a
+    :class:`History`: the length of the window of the tier read (``0.0``
+    for the snapshots), the names of the columns and the rows.
+
+    The coarsest tier of rollups whose window is at most
+    ``(end - start) / max_points`` is read, so that a long time range
+    returns at least about *max_points* rows without reading the snapshots.
+    If the range is too short for any tier, or if that tier is empty, the
+    snapshots are read; if they were compacted, the finest tier is read.
+    """
+    connection = sqlite3.connect(filepath)
+    try:
+        windows = sorted(
+            window
+            for (window,) in connection.execute(
+                "SELECT DISTINCT window FROM rollups WHERE port = ?", (port,)
+            )
+        )
+
+        resolution = (end - start) / max_points
+        candidates = [window for window in windows if window <= resolution]
+        tiers = [max(candidates)] if candidates else []
+        tiers += [0.0] + windows[:1]
+
+        for window in tiers:
+            if window:
+                cursor = connection.execute(
+                    "SELECT * FROM rollups WHERE port = ? AND window = ? "
+                    "AND time >= ? AND time < ? ORDER BY time",
+                    (port, window, start, end),
+                )
+            else:
+                cursor = connection.execute(
+                    "SELECT * FROM snapshots WHERE port = ? "
+                    "AND time >= ? AND time < ? ORDER BY time",
+                    (port, start, end),
+                )
+
+            rows = cursor.fetchall()
+            if rows:
+                break
+
+        columns = [description[0] for description in cursor.description]
+        return History(window, columns, rows)
+    finally:
+        connection.close()
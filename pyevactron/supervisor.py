@@ -0,0 +1,270 @@
+"""
+Supervision of the connection to the device.
+
+A :class:`ConnectionSupervisor` watches the calls made through the interface:
+any successful call is proof that the link is alive, so the device is only
+probed with ``evbIsConnected`` when the interface has been idle for a
+heartbeat interval.
+When the link is lost, the supervisor reconnects with a jittered exponential
+backoff and restores the configuration written through the interface.
+"""
+
+# Standard library modules.
+import time
+import random
+import logging
+import threading
+import collections
+
+# Third party modules.
+
+# Local modules.
+from pyevactron._statistics import percentile
+from pyevactron.scheduler import priority, CONTROL
+from pyevactron.interface import (
+    _DLLProxy,
+    _BYREF_STATUS_FUNCTIONS,
+    EVR_OK,
+    EVR_COMMANDIGNORED,
+)
+
+# Globals and constants variables.
+ConnectionStatistics = collections.namedtuple(
+    "ConnectionStatistics",
+    [
+        "connected",
+        "heartbeats",
+        "outages",
+        "reconnects",
+        "failed_attempts",
+        "downtime_s",
+        "time_to_recover_last_s",
+        "time_to_recover_p50_s",
+        "time_to_recover_max_s",
+    ],
+)
+
+
+class _SupervisedDLL(_DLLProxy):
+    """
+    Reports the outcome of each call to the library to a
+    :class:`ConnectionSupervisor`.
+    """
+
+    def __init__(self, dll, supervisor):
+        super().__init__(dll)
+        self._supervisor = supervisor
+
+    def _wrap(self, name, func):
+        if name in _BYREF_STATUS_FUNCTIONS:
+            return func
+
+        supervisor = self._supervisor
+
+        def wrapper(*args):
+            try:
+                retval = func(*args)
+            except Exception:
+                supervisor._failed()
+                raise
+
+            if retval == EVR_OK or retval == EVR_COMMANDIGNORED:
+                supervisor._last_alive = time.monotonic()
+            else:
+                supervisor._failed()
+            return retval
+
+        return wrapper
+
+
+class ConnectionSupervisor(object):
+    def __init__(
+        self,
+        interface,
+        heartbeat_interval=5.0,
+        backoff_initial=0.5,
+        backoff_max=30.0,
+        backoff_factor=2.0,
+        jitter=0.5,
+        restore_configuration=True,
+        window=64,
+    ):
+        """
+        Keeps the connection of *interface* alive from a background thread.
+
+        Usually started with :meth:`EvactronInterface.start_supervisor
+        <pyevactron.interface.EvactronInterface.start_supervisor>`.
+        Calls made while the link is down still raise; they succeed again
+        once the supervisor has reconnected.
+
+        :arg heartbeat_interval: idle time after which the link is probed
+            (in seconds)
+        :arg backoff_initial: delay before the second reconnection attempt
+            (in seconds)
+        :arg backoff_max: maximum delay between attempts (in seconds)
+        :arg backoff_factor: growth of the delay after each failed attempt
+        :arg jitter: fraction of the delay drawn at random, so that several
+            hosts do not retry in lockstep
+        :arg restore_configuration: whether to write back the plasma
+            configuration set through the interface after reconnecting
+        :arg window: number of recoveries kept for the statistics
+        """
+        self._interface = interface
+        self._heartbeat_interval = heartbeat_interval
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._backoff_factor = backoff_factor
+        self._jitter = jitter
+        self._restore_configuration = restore_configuration
+
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stop = False
+        self._suspect = False
+        self._last_alive = time.monotonic()
+
+        self._down_since = None
+        self._heartbeats = 0
+        self._outages = 0
+        self._reconnects = 0
+        self._failed_attempts = 0
+        self._downtime = 0.0
+        self._recoveries = collections.deque(maxlen=window)
+
+    def _failed(self):
+        with self._condition:
+            self._suspect = True
+            self._condition.notify()
+
+    def _wait_suspect(self):
+        """
+        Waits until a call failed or the interface was idle for the heartbeat
+        interval.
+        Returns ``False`` if the supervisor is stopped.
+        """
+        with self._condition:
+            while not self._stop and not self._suspect:
+                idle = time.monotonic() - self._last_alive
+                if idle >= self._heartbeat_interval:
+                    self._heartbeats += 1
+                    break
+                self._condition.wait(self._heartbeat_interval - idle)
+
+            self._suspect = False
+            return not self._stop
+
+    def _probe(self):
+        try:
+            alive = self._interface.is_connected()
+        except Exception:
+            alive = False
+
+        if alive:
+            self._last_alive = time.monotonic()
+        return alive
+
+    def _sleep(self, delay):
+        """
+        Returns ``False`` if the supervisor was stopped while sleeping.
+        """
+        with self._condition:
+            return not self._condition.wait_for(lambda: self._stop, delay)
+
+    def _recover(self):
+        start = time.monotonic()
+        with self._condition:
+            self._down_since = start
+            self._outages += 1
+        logging.warning("Connection to device lost")
+
+        delay = self._backoff_initial
+        while True:
+            try:
+                self._interface._reconnect()
+            except Exception as ex:
+                logging.debug("Cannot reconnect: %s", ex)
+                with self._condition:
+                    self._failed_attempts += 1
+            else:
+                break
+
+            if not self._sleep(delay * (1.0 - self._jitter * random.random())):
+                return
+            delay = min(delay * self._backoff_factor, self._backoff_max)
+
+        if self._restore_configuration:
+            try:
+                self._interface._restore_configuration()
+            except Exception:
+                logging.exception("Cannot restore configuration")
+
+        end = time.monotonic()
+        self._last_alive = end
+        with self._condition:
+            self._down_since = None
+            self._downtime += end - start
+            self._reconnects += 1
+            self._recoveries.append(end - start)
+            self._suspect = False
+        logging.warning("Reconnected to device after %.3f s", end - start)
+
+    def _run(self):
+        with priority(CONTROL):
+            while self._wait_suspect():
+                if not self._probe():
+                    self._recover()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._stop = False
+        self._last_alive = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="evactron-supervisor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        if self._thread is None:
+            return
+
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def connected(self):
+        """
+        Whether the link is believed to be up.
+        """
+        return self._down_since is None
+
+    def statistics(self):
+        """
+        Returns the :class:`ConnectionStatistics`: whether the link is up,
+        the number of idle probes, outages, successful reconnections and
+        failed attempts, the total downtime (including the current outage)
+        and the time to recover from the recent outages.
+        """
+        with self._condition:
+            downtime = self._downtime
+            if self._down_since is not None:
+                downtime += time.monotonic() - self._down_since
+
+            recoveries = sorted(self._recoveries)
+            return ConnectionStatistics(
+                self._down_since is None,
+                self._heartbeats,
+                self._outages,
+                self._reconnects,
+                self._failed_attempts,
+                downtime,
+                self._recoveries[-1] if self._recoveries else float("nan"),
+                percentile(recoveries, 50),
+                recoveries[-1] if recoveries else float("nan"),
+            )
@@ -0,0 +1,326 @@
+"""
+Append-only, memory-mapped columnar log of the snapshots on disk.
+
+A log is a directory holding one file per column of
+:class:`TelemetryColumns <pyevactron.ringbuffer.TelemetryColumns>`, each an
+array of fixed-width little-endian values, and a ``header`` file::
+
+    offset  size  content
+         0     8  magic number and format version (b"EVTLOG01")
+         8    20  commit slot A: generation (u64), count (u64), CRC-32 (u32)
+        32    20  commit slot B
+        64     4  length of the metadata (u32)
+        68     *  metadata, as UTF-8 JSON: columns, units, state names and
+                  identity of the device
+
+The writer appends through memory maps and periodically commits: it flushes
+the columns to disk, then writes the number of records in the commit slot
+not holding the latest generation.
+A record becomes visible to the readers only once committed, and a crash
+while writing leaves the previous commit intact.
+Readers map the committed records of each column, so opening a log is
+instant whatever its size, and the columns are returned as NumPy arrays
+sharing the memory of the files.
+"""
+
+# Standard library modules.
+import os
+import json
+import zlib
+import struct
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+from pyevactron.interface import _STATES
+from pyevactron.ringbuffer import TelemetryColumns, COLUMN_DTYPES, encode_snapshot
+
+# Globals and constants variables.
+MAGIC = b"EVTLOG01"
+
+UNITS = {
+    "timestamp": "s",
+    "pressure_Pa": "Pa",
+    "forward_power_W": "W",
+    "reverse_power_W": "W",
+    "metering_valve_voltage_V": "V",
+}
+"""Units of the columns (the other columns are codes)."""
+
+_SLOT = struct.Struct("<QQI")
+_SLOT_OFFSETS = (8, 32)
+_LENGTH = struct.Struct("<I")
+_METADATA_OFFSET = 64
+
+_DTYPES = TelemetryColumns(
+    *[np.dtype(dtype).newbyteorder("<") for dtype in COLUMN_DTYPES]
+)
+
+
+def device_identity(interface):
+    """
+    Returns a :class:`dict` identifying the device of a connected
+    *interface*, to be recorded in the header of a log.
+    """
+    return {
+        "comm_port": interface._comm_port,
+        "dll_version": list(interface.dll_version),
+        "firmware_version": list(interface.firmware_version),
+        "application_version": list(interface.application_version),
+    }
+
+
+def _column_filepath(directory, name):
+    return os.path.join(directory, name + ".bin")
+
+
+def _read_header(directory):
+    """
+    Returns the metadata and the latest valid commit (generation, count) of
+    the log in *directory*.
+    """
+    with open(os.path.join(directory, "header"), "rb") as fp:
+        header = fp.read(_METADATA_OFFSET + _LENGTH.size)
+        if header[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a telemetry log: %s" % directory)
+
+        (length,) = _LENGTH.unpack_from(header, _METADATA_OFFSET)
+        metadata = json.loads(fp.read(length).decode("utf8"))
+
+    commit = (0, 0)
+    for offset in _SLOT_OFFSETS:
+        generation, count, crc = _SLOT.unpack_from(header, offset)
+        if crc != zlib.crc32(header[offset : offset + 16]):
+            continue
+        commit = max(commit, (generation, count))
+
+    return metadata, commit
+
+
+class TelemetryLogWriter(object):
+    def __init__(self, directory, device=None, chunk=65536, commit_every=100):
+        """
+        Appends snapshots to the log in *directory*, which is created if
+        needed. An existing log is continued after its last commit.
+        The writer is a callable, so it can be registered as a sink of a
+        :class:`Sampler <pyevactron.sampler.Sampler>`.
+
+        :arg device: :class:`dict` identifying the device, recorded in the
+            header of a new log (see :func:`device_identity`)
+        :arg chunk: number of records by which the column files grow
+        :arg commit_every: number of records appended between automatic
+            commits
+        """
+        self._directory = directory
+        self._chunk = chunk
+        self._commit_every = commit_every
+
+        header_filepath = os.path.join(directory, "header")
+        if not os.path.exists(header_filepath):
+            os.makedirs(directory, exist_ok=True)
+            self._create(header_filepath, device)
+
+        self._metadata, (self._generation, self._count) = _read_header(directory)
+        self._committed = self._count
+        self._header = open(header_filepath, "r+b")
+
+        self._columns = None
+        self._capacity = 0
+        self._map(max(self._count + chunk, chunk))
+
+    def _create(self, filepath, device):
+        metadata = {
+            "columns": [
+                [name, dtype.str]
+                for name, dtype in zip(TelemetryColumns._fields, _DTYPES)
+            ],
+            "units": UNITS,
+            "states": dict((str(code), str(state)) for code, state in _STATES.items()),
+            "device": device or {},
+        }
+        data = json.dumps(metadata).encode("utf8")
+
+        header = bytearray(_METADATA_OFFSET)
+        header[: len(MAGIC)] = MAGIC
+        header += _LENGTH.pack(len(data)) + data
+
+        for name in TelemetryColumns._fields:
+            open(_column_filepath(self._directory, name), "wb").close()
+
+        with open(filepath, "wb") as fp:
+            fp.write(header)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+    def _map(self, capacity):
+        """
+        Maps the column files, growing them to *capacity* records.
+        """
+        if self._columns is not None:
+            for column in self._columns:
+                column.flush()
+
+        self._columns = TelemetryColumns(
+            *[
+                np.memmap(
+                    _column_filepath(self._directory, name),
+                    dtype,
+                    "r+",
+                    shape=(capacity,),
+                )
+                for name, dtype in zip(TelemetryColumns._fields, _DTYPES)
+            ]
+        )
+        self._capacity = capacity
+
+    def __call__(self, snapshot):
+        self.append(snapshot)
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def append(self, snapshot):
+        """
+        Appends a :class:`Snapshot <pyevactron.interface.Snapshot>`.
+        """
+        if self._count >= self._capacity:
+            self._map(self._capacity + self._chunk)
+
+        index = self._count
+        for column, value in zip(self._columns, encode_snapshot(snapshot)):
+            column[index] = value
+        self._count += 1
+
+        if self._count - self._committed >= self._commit_every:
+            self.commit()
+
+    def commit(self):
+        """
+        Flushes the appended records to disk and makes them visible to the
+        readers.
+        """
+        if self._count == self._committed:
+            return
+
+        for column in self._columns:
+            column.flush()
+
+        self._generation += 1
+        offset = _SLOT_OFFSETS[self._generation % 2]
+        data = struct.pack("<QQ", self._generation, self._count)
+        self._header.seek(offset)
+        self._header.write(_SLOT.pack(self._generation, self._count, zlib.crc32(data)))
+        self._header.flush()
+        os.fsync(self._header.fileno())
+
+        self._committed = self._count
+
+    def close(self):
+        """
+        Commits and closes the log.
+        """
+        if self._header is None:
+            return
+
+        self.commit()
+        self._columns = None
+        self._header.close()
+        self._header = None
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def metadata(self):
+        """
+        Metadata of the header of the log.
+        """
+        return self._metadata
+
+
+class TelemetryLogReader(object):
+    def __init__(self, directory):
+        """
+        Reads the committed records of the log in *directory*, possibly while
+        a writer is still appending to it (see :meth:`refresh`).
+        """
+        self._directory = directory
+        self._metadata = None
+        self._columns = None
+        self._count = 0
+        self.refresh()
+
+    def refresh(self):
+        """
+        Maps the records committed since the log was opened or last
+        refreshed.
+        Returns the number of records.
+        """
+        self._metadata, (_generation, count) = _read_header(self._directory)
+        if self._columns is not None and count == self._count:
+            return count
+
+        dtypes = [np.dtype(dtype) for _name, dtype in self._metadata["columns"]]
+        if count == 0:
+            columns = [np.empty(0, dtype) for dtype in dtypes]
+        else:
+            columns = [
+                np.memmap(
+                    _column_filepath(self._directory, name),
+                    dtype,
+                    "r",
+                    shape=(count,),
+                )
+                for name, dtype in zip(TelemetryColumns._fields, dtypes)
+            ]
+
+        self._columns = TelemetryColumns(*columns)
+        self._count = count
+        return count
+
+    def __len__(self):
+        return self._count
+
+    def columns(self):
+        """
+        Returns the :class:`TelemetryColumns
+        <pyevactron.ringbuffer.TelemetryColumns>` of the records, as
+        read-only arrays mapped from the files.
+        """
+        return self._columns
+
+    def between(self, start=None, end=None):
+        """
+        Returns the :class:`TelemetryColumns
+        <pyevactron.ringbuffer.TelemetryColumns>` of the records whose
+        timestamp is in [*start*, *end*), as views of the mapped arrays.
+        The timestamps are expected to be non-decreasing.
+        """
+        timestamps = self._columns.timestamp
+        first = 0 if start is None else int(np.searchsorted(timestamps, start))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end))
+        return TelemetryColumns(*[column[first:last] for column in self._columns])
+
+    @property
+    def metadata(self):
+        """
+        Metadata of the header of the log: ``columns`` (name and NumPy type),
+        ``units``, ``states`` (name of each state code) and ``device``.
+        """
+        return self._metadata
+
+    @property
+    def device(self):
+        return self._metadata["device"]
+
+    @property
+    def units(self):
+        return self._metadata["units"]
@@ -0,0 +1,212 @@
+"""
+Tracing of the calls to the device, exported in the Chrome trace format.
+
+While enabled, a span is recorded for each ``evb*`` call, each phase of the
+configuration setters (disable, sleep, write, enable) and each wait for the
+lock serialising the calls to the library.
+The spans are tagged by thread and by caller, so the trace, opened in
+``chrome://tracing`` or https://ui.perfetto.dev, shows which thread blocks
+which and where the time is spent sleeping.
+"""
+
+# Standard library modules.
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+import collections
+
+# Third party modules.
+
+# Local modules.
+import pyevactron
+from pyevactron.interface import _DLLProxy
+
+# Globals and constants variables.
+_PACKAGE_DIRECTORY = os.path.dirname(pyevactron.__file__)
+_INTERFACE_FILENAME = os.path.join(_PACKAGE_DIRECTORY, "interface.py")
+_SKIPPED_FILENAMES = (_PACKAGE_DIRECTORY, threading.__file__)
+
+
+def _caller():
+    """
+    Returns the method of the interface and the location of the code outside
+    this package from which the library is called.
+    """
+    method = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if method is None and code.co_filename == _INTERFACE_FILENAME:
+            method = code.co_name
+        if not code.co_filename.startswith(_SKIPPED_FILENAMES):
+            return method, "%s (%s:%i)" % (
+                code.co_name,
+                os.path.basename(code.co_filename),
+                frame.f_lineno,
+            )
+        frame = frame.f_back
+    return method, None
+
+
+class _TracedDLL(_DLLProxy):
+    """
+    Records a span for each call to the library in a :class:`Tracer`.
+    """
+
+    def __init__(self, dll, tracer, pid):
+        super().__init__(dll)
+        self._tracer = tracer
+        self._pid = pid
+
+    def _wrap(self, name, func):
+        tracer = self._tracer
+        pid = self._pid
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            method, caller = _caller()
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                tracer._record(
+                    name,
+                    "dll",
+                    start,
+                    clock() - start,
+                    pid,
+                    {"method": method, "caller": caller},
+                )
+
+        return wrapper
+
+
+class _TracedLock(object):
+    """
+    Wraps the lock of a :class:`_LockedDLL
+    <pyevactron.interface._LockedDLL>` to record a span when a call has to
+    wait for it.
+    """
+
+    def __init__(self, lock, tracer, pid):
+        self.lock = lock
+        self._tracer = tracer
+        self._pid = pid
+
+    def __enter__(self):
+        if self.lock.acquire(False):
+            return
+
+        start = time.perf_counter()
+        self.lock.acquire()
+        self._tracer._record(
+            "lock wait", "lock", start, time.perf_counter() - start, self._pid, {}
+        )
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.lock.release()
+
+
+class Tracer(object):
+    def __init__(self, maxlen=100000):
+        """
+        Collects the spans of one or more interfaces.
+        Usually created with :meth:`EvactronInterface.start_tracing
+        <pyevactron.interface.EvactronInterface.start_tracing>`.
+        In the trace, each interface is shown as a process named after its
+        comm port.
+
+        :arg maxlen: maximum number of spans kept, the oldest are discarded
+        """
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._spans = collections.deque(maxlen=maxlen)
+        self._threads = {}
+        self._processes = {}
+
+    def _register(self, pid, name):
+        with self._lock:
+            self._processes[pid] = name
+
+    def _record(self, name, category, start, duration, pid, args):
+        tid = threading.get_ident()
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            self._spans.append((name, category, start, duration, pid, tid, args))
+
+    @contextlib.contextmanager
+    def span(self, name, category="interface", pid=0, **args):
+        """
+        Records a span around the body of the ``with`` statement.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, category, start, time.perf_counter() - start, pid, args)
+
+    def events(self):
+        """
+        Returns the recorded spans as a :class:`list` of events of the Chrome
+        trace format, with the names of the processes and threads.
+        Times are in microseconds since the tracer was created.
+        """
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span[2])
+            threads = dict(self._threads)
+            processes = dict(self._processes)
+
+        events = []
+        for pid, name in sorted(processes.items()):
+            events.append(
+                {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            )
+        for pid, tid in sorted(set(span[4:6] for span in spans)):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": threads[tid]},
+                }
+            )
+
+        for name, category, start, duration, pid, tid, args in spans:
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+        return events
+
+    def dump(self, fp):
+        """
+        Writes the trace as Chrome trace JSON to the file object *fp*.
+        """
+        json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, fp)
+
+    def save(self, filepath):
+        """
+        Writes the trace as Chrome trace JSON to *filepath*.
+        """
+        with open(filepath, "w") as fp:
+            self.dump(fp)
+
+    def clear(self):
+        """
+        Discards the recorded spans.
+        """
+        with self._lock:
+            self._spans.clear()
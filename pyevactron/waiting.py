@@ -0,0 +1,248 @@
+"""
+Waiting for the device to reach a state.
+
+All waiters of an interface share one :class:`StateMonitor`.
+It is fed by the sampler when one is running; otherwise, it polls the device
+itself, in a single thread, with an adaptive backoff.
+Many concurrent waiters therefore cost a single polling stream.
+"""
+
+# Standard library modules.
+import time
+import logging
+import threading
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import EvactronState, EvactronException, ReadyState
+
+# Globals and constants variables.
+IDLE_STATES = (ReadyState,)
+
+
+def in_states(states):
+    """
+    Returns a predicate on a snapshot, true when the device is in one of
+    *states*.
+    """
+    if isinstance(states, (EvactronState, int)):
+        states = (states,)
+    states = tuple(states)
+    return lambda snapshot: snapshot.state in states
+
+
+def faults_cleared(snapshot):
+    """
+    Predicate on a snapshot, true when no dynamic or latched fault is set.
+    """
+    return snapshot.dynamic_fault is None and snapshot.latched_fault is None
+
+
+class _Waiter(object):
+    __slots__ = (
+        "predicate",
+        "faults",
+        "callback",
+        "errback",
+        "event",
+        "snapshot",
+        "exception",
+    )
+
+    def __init__(self, predicate, faults, callback, errback=None):
+        self.predicate = predicate
+        self.faults = faults
+        self.callback = callback
+        self.errback = errback
+        self.event = threading.Event()
+        self.snapshot = None
+        self.exception = None
+
+    def fail(self, exception):
+        self.exception = exception
+        self.event.set()
+        if self.errback is not None:
+            self.errback(exception)
+
+    def matches(self, snapshot):
+        # Faults are unknown when measurements were not read
+        if self.faults and snapshot.pressure_Pa is None:
+            return False
+        return self.predicate(snapshot)
+
+
+class StateMonitor(object):
+    def __init__(self, interface, min_interval=0.05, max_interval=1.0, executor=None):
+        """
+        Evaluates the predicates of the waiters on each new snapshot of
+        *interface*.
+
+        When no sampler is running and waiters are registered, the device is
+        polled in a background thread, starting every *min_interval* seconds
+        and backing off up to *max_interval* seconds while the state does
+        not change.
+        The device is read on *executor* (a
+        :class:`concurrent.futures.Executor`), if given.
+
+        Usually accessed through :meth:`EvactronInterface.wait_for_state
+        <pyevactron.interface.EvactronInterface.wait_for_state>` and related
+        methods.
+        """
+        self._interface = interface
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._executor = executor
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._snapshot = None
+        self._thread = None
+
+    def __call__(self, snapshot):
+        """
+        Publishes a new snapshot (sampler sink).
+        """
+        with self._condition:
+            self._snapshot = snapshot
+
+            matched = [w for w in self._waiters if w.matches(snapshot)]
+            if matched:
+                self._waiters = [w for w in self._waiters if w not in matched]
+            self._condition.notify_all()
+
+        for waiter in matched:
+            waiter.snapshot = snapshot
+            waiter.event.set()
+            if waiter.callback is not None:
+                waiter.callback(snapshot)
+
+    def _is_fresh(self, snapshot):
+        sampler = self._interface.sampler
+        if snapshot is None or sampler is None or not sampler.running:
+            return False
+        age = time.time() - snapshot.timestamp
+        return age <= 2 * sampler.interval_for(snapshot.state)
+
+    def _sampled(self):
+        sampler = self._interface.sampler
+        return sampler is not None and sampler.running
+
+    def _read(self, measurements):
+        if self._executor is not None:
+            future = self._executor.submit(self._interface.snapshot, measurements)
+            return future.result()
+        return self._interface.snapshot(measurements)
+
+    def _poll(self):
+        interval = self._min_interval
+        state = None
+
+        while True:
+            with self._condition:
+                if not self._waiters or self._sampled():
+                    self._thread = None
+                    return
+                measurements = any(w.faults for w in self._waiters)
+
+            try:
+                snapshot = self._read(measurements)
+            except Exception:
+                # The read may fail because the monitor was stopped meanwhile
+                with self._condition:
+                    stopped = not self._waiters
+                if not stopped:
+                    logging.exception("Cannot poll device")
+                snapshot = None
+            else:
+                self(snapshot)
+
+            if snapshot is not None and snapshot.state != state:
+                state = snapshot.state
+                interval = self._min_interval
+            else:
+                interval = min(interval * 1.5, self._max_interval)
+
+            with self._condition:
+                self._condition.wait(interval)
+
+    def add_waiter(self, predicate, callback=None, faults=False, errback=None):
+        """
+        Registers a waiter and returns it.
+        *callback* is called with the first snapshot satisfying *predicate*,
+        from the thread publishing the snapshot.
+        If *faults*, only snapshots with measurements and faults are
+        considered.
+        *errback* is called with the exception if the monitor is stopped
+        before then (see :meth:`stop`).
+        """
+        waiter = _Waiter(predicate, faults, callback, errback)
+
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot) and waiter.matches(snapshot):
+            waiter.snapshot = snapshot
+            waiter.event.set()
+            if callback is not None:
+                callback(snapshot)
+            return waiter
+
+        with self._condition:
+            self._waiters.append(waiter)
+            self._condition.notify_all()
+        self.resume()
+
+        return waiter
+
+    def resume(self):
+        """
+        Starts polling if waiters are registered and no sampler is running.
+        Called when the sampler is stopped.
+        """
+        with self._condition:
+            if self._thread is not None or not self._waiters or self._sampled():
+                return
+
+            self._thread = threading.Thread(
+                target=self._poll, name="evactron-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, exception=None):
+        """
+        Fails the pending waiters with *exception* (by default, an
+        :class:`EvactronException <pyevactron.interface.EvactronException>`)
+        and lets the polling thread exit.
+        Called when the interface is disconnected; waiters registered
+        afterwards resume polling.
+        """
+        if exception is None:
+            exception = EvactronException("Disconnected while waiting")
+
+        with self._condition:
+            waiters, self._waiters = self._waiters, []
+            self._condition.notify_all()
+
+        for waiter in waiters:
+            waiter.fail(exception)
+
+    def remove_waiter(self, waiter):
+        with self._condition:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def wait(self, predicate, timeout=None, faults=False):
+        """
+        Blocks until a snapshot satisfies *predicate* and returns it.
+
+        :raise TimeoutError: if no snapshot satisfies *predicate* within
+            *timeout* seconds
+        :raise EvactronException: if the monitor is stopped meanwhile
+        """
+        waiter = self.add_waiter(predicate, faults=faults)
+        if not waiter.event.wait(timeout):
+            self.remove_waiter(waiter)
+            if not waiter.event.is_set():
+                raise TimeoutError("Condition not reached within %s s" % timeout)
+        if waiter.exception is not None:
+            raise waiter.exception
+        return waiter.snapshot
@@ -25,6 +25,7 @@ with open(BASEDIR.joinpath("requirements-dev.txt"), "r") as fp:
     EXTRAS_REQUIRE["dev"] = fp.read().splitlines()
 with open(BASEDIR.joinpath("requirements-test.txt"), "r") as fp:
     EXTRAS_REQUIRE["test"] = fp.read().splitlines()
+EXTRAS_REQUIRE["arrow"] = ["pyarrow"]
 
 CMDCLASS = versioneer.get_cmdclass()
 
@@ -0,0 +1,23 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def dll():
+    return SimulatedDLL()
+
+
+@pytest.fixture
+def ev(dll):
+    with EvactronInterface(1, dll) as ev:
+        yield ev
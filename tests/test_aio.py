@@ -0,0 +1,102 @@
+""""""
+
+# Standard library modules.
+import asyncio
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.aio import AsyncEvactronInterface, LATEST_ONLY
+from pyevactron.interface import ReadyState
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def test_read_write():
+    dll = SimulatedDLL()
+
+    async def run():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            await ev.write("cycles", 3)
+            return await ev.read("cycles")
+
+    assert asyncio.run(run()) == 3
+
+
+def test_calls_off_loop():
+    dll = SimulatedDLL()
+    threads = set()
+    original = dll.evbGetPressure
+
+    def evbGetPressure(*args):
+        threads.add(threading.current_thread())
+        return original(*args)
+
+    dll.evbGetPressure = evbGetPressure
+
+    async def run():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            await ev.read("pressure_Pa")
+            await ev.snapshot()
+
+    asyncio.run(run())
+    assert len(threads) == 1
+    assert threading.main_thread() not in threads
+
+
+def test_stream():
+    dll = SimulatedDLL()
+
+    async def run():
+        snapshots = []
+        async with AsyncEvactronInterface(1, dll) as ev:
+            async with ev.stream(0.01) as stream:
+                async for snapshot in stream:
+                    snapshots.append(snapshot)
+                    if len(snapshots) == 3:
+                        break
+        return snapshots
+
+    snapshots = asyncio.run(run())
+    assert len(snapshots) == 3
+    assert snapshots[0].state is ReadyState
+    assert snapshots[0].timestamp < snapshots[2].timestamp
+
+
+def test_stream_latest_only():
+    dll = SimulatedDLL()
+
+    async def run():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            async with ev.stream(0.005, policy=LATEST_ONLY) as stream:
+                await asyncio.sleep(0.1)
+                await stream.__anext__()
+                return stream.dropped
+
+    assert asyncio.run(run()) > 0
+
+
+def test_stream_invalid_policy():
+    with pytest.raises(ValueError):
+        AsyncEvactronInterface(1, SimulatedDLL()).stream(1.0, policy="block")
+
+
+def test_reconnect():
+    dll = SimulatedDLL()
+
+    async def run():
+        ev = AsyncEvactronInterface(1, dll)
+        try:
+            await ev.connect()
+            await ev.disconnect()
+            await ev.connect()
+            assert await ev.is_connected()
+            await ev.disconnect()
+        finally:
+            ev.close()
+
+    asyncio.run(run())
+    assert dll.calls["evbConnect"] == 2
@@ -0,0 +1,160 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+from pyevactron.ringbuffer import TelemetryColumns, COLUMN_DTYPES
+from pyevactron.analytics import (
+    run_metrics,
+    segment_runs,
+    fit_pumpdowns,
+    pumpdown_trends,
+)
+
+# Globals and constants variables.
+#       Ready  Stab.  Wait  Clean      Purge  Pump  Ready
+STATES = [10, 11, 11, 12, 13, 13, 13, 14, 14, 15, 10, 10]
+
+
+def _columns(states, repeat=1):
+    states = np.tile(states, repeat)
+    count = len(states)
+    forward = np.where(states == 13, 100.0, 0.0)
+    pressure = np.where(states == 13, 40.0, 200.0)
+    pressure[np.flatnonzero(states == 13)[::3]] = 46.0
+    return TelemetryColumns(
+        *[
+            np.asarray(values, dtype)
+            for values, dtype in zip(
+                [
+                    np.arange(count, dtype=float),
+                    states,
+                    np.ones(count),
+                    pressure,
+                    forward,
+                    forward * 0.1,
+                    np.full(count, 3.5),
+                    np.zeros(count),
+                    np.zeros(count),
+                ],
+                COLUMN_DTYPES,
+            )
+        ]
+    )
+
+
+def test_segment_runs():
+    starts, stops = segment_runs(np.array(STATES * 2, np.int8))
+    assert starts.tolist() == [1, 13]
+    assert stops.tolist() == [10, 22]
+
+
+def test_run_metrics():
+    metrics = run_metrics(_columns(STATES))
+    assert metrics.start.tolist() == [1.0]
+    assert metrics.end.tolist() == [10.0]
+    assert metrics.complete.tolist() == [True]
+    assert metrics.stabilisation_s.tolist() == [2.0]
+    assert metrics.ignition_delay_s.tolist() == [1.0]
+    assert metrics.purge_s.tolist() == [2.0]
+    assert metrics.cleaning_pressure_mean_Pa[0] == pytest.approx(42.0)
+    assert metrics.cleaning_pressure_var_Pa2[0] == pytest.approx(8.0)
+
+    # Trapezoids: ramp up (0.5 s), 2 s at 90 W, ramp down (0.5 s)
+    assert metrics.rf_energy_J[0] == pytest.approx(270.0)
+
+
+def test_run_metrics_batches():
+    columns = _columns(STATES, 1000)
+    metrics = run_metrics(columns, batch_size=50)
+    expected = run_metrics(columns, batch_size=10**9)
+
+    assert len(metrics.start) == 1000
+    for name in metrics._fields:
+        np.testing.assert_allclose(getattr(metrics, name), getattr(expected, name))
+    assert np.all(metrics.ignition_delay_s == 1.0)
+
+
+def test_run_metrics_truncated():
+    metrics = run_metrics(_columns(STATES[3:8]))
+    assert metrics.complete.tolist() == [False]
+    assert np.isnan(metrics.stabilisation_s[0])
+    assert metrics.ignition_delay_s[0] == 1.0
+
+    metrics = run_metrics(_columns([10, 10]))
+    assert len(metrics.start) == 0
+
+
+def _pumpdowns(parameters, seed=0):
+    """
+    Returns columns with a pump-down segment, sampled irregularly, for each
+    (start, base, amplitude, tau, leak) of *parameters*, separated by idle
+    snapshots.
+    """
+    random = np.random.default_rng(seed)
+    timestamps, states, pressures = [], [], []
+    for start, base, amplitude, tau, leak in parameters:
+        t = np.cumsum(random.uniform(0.02, 0.5, 400))
+        t -= t[0]
+        timestamps += [start - 1.0, *(start + t), start + t[-1] + 1.0]
+        states += [10] + [15] * len(t) + [10]
+        pressures += [1e5, *(base + amplitude * np.exp(-t / tau) + leak * t), 1e5]
+
+    count = len(timestamps)
+    return TelemetryColumns(
+        np.array(timestamps),
+        np.array(states, np.int8),
+        np.ones(count, np.int16),
+        np.array(pressures, np.float32),
+        *[np.zeros(count, np.float32)] * 3,
+        *[np.zeros(count, np.int16)] * 2,
+    )
+
+
+def test_fit_pumpdowns():
+    parameters = [
+        (1000.0, 5.0, 900.0, 8.0, 0.01),
+        (90000.0, 8.0, 1000.0, 12.0, 0.05),
+    ]
+    fits = fit_pumpdowns(_pumpdowns(parameters), batch_size=100)
+
+    assert len(fits.start) == 2
+    np.testing.assert_allclose(fits.start, [1000.0, 90000.0])
+    assert np.all(fits.samples == 400)
+    np.testing.assert_allclose(fits.base_pressure_Pa, [5.0, 8.0], atol=0.01)
+    np.testing.assert_allclose(fits.amplitude_Pa, [900.0, 1000.0], rtol=1e-3)
+    np.testing.assert_allclose(fits.time_constant_s, [8.0, 12.0], rtol=1e-3)
+    np.testing.assert_allclose(fits.leak_rate_Pa_s, [0.01, 0.05], atol=1e-4)
+    assert np.all(fits.r_squared > 0.9999)
+    assert np.all(fits.rmse_Pa < 0.01)
+
+
+def test_fit_pumpdowns_short():
+    columns = _pumpdowns([(0.0, 5.0, 900.0, 8.0, 0.0)])
+    columns = TelemetryColumns(*[column[:4] for column in columns])
+    fits = fit_pumpdowns(columns)
+    assert fits.samples.tolist() == [3]
+    assert np.isnan(fits.time_constant_s[0])
+
+    fits = fit_pumpdowns(_columns([10, 10]))
+    assert len(fits.start) == 0
+
+
+def test_pumpdown_trends():
+    day = 86400.0
+    parameters = [
+        (index * day / 2 + 100.0, 5.0, 900.0, 8.0, 0.01 * (index // 2 + 1))
+        for index in range(6)
+    ]
+    fits = fit_pumpdowns(_pumpdowns(parameters))
+    fits = fits._replace(r_squared=np.where(np.arange(6) == 5, 0.5, fits.r_squared))
+
+    trends = pumpdown_trends(fits, day)
+    assert trends.start.tolist() == [0.0, day, 2 * day]
+    assert trends.fits.tolist() == [2, 2, 1]
+    np.testing.assert_allclose(trends.leak_rate_Pa_s, [0.01, 0.02, 0.03], atol=1e-3)
+    np.testing.assert_allclose(trends.time_constant_s, 8.0, rtol=1e-3)
@@ -0,0 +1,108 @@
+""""""
+
+# Standard library modules.
+import datetime
+
+# Third party modules.
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+# Local modules.
+from pyevactron.interface import Snapshot, ReadyState, CleaningState, PlasmaFault
+from pyevactron.run import RunSummary
+from pyevactron.ringbuffer import UNKNOWN
+from pyevactron.telemetrylog import TelemetryLogWriter, TelemetryLogReader
+from pyevactron.arrowexport import (
+    record_batches,
+    export_parquet,
+    run_summaries_table,
+    export_run_summaries,
+)
+
+# Globals and constants variables.
+MIDNIGHT = 1714608000.0  # 2024-05-02 00:00:00 UTC
+
+
+def _snapshot(timestamp):
+    return Snapshot(
+        timestamp,
+        CleaningState,
+        1,
+        datetime.time(0, 1, 0),
+        40.0,
+        20.0,
+        1.0,
+        3.5,
+        None,
+        None,
+    )
+
+
+@pytest.fixture
+def reader(tmp_path):
+    directory = str(tmp_path.joinpath("log"))
+    with TelemetryLogWriter(directory, {"comm_port": 3}) as writer:
+        for index in range(10):
+            writer(_snapshot(MIDNIGHT - 5 + index))
+    return TelemetryLogReader(directory)
+
+
+def test_record_batches(reader):
+    batches = list(record_batches(reader, 3, chunk=4))
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+
+    schema = batches[0].schema
+    assert schema.field("pressure_Pa").metadata == {b"unit": b"Pa"}
+    assert schema.field("state").type == pa.int8()
+    assert batches[0].column(0).to_pylist() == [3] * 4
+    assert batches[0].column(1)[0].as_py() == datetime.datetime(
+        2024, 5, 1, 23, 59, 55, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_export_parquet(reader, tmp_path):
+    directory = tmp_path.joinpath("parquet")
+    filepaths = export_parquet(reader, str(directory), chunk=3)
+    assert [path.split("date=")[1][:10] for path in filepaths] == [
+        "2024-05-01",
+        "2024-05-02",
+    ]
+
+    table = ds.dataset(str(directory), partitioning="hive").to_table()
+    assert table.num_rows == 10
+    assert set(table.column("port").to_pylist()) == {3}
+    assert table.schema.field("pressure_Pa").metadata == {b"unit": b"Pa"}
+
+
+def test_run_summaries(tmp_path):
+    summaries = [
+        RunSummary(
+            MIDNIGHT,
+            MIDNIGHT + 60.0,
+            60.0,
+            {ReadyState: 1.0, CleaningState: 59.0},
+            2,
+            (PlasmaFault,),
+            datetime.datetime(2024, 5, 2, 0, 1),
+        )
+    ]
+    table = run_summaries_table(summaries, 3)
+    assert table.column("phases_s").to_pylist() == [[(10, 1.0), (13, 59.0)]]
+    assert table.column("faults").to_pylist() == [[3]]
+
+    filepath = export_run_summaries(summaries, str(tmp_path), 3)
+    assert "port=3" in filepath
+    assert pq.read_table(filepath).column("duration_s").to_pylist() == [60.0]
+
+
+def test_run_summaries_unknown_state():
+    summaries = [
+        RunSummary(
+            MIDNIGHT, MIDNIGHT + 2.0, 2.0, {99: 2.0}, 1, (), datetime.datetime.now()
+        )
+    ]
+    table = run_summaries_table(summaries, 3)
+    assert table.column("phases_s").to_pylist() == [[(UNKNOWN, 2.0)]]
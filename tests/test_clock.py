@@ -0,0 +1,42 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.clock import measure_clock_offset, synchronize_clock
+
+# Globals and constants variables.
+
+
+def test_measure_clock_offset(ev, dll):
+    dll.clock_offset = 3.3
+    offset = measure_clock_offset(ev)
+    assert offset.offset_s == pytest.approx(3.3, abs=0.05)
+
+
+def test_synchronize_clock(ev, dll):
+    dll.clock_offset = -10.4
+    result = synchronize_clock(ev, threshold_s=1.0)
+    assert result.adjusted
+    assert result.offset_s == pytest.approx(-10.4, abs=0.05)
+    assert dll.clock_offset == pytest.approx(0.0, abs=0.05)
+    assert dll.enabled
+
+
+def test_synchronize_clock_below_threshold(ev, dll):
+    dll.clock_offset = 0.5
+    result = synchronize_clock(ev, threshold_s=1.0)
+    assert not result.adjusted
+    assert dll.calls["evbSetTime"] == 0
+    assert dll.calls["evbEnableUnit"] == 0
+
+
+def test_synchronize_clock_not_ready(ev, dll):
+    dll.clock_offset = 10.0
+    dll.state = 13
+    result = synchronize_clock(ev, threshold_s=1.0)
+    assert not result.adjusted
+    assert dll.calls["evbSetTime"] == 0
@@ -0,0 +1,226 @@
+""""""
+
+# Standard library modules.
+import time
+import socket
+import datetime
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import (
+    EvactronException,
+    ReadyState,
+    CleaningState,
+    PlasmaFault,
+)
+from pyevactron.daemon import EvactronDaemon, EvactronClient, _encode, _decode
+from pyevactron.portlock import PortLock
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def dlls():
+    return {}
+
+
+@pytest.fixture
+def path(tmp_path, dlls):
+    path = str(tmp_path / "evactron.sock")
+
+    def dll_factory(comm_port):
+        dll = dlls[comm_port] = SimulatedDLL(latency=0.001)
+        return dll
+
+    with EvactronDaemon(path, dll_factory, max_age=0.5):
+        yield path
+
+
+@pytest.fixture
+def ev(path):
+    with EvactronClient(path, 1, timeout=5.0) as ev:
+        yield ev
+
+
+def test_codec():
+    value = (
+        None,
+        True,
+        -3,
+        1.5,
+        "abc",
+        datetime.time(0, 2, 30),
+        datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+        ReadyState,
+        PlasmaFault,
+        {"cycles": 2},
+    )
+    assert _decode(_encode(value)) == value
+
+
+def test_client(ev, dlls):
+    assert ev.is_connected()
+    assert ev.pressure_Pa == pytest.approx(0.4 * 133.322, rel=1e-4)
+
+    ev.cycles = 3
+    assert dlls[1].cycles == 3
+    assert ev.configuration()["cycles"] == 3
+    assert ev.plasma_time == datetime.time(0, 2, 0)
+
+    dlls[1].dynamic_fault = 3
+    assert ev.faults == (PlasmaFault, None)
+    dlls[1].dynamic_fault = 0
+    del ev.faults
+
+
+def test_client_errors(ev, dlls):
+    with pytest.raises(TimeoutError):
+        ev.wait_for_state(CleaningState, timeout=0.05)
+
+    dlls[1].link_up = False
+    with pytest.raises(EvactronException):
+        ev.cycles
+
+    with pytest.raises(AttributeError):
+        ev.sampler
+    with pytest.raises(AttributeError):
+        ev.instrumentation
+    with pytest.raises(AttributeError):
+        ev.tracer
+
+
+def test_client_shares_connection(path, dlls):
+    with EvactronClient(path, 1) as ev0, EvactronClient(path, 1) as ev1:
+        ev0.pressure_Pa
+        ev1.pressure_Pa
+        assert ev0.dll_version == ev1.dll_version
+
+    assert dlls[1].calls["evbConnect"] == 1
+    assert dlls[1].calls["evbGetDLLVersion"] == 1
+
+
+def test_client_snapshot_cached(ev, dlls):
+    snapshot = ev.snapshot()
+    assert snapshot.state is ReadyState
+    assert ev.snapshot() == snapshot
+    assert dlls[1].calls["evbGetStatusEx"] == 1
+
+
+def test_client_coalesced(path, dlls):
+    with EvactronClient(path, 1) as ev:
+        ev.is_connected()
+        dlls[1].latency = 0.05
+        results = []
+
+        def read():
+            results.append(ev.pressure_Pa)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(results) == 8
+    assert dlls[1].calls["evbGetPressure"] < 8
+
+
+def test_client_pipelined(ev):
+    pressure, cycles, purge = ev.read("pressure_Pa", "cycles", "purge")
+    assert pressure > 0.0
+    assert cycles == 1
+    assert purge is True
+
+
+def test_client_daemon_closed(tmp_path):
+    path = str(tmp_path / "evactron.sock")
+    daemon = EvactronDaemon(path, lambda comm_port: SimulatedDLL())
+    daemon.start()
+
+    ev = EvactronClient(path, 1, timeout=5.0)
+    ev.connect()
+    ev.cycles
+    daemon.close()
+
+    with pytest.raises(EvactronException):
+        ev.cycles
+    ev.disconnect()
+
+
+def test_daemon_locked_port(tmp_path):
+    path = str(tmp_path / "evactron.sock")
+    dll_factory = lambda comm_port: SimulatedDLL()
+
+    with EvactronDaemon(path, dll_factory, lock_timeout=1.0), PortLock(102):
+        with EvactronClient(path, 102, timeout=5.0) as ev2:
+            errors = []
+
+            def read():
+                try:
+                    ev2.dll_version
+                except EvactronException as ex:
+                    errors.append(ex)
+
+            thread = threading.Thread(target=read)
+            thread.start()
+            time.sleep(0.1)
+
+            # Other ports are served while port 102 waits for its lock
+            with EvactronClient(path, 1, timeout=0.5) as ev1:
+                assert ev1.pressure_Pa is not None
+
+            thread.join()
+            assert "locked" in str(errors[0])
+
+
+def test_client_waits_hold_no_worker(tmp_path):
+    path = str(tmp_path / "evactron.sock")
+
+    def dll_factory(comm_port):
+        return SimulatedDLL()
+
+    with EvactronDaemon(path, dll_factory, max_workers=2, max_wait=0.5):
+        with EvactronClient(path, 1) as ev1, EvactronClient(path, 2) as ev2:
+            errors = []
+
+            def wait():
+                try:
+                    ev1.wait_for_state(CleaningState)
+                except TimeoutError as ex:
+                    errors.append(ex)
+
+            threads = [threading.Thread(target=wait) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+
+            # More waits than workers, yet the other requests are served
+            start = time.monotonic()
+            assert ev2.pressure_Pa is not None
+            assert ev1.wait_until_idle().state is ReadyState
+            assert time.monotonic() - start < 0.3
+
+            # Waits without timeout are capped by the daemon
+            for thread in threads:
+                thread.join(5.0)
+            assert len(errors) == 4
+
+
+def test_daemon_socket_in_use(tmp_path):
+    path = str(tmp_path / "evactron.sock")
+
+    with EvactronDaemon(path, lambda comm_port: SimulatedDLL()):
+        with pytest.raises(EvactronException):
+            EvactronDaemon(path).start()
+
+    # A socket file left by a daemon which did not close is replaced
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    with EvactronDaemon(path, lambda comm_port: SimulatedDLL()):
+        with EvactronClient(path, 1, timeout=5.0) as ev:
+            assert ev.is_connected()
@@ -0,0 +1,95 @@
+""""""
+
+# Standard library modules.
+import time
+import threading
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.interface import CleaningState, CableFault
+from pyevactron.events import (
+    ChangeDetector,
+    StateChanged,
+    FaultRaised,
+    FaultCleared,
+    SetpointChanged,
+)
+
+# Globals and constants variables.
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_state_and_faults(ev, dll):
+    events = []
+    detector = ChangeDetector()
+    detector.subscribe(events.append)
+    detector.attach(ev.start_sampler(0.01))
+    time.sleep(0.03)
+
+    dll.state = 13
+    dll.dynamic_fault = dll.latched_fault = 7
+    _wait_for(lambda: len(events) == 3)
+
+    dll.dynamic_fault = 0
+    _wait_for(lambda: len(events) == 4)
+    ev.stop_sampler()
+    detector.close()
+
+    assert events[0].state is CleaningState
+    assert set(events[1:3]) == set(
+        [
+            FaultRaised(events[1].timestamp, CableFault, False),
+            FaultRaised(events[1].timestamp, CableFault, True),
+        ]
+    )
+    assert events[3] == FaultCleared(events[3].timestamp, CableFault, False)
+
+
+def test_setpoint_changed(ev, dll):
+    events = []
+    detector = ChangeDetector()
+    detector.subscribe(events.append, [SetpointChanged])
+    detector.attach(ev.start_sampler(0.01, configuration_interval=0.01))
+    time.sleep(0.05)
+
+    ev.cycles = 4
+    _wait_for(lambda: len(events) == 1)
+    dll.plasma_power_setpoint_W = 20.0
+    _wait_for(lambda: len(events) == 2)
+    ev.stop_sampler()
+    detector.close()
+
+    assert events[0].name == "cycles"
+    assert events[0].value == 4
+    assert not events[0].external
+    assert events[1].name == "plasma_power_setpoint_W"
+    assert events[1].external
+
+
+def test_slow_subscriber(ev, dll):
+    release = threading.Event()
+    fast = []
+    detector = ChangeDetector()
+    slow = detector.subscribe(lambda event: release.wait(), maxsize=2)
+    detector.subscribe(fast.append, [StateChanged])
+    sampler = ev.start_sampler(0.005)
+    detector.attach(sampler)
+    time.sleep(0.02)
+
+    for state in [11, 12, 13, 14, 15, 10]:
+        dll.state = state
+        time.sleep(0.02)
+    ev.stop_sampler()
+    release.set()
+    detector.close()
+
+    assert len(fast) == 6
+    assert slow.dropped > 0
+    assert sampler.statistics().samples > 15
@@ -0,0 +1,58 @@
+""""""
+
+# Standard library modules.
+import time
+
+# Third party modules.
+
+# Local modules.
+from pyevactron.fleet import EvactronFleet
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def test_poll_parallel():
+    dlls = {port: SimulatedDLL(latency=0.02) for port in range(1, 6)}
+
+    with EvactronFleet(dlls.keys(), dlls.get) as fleet:
+        start = time.perf_counter()
+        fleet_snapshot = fleet.poll()
+        elapsed = time.perf_counter() - start
+
+    assert sorted(fleet_snapshot.snapshots) == [1, 2, 3, 4, 5]
+    assert not fleet_snapshot.errors
+    assert elapsed < 0.12 * 3  # one snapshot takes ~0.12 s
+
+
+def test_poll_isolates_failed_unit():
+    dlls = {port: SimulatedDLL() for port in range(1, 4)}
+    dlls[2].latency = 0.5
+
+    with EvactronFleet(dlls.keys(), dlls.get, timeout=0.2) as fleet:
+        assert fleet.connected_ports == [1, 3]
+
+        fleet_snapshot = fleet.poll()
+        assert sorted(fleet_snapshot.snapshots) == [1, 3]
+        assert sorted(fleet_snapshot.errors) == [2]
+
+
+def test_timeout_from_unit_start():
+    dlls = {port: SimulatedDLL(latency=0.1) for port in range(1, 4)}
+
+    # Units queued behind the others are given the full timeout
+    with EvactronFleet(dlls.keys(), dlls.get, max_workers=1, timeout=0.25) as fleet:
+        assert fleet.connected_ports == [1, 2, 3]
+
+
+def test_disconnect_waits_for_pending_connect():
+    dlls = {port: SimulatedDLL() for port in range(1, 3)}
+    dlls[2].latency = 0.3
+
+    with EvactronFleet(dlls.keys(), dlls.get, timeout=0.2) as fleet:
+        assert fleet.connected_ports == [1]
+        dlls[2].latency = 0.0
+
+    # Connected after the timeout, then disconnected
+    assert dlls[1].calls["evbDisconnect"] == 1
+    assert dlls[2].calls["evbDisconnect"] == 1
@@ -0,0 +1,96 @@
+""""""
+
+# Standard library modules.
+import json
+import time
+import urllib.error
+import urllib.request
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.gateway import TelemetryGateway
+
+# Globals and constants variables.
+
+
+def _get(url, etag=None):
+    request = urllib.request.Request(url)
+    if etag is not None:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=5.0) as response:
+            return response.status, response.headers["ETag"], response.read()
+    except urllib.error.HTTPError as ex:
+        return ex.code, ex.headers["ETag"], ex.read()
+
+
+def test_gateway_no_device_calls(ev, dll):
+    sampler = ev.start_sampler(10.0, configuration_interval=10.0)
+    time.sleep(0.1)
+    calls = sum(dll.calls.values())
+
+    with TelemetryGateway(sampler) as gateway:
+        for _ in range(10):
+            status, _etag, body = _get(gateway.url + "/snapshot")
+            assert status == 200
+        document = json.loads(body)
+        assert document["state"] == "Ready"
+        assert document["pressure_Pa"] == pytest.approx(0.4 * 133.322, rel=1e-4)
+
+        status, _etag, body = _get(gateway.url + "/configuration")
+        assert json.loads(body)["plasma_time"] == "00:02:00"
+
+        status, _etag, body = _get(gateway.url + "/faults")
+        assert json.loads(body) == {"dynamic_fault": None, "latched_fault": None}
+
+    assert sum(dll.calls.values()) == calls
+
+
+def test_gateway_etag(ev, dll):
+    sampler = ev.start_sampler(0.02)
+    time.sleep(0.05)
+
+    with TelemetryGateway(sampler) as gateway:
+        status, etag, _body = _get(gateway.url + "/snapshot")
+        assert etag.startswith("W/")
+        time.sleep(0.05)  # new snapshots with the same values
+        status, _etag, body = _get(gateway.url + "/snapshot", etag)
+        assert status == 304
+        assert body == b""
+
+        dll.pressure_Torr = 0.5
+        time.sleep(0.05)
+        status, etag1, _body = _get(gateway.url + "/snapshot", etag)
+        assert status == 200
+        assert etag1 != etag
+
+        status, etag, _body = _get(gateway.url + "/faults")
+        dll.dynamic_fault = 3
+        time.sleep(0.05)
+        status, _etag, body = _get(gateway.url + "/faults", etag)
+        assert status == 200
+        assert json.loads(body)["dynamic_fault"].startswith("The unit")
+
+
+def test_gateway_errors(ev):
+    sampler = ev.start_sampler(10.0)
+    sampler.stop()
+    sampler._latest = None
+
+    with TelemetryGateway(sampler) as gateway:
+        assert _get(gateway.url + "/snapshot")[0] == 503
+        assert _get(gateway.url + "/configuration")[0] == 503
+        assert _get(gateway.url + "/unknown")[0] == 404
+
+
+def test_gateway_cached_configuration(ev):
+    sampler = ev.start_sampler(10.0)
+    ev.cycles = 3
+    assert ev.configuration(cached=True) == {"cycles": 3}
+
+    with TelemetryGateway(sampler) as gateway:
+        status, _etag, body = _get(gateway.url + "/configuration")
+        assert status == 200
+        assert json.loads(body)["cycles"] == 3
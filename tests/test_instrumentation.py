@@ -0,0 +1,79 @@
+""""""
+
+# Standard library modules.
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronException, _LockedDLL
+from pyevactron.instrumentation import BUCKET_BOUNDS
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def test_instrumentation(ev, dll):
+    instrumentation = ev.start_instrumentation()
+    ev.snapshot()
+    ev.snapshot()
+
+    dll.link_up = False
+    with pytest.raises(EvactronException):
+        ev.pressure_Pa
+    dll.link_up = dll.connected = True
+
+    statistics = instrumentation.as_dict()
+    assert statistics["evbGetStatusEx"]["calls"] == 2
+    assert statistics["evbGetStatusEx"]["errors"] == {}
+    assert sum(statistics["evbGetPressure"]["buckets"].values()) == 3
+    assert set(statistics["evbGetPressure"]["buckets"]) <= set(BUCKET_BOUNDS)
+    assert statistics["evbGetPressure"]["errors"] == {-1: 1}
+
+    cumulative, calls, total = instrumentation.histograms()["evbGetStatusEx"]
+    assert cumulative[-1] == calls == 2
+    assert total == pytest.approx(statistics["evbGetStatusEx"]["total_s"])
+
+    instrumentation.reset()
+    assert instrumentation.as_dict() == {}
+
+
+def test_instrumentation_latency_bucket(ev, dll):
+    instrumentation = ev.start_instrumentation()
+    dll.latency = 0.003
+    ev.pressure_Pa
+
+    statistics = instrumentation.as_dict()["evbGetPressure"]
+    (bound,) = statistics["buckets"]
+    assert bound / 2 <= statistics["max_s"] < bound
+    assert statistics["max_s"] >= 0.003
+
+
+def test_instrumentation_stopped(ev):
+    ev.start_scheduler()
+    ev.start_instrumentation()
+    with pytest.raises(EvactronException):
+        ev.start_instrumentation()
+    ev.stop_instrumentation()
+    ev.stop_scheduler()
+
+    # Nothing left in the read path
+    assert type(ev._dll) is _LockedDLL
+    assert ev.instrumentation is None
+
+
+def test_proxy_replaced_while_wrapping(dll):
+    other = SimulatedDLL()
+
+    class _ReplacedDLL(_LockedDLL):
+        def _wrap(self, name, func):
+            wrapper = super()._wrap(name, func)
+            self._set_dll(other)  # concurrent replacement
+            return wrapper
+
+    proxy = _ReplacedDLL(dll, threading.RLock())
+    proxy.evbGetDLLVersion
+
+    # The wrapper of the replaced library is not cached
+    assert "evbGetDLLVersion" not in vars(proxy)
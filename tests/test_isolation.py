@@ -0,0 +1,61 @@
+""""""
+
+# Standard library modules.
+import time
+import datetime
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.isolation import IsolatedEvactron, SnapshotSlot, SLOT_SIZE
+from pyevactron.interface import Snapshot, ReadyState, CableFault
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def _create_dll(comm_port):
+    return SimulatedDLL()
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_slot():
+    slot = SnapshotSlot(bytearray(SLOT_SIZE))
+    assert slot.read() is None
+
+    snapshot = Snapshot(
+        1.5,
+        ReadyState,
+        2,
+        datetime.time(0, 1, 30),
+        50.0,
+        1.0,
+        2.0,
+        3.0,
+        None,
+        CableFault,
+    )
+    slot.write(snapshot)
+    assert slot.read() == snapshot
+    assert slot.sequence() == 2
+
+
+def test_isolated():
+    with IsolatedEvactron(1, _create_dll, interval=0.01, restart_delay=0.0) as ev:
+        _wait_for(lambda: ev.snapshot() is not None)
+        assert ev.snapshot().pressure_Pa == pytest.approx(0.4 * 133.322, rel=1e-6)
+
+        ev._process.kill()
+        ev._process.join()
+        last = ev.snapshot()
+        assert last is not None
+
+        _wait_for(lambda: ev.restarts == 1)
+        _wait_for(lambda: ev.snapshot().timestamp > last.timestamp)
@@ -0,0 +1,83 @@
+""""""
+
+# Standard library modules.
+import time
+import urllib.request
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.metrics import MetricsExporter
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def dlls():
+    return [SimulatedDLL(), SimulatedDLL()]
+
+
+@pytest.fixture
+def exporter(dlls):
+    exporter = MetricsExporter()
+    with EvactronInterface(1, dlls[0]) as ev1, EvactronInterface(2, dlls[1]) as ev2:
+        for ev in (ev1, ev2):
+            ev.start_sampler(0.01)
+            exporter.add_unit(ev)
+        time.sleep(0.05)
+        yield exporter
+        exporter.close()
+
+
+def test_exporter_render(exporter, dlls):
+    dlls[0].state = 13
+    dlls[0].dynamic_fault = 3
+    time.sleep(0.05)
+    text = exporter.render()
+
+    assert "# TYPE evactron_pressure_pascals gauge" in text
+    assert 'evactron_state{port="1",state="Cleaning"} 13.0' in text
+    assert 'evactron_state{port="2",state="Ready"} 10.0' in text
+    assert 'evactron_runs_total{port="1"} 1.0' in text
+    assert (
+        'evactron_faults_total{port="1",fault="PlasmaFault",latched="false"} 1.0'
+        in text
+    )
+    assert "# TYPE evactron_dll_call_duration_seconds histogram" in text
+    assert (
+        'evactron_dll_call_duration_seconds_count{port="2",function="evbGetStatusEx"}'
+        in text
+    )
+    assert "# EOF" not in text
+
+
+def test_exporter_scrape_independent_of_device(exporter, dlls):
+    for unit in exporter._units.values():
+        unit.interface.sampler.stop()
+    calls = [sum(dll.calls.values()) for dll in dlls]
+
+    start = time.perf_counter()
+    for _ in range(10):
+        text = exporter.render()
+    assert time.perf_counter() - start < 0.1
+    assert [sum(dll.calls.values()) for dll in dlls] == calls
+    assert 'evactron_pressure_pascals{port="2"}' in text
+
+
+def test_exporter_serve(exporter):
+    host, port = exporter.serve(port=0)
+
+    request = urllib.request.Request(
+        "http://%s:%i/metrics" % (host, port),
+        headers={"Accept": "application/openmetrics-text"},
+    )
+    with urllib.request.urlopen(request, timeout=5.0) as response:
+        assert "openmetrics" in response.headers["Content-Type"]
+        text = response.read().decode("utf8")
+
+    assert "# TYPE evactron_runs counter" in text
+    assert 'evactron_runs_total{port="1"} 0.0' in text
+    assert text.endswith("# EOF\n")
@@ -0,0 +1,143 @@
+""""""
+
+# Standard library modules.
+import time
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import connect, EvactronException
+from pyevactron.pool import HandlePool
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def pool():
+    pool = HandlePool()
+    yield pool
+    pool.close()
+
+
+def test_connect(dll):
+    with connect(101, dll) as ev:
+        assert ev.is_connected()
+
+    assert not dll.connected
+
+
+def test_pool_nested(pool, dll):
+    with pool.lease(1, dll) as ev0:
+        with pool.lease(1) as ev1:
+            assert ev1 is ev0
+        assert ev0.is_connected()
+
+    assert dll.calls["evbConnect"] == 1
+    assert dll.calls["evbDisconnect"] == 1
+
+    statistics = pool.statistics()
+    assert statistics.acquisitions == 2
+    assert statistics.connects == statistics.disconnects == 1
+    assert statistics.ports == ()
+
+
+def test_pool_concurrent(pool, dll):
+    dll.latency = 0.01
+    interfaces = []
+
+    def lease():
+        with pool.lease(1, dll) as ev:
+            interfaces.append(ev)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=lease) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, interfaces))) == 1
+    assert dll.calls["evbConnect"] == 1
+    assert not dll.connected
+
+
+def test_pool_shared_interface(pool, dll):
+    with pool.lease(1, dll) as ev0:
+        ev0.start_sampler(0.05)
+        with pool.lease(1) as ev1:
+            assert pool.references(ev1) == 2
+            with pytest.raises(EvactronException):
+                ev1.disconnect()
+            with pytest.raises(EvactronException):
+                ev1.stop_sampler()
+        assert ev0.is_connected()
+        assert ev0.sampler is not None
+
+        # The sampler of a single lease can be stopped
+        ev0.stop_sampler()
+
+    assert not dll.connected
+    assert pool.references(ev0) == 0
+
+
+def test_pool_linger(pool, dll):
+    with pool.lease(1, dll, linger=0.1):
+        pass
+    assert dll.connected
+
+    start = time.perf_counter()
+    with pool.lease(1, dll, linger=0.1) as ev:
+        elapsed = time.perf_counter() - start
+        assert ev.is_connected()
+    assert elapsed < 0.01
+    assert dll.calls["evbConnect"] == 1
+
+    time.sleep(0.2)
+    assert not dll.connected
+    assert pool.statistics().disconnects == 1
+
+
+def test_pool_connect_failure(pool, dll):
+    dll.link_up = False
+    with pytest.raises(EvactronException):
+        pool.lease(1, dll).acquire()
+    assert pool.statistics().ports == ()
+
+    dll.link_up = True
+    with pool.lease(1, dll) as ev:
+        assert ev.is_connected()
+
+
+def test_pool_release_acquire_race(tmp_path, dll):
+    pool = HandlePool(lock_directory=str(tmp_path))
+    lease = pool.lease(1, dll)
+    lease.acquire()
+
+    # Delay the releasing thread before it disconnects
+    port_lock = pool._port_locks[1]
+
+    class SlowPortLock(object):
+        def __enter__(self):
+            if threading.current_thread() is thread:
+                time.sleep(0.3)
+            port_lock.acquire()
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            port_lock.release()
+
+    pool._port_locks[1] = SlowPortLock()
+    thread = threading.Thread(target=lease.release)
+    thread.start()
+    time.sleep(0.1)
+
+    try:
+        with pool.lease(1, dll, lock_timeout=1.0) as ev:
+            assert ev.is_connected()
+    finally:
+        thread.join()
+        pool.close()
+
+    assert not dll.connected
+    assert pool.statistics().ports == ()
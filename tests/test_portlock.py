@@ -0,0 +1,94 @@
+""""""
+
+# Standard library modules.
+import os
+import time
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronException
+from pyevactron.pool import HandlePool
+from pyevactron.portlock import PortLock, fcntl
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+pytestmark = pytest.mark.skipif(fcntl is None, reason="requires fcntl")
+
+
+def _release_later(lock, delay):
+    timer = threading.Timer(delay, lock.release)
+    timer.start()
+    return timer
+
+
+def test_port_lock_wait(tmp_path):
+    with PortLock(1, tmp_path) as lock0:
+        _release_later(lock0, 0.1)
+
+        with PortLock(1, tmp_path, poll_interval=0.01) as lock1:
+            assert lock1.locked
+            assert lock1.wait_s == pytest.approx(0.1, abs=0.08)
+
+
+def test_port_lock_timeout(tmp_path):
+    with PortLock(1, tmp_path):
+        with pytest.raises(EvactronException, match="pid %i" % os.getpid()):
+            PortLock(1, tmp_path).acquire(timeout=0.05)
+
+        with PortLock(2, tmp_path):  # other port
+            pass
+
+
+def test_port_lock_stale_takeover(tmp_path):
+    lock0 = PortLock(1, tmp_path)  # never renewed
+    lock0.acquire()
+    try:
+        lock1 = PortLock(1, tmp_path, stale_after=0.1, poll_interval=0.01)
+        lock1.acquire(timeout=1.0)
+        assert lock1.takeovers == 1
+        assert lock1.wait_s >= 0.1
+
+        # The renewed lease is not stale
+        time.sleep(0.2)
+        with pytest.raises(EvactronException):
+            PortLock(1, tmp_path, stale_after=0.1).acquire(timeout=0.2)
+        lock1.release()
+    finally:
+        lock0.release()
+
+
+def test_port_lock_released_lease_not_stale(tmp_path):
+    with PortLock(1, tmp_path) as lock0:
+        pass
+    with open(lock0.path) as fp:
+        assert fp.read() == ""
+
+    # A lease locked but not written yet is being acquired, not stale
+    with open(lock0.path, "a+") as file:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        lock1 = PortLock(1, tmp_path, stale_after=0.0, poll_interval=0.01)
+        with pytest.raises(EvactronException, match="another process"):
+            lock1.acquire(timeout=0.1)
+        assert lock1.takeovers == 0
+
+
+def test_pool_port_lock(tmp_path):
+    dll = SimulatedDLL()
+    pool0 = HandlePool(lock_directory=tmp_path)
+    pool1 = HandlePool(lock_directory=tmp_path)
+
+    lease = pool0.lease(1, dll)
+    lease.acquire()
+    timer = threading.Timer(0.1, lease.release)
+    timer.start()
+
+    with pool1.lease(1, dll, lock_timeout=1.0) as ev:
+        assert ev.is_connected()
+
+    statistics = pool1.statistics()
+    assert statistics.lock_waits == 1
+    assert statistics.lock_wait_s == pytest.approx(0.1, abs=0.08)
+    assert pool0.statistics().lock_wait_s < 0.05
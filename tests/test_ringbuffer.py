@@ -0,0 +1,99 @@
+""""""
+
+# Standard library modules.
+import datetime
+import time
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+from pyevactron.interface import (
+    EvactronInterface,
+    Snapshot,
+    ReadyState,
+    CleaningState,
+    ConfigurationState,
+    InvalidState,
+    PlasmaFault,
+)
+from pyevactron.ringbuffer import TelemetryBuffer, UNKNOWN, NO_FAULT
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def _snapshot(timestamp, state=CleaningState, pressure=40.0, dynamic=None):
+    return Snapshot(
+        timestamp,
+        state,
+        1,
+        datetime.time(0, 1, 0),
+        pressure,
+        20.0,
+        1.0,
+        3.5,
+        dynamic,
+        None,
+    )
+
+
+@pytest.fixture
+def buffer():
+    buffer = TelemetryBuffer(8)
+    for timestamp in range(10):
+        buffer.append(_snapshot(float(timestamp), pressure=timestamp * 10.0))
+    return buffer
+
+
+def test_buffer_wraps(buffer):
+    assert len(buffer) == 8
+    columns = buffer.latest()
+    assert columns.timestamp.tolist() == list(range(2, 10))
+    assert columns.pressure_Pa.dtype == np.float32
+    assert columns.pressure_Pa[-1] == pytest.approx(90.0)
+
+
+def test_buffer_latest_view(buffer):
+    columns = buffer.latest(2)
+    assert columns.timestamp.tolist() == [8.0, 9.0]
+    assert np.shares_memory(columns.timestamp, buffer._columns.timestamp)
+
+    # Wrapping around the end of the ring
+    columns = buffer.latest(3)
+    assert columns.timestamp.tolist() == [7.0, 8.0, 9.0]
+
+
+def test_buffer_between(buffer):
+    assert buffer.between(3.5, 8.0).timestamp.tolist() == [4.0, 5.0, 6.0, 7.0]
+    assert buffer.between(end=3.0).timestamp.tolist() == [2.0]
+    assert buffer.between(9.5).timestamp.tolist() == []
+    assert len(buffer.between().timestamp) == 8
+
+
+def test_buffer_encoding():
+    buffer = TelemetryBuffer(4)
+    buffer.append(_snapshot(0.0, ReadyState, dynamic=PlasmaFault))
+    buffer.append(_snapshot(1.0, ConfigurationState, pressure=None))
+    buffer.append(_snapshot(2.0, InvalidState))
+    buffer.append(_snapshot(3.0, None))
+
+    columns = buffer.latest()
+    assert columns.state.tolist() == [10, 32, -1, UNKNOWN]
+    assert columns.dynamic_fault.tolist() == [3, UNKNOWN, NO_FAULT, NO_FAULT]
+    assert columns.latched_fault.tolist() == [NO_FAULT, UNKNOWN, NO_FAULT, NO_FAULT]
+    assert np.isnan(columns.pressure_Pa[1])
+    assert buffer.nbytes == 4 * 31
+
+
+def test_sampler_history():
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        sampler = ev.start_sampler(0.01, history=100)
+        time.sleep(0.1)
+        ev.stop_sampler()
+
+    history = sampler.history
+    assert history.capacity == 100
+    assert len(history) == sampler.statistics().samples
+    assert (np.diff(history.latest().timestamp) > 0).all()
@@ -0,0 +1,44 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.rollup import Downsampler
+
+# Globals and constants variables.
+
+
+def test_downsampler():
+    aggregates = []
+    downsampler = Downsampler(aggregates.append, windows=(10.0, 1.0))
+    assert downsampler.windows == (1.0, 10.0)
+
+    for index, power in enumerate([50.0, 0.0, 50.0, None, 50.0]):
+        downsampler.add(
+            100.0 + index * 0.5, [40.0, power, None, 3.5], 13, fault=index == 1
+        )
+
+    # Windows [100, 101) and [101, 102) are complete at 1 s
+    assert [(a.window, a.start, a.count) for a in aggregates] == [
+        (1.0, 100.0, 2),
+        (1.0, 101.0, 2),
+    ]
+    assert aggregates[0].forward_power_W_min == 0.0
+    assert aggregates[0].forward_power_W_max == 50.0
+    assert aggregates[0].faults == 1
+    assert aggregates[1].forward_power_W_last == 50.0
+    assert aggregates[1].forward_power_W_mean == 50.0
+    assert aggregates[1].forward_power_W_count == 1
+    assert aggregates[1].reverse_power_W_mean is None
+    assert aggregates[1].reverse_power_W_count == 0
+
+    downsampler.flush()
+    (tier,) = [a for a in aggregates if a.window == 10.0]
+    assert tier.start == 100.0
+    assert tier.count == 5
+    assert tier.forward_power_W_mean == pytest.approx(37.5)
+    assert tier.forward_power_W_count == 4
+    assert tier.state == 13
@@ -0,0 +1,80 @@
+""""""
+
+# Standard library modules.
+import asyncio
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import (
+    EvactronException,
+    EvactronFault,
+    ReadyState,
+    CleaningState,
+    PlasmaFault,
+)
+from pyevactron.aio import AsyncEvactronInterface
+from pyevactron.run import RunSummary
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def dll():
+    # A run of one cycle lasts ~0.35 s
+    return SimulatedDLL(time_scale=500.0)
+
+
+def test_start_now(ev, dll):
+    run = ev.start_now()
+    assert not run.done()
+
+    summary = run.result(timeout=5.0)
+    assert isinstance(summary, RunSummary)
+    assert summary.cycles == 1
+    assert summary.faults == ()
+    assert summary.duration_s == pytest.approx(0.354, abs=0.3)
+    assert summary.phases[CleaningState] > 0.1
+    assert summary.last_clean == dll.last_clean
+    assert ev.snapshot(False).state is ReadyState
+
+
+def test_start_now_reads_outside_monitor_lock(ev, dll):
+    owned = []
+    read = dll.evbGetLastCleanTime
+
+    def evbGetLastCleanTime(*args):
+        owned.append(ev._monitor._condition._is_owned())
+        return read(*args)
+
+    dll.evbGetLastCleanTime = evbGetLastCleanTime
+    ev.start_now().result(timeout=5.0)
+    assert owned == [False]
+
+
+def test_start_now_fault(ev, dll):
+    run = ev.start_now()
+    ev.wait_for_state(CleaningState, timeout=2.0)
+    dll.dynamic_fault = 3
+
+    with pytest.raises(EvactronFault) as excinfo:
+        run.result(timeout=5.0)
+    assert excinfo.value is PlasmaFault
+
+
+def test_start_now_ignored(ev, dll):
+    dll.enabled = False
+    with pytest.raises(EvactronException):
+        ev.start_now()
+
+
+def test_start_now_async(dll):
+    async def main():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            run = await ev.start_now()
+            return await asyncio.wait_for(run, 5.0)
+
+    summary = asyncio.run(main())
+    assert summary.cycles == 1
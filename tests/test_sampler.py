@@ -0,0 +1,140 @@
+""""""
+
+# Standard library modules.
+import time
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import (
+    EvactronException,
+    ReadyState,
+    CleaningState,
+    ConfigurationState,
+)
+from pyevactron.sampler import adaptive_intervals
+
+# Globals and constants variables.
+
+
+def test_sampler(ev):
+    received = []
+    start = time.monotonic()
+    sampler = ev.start_sampler(0.01, [received.append])
+    time.sleep(0.3)
+    ev.stop_sampler()
+    elapsed = time.monotonic() - start
+
+    # Only bounds that hold on a loaded machine: the deadlines are never
+    # sampled faster than the interval, even after a delay
+    statistics = sampler.statistics()
+    assert statistics.samples == len(received)
+    assert 2 <= statistics.samples <= elapsed / 0.01 + 1
+    assert 0 < statistics.rate_Hz < 110.0
+    assert statistics.jitter_p50_s < 0.01
+    assert sampler.latest is received[-1]
+
+
+def test_sampler_skips_missed_deadlines(ev, dll):
+    dll.latency = 0.005  # a snapshot takes ~0.045 s
+    sampler = ev.start_sampler(0.02)
+    time.sleep(0.3)
+    ev.stop_sampler()
+
+    statistics = sampler.statistics()
+    assert statistics.overruns == statistics.samples
+    assert statistics.skipped >= statistics.samples
+    assert statistics.jitter_p50_s < 0.02
+
+
+def test_sampler_no_catch_up_burst(ev):
+    received = []
+    stalls = []
+
+    def sink(snapshot):
+        received.append(snapshot.timestamp)
+        if len(received) == 3:
+            time.sleep(0.3)  # misses ~6 deadlines
+            stalls.append(time.time())
+
+    sampler = ev.start_sampler(0.05, [sink])
+    time.sleep(0.6)
+    ev.stop_sampler()
+
+    statistics = sampler.statistics()
+    assert statistics.overruns >= 1
+    assert statistics.skipped >= 5
+
+    # The missed deadlines are skipped, not sampled back to back: at most
+    # the deadlines of the 0.1 s following the stall are sampled
+    (end,) = stalls
+    assert len([t for t in received if end <= t < end + 0.1]) <= 3
+    assert received[3] - received[2] >= 0.3
+
+
+def test_sampler_shared(ev):
+    sinks = [[], []]
+    sampler = ev.start_sampler(0.01, [sinks[0].append])
+    sampler.add_sink(sinks[1].append)
+    time.sleep(0.05)
+
+    with pytest.raises(EvactronException):
+        ev.start_sampler(0.01)
+
+    ev.disconnect()
+    assert ev.sampler is None
+    assert sinks[1] and sinks[0][-len(sinks[1]) :] == sinks[1]
+
+
+def test_sampler_adaptive(ev, dll):
+    received = []
+    intervals = adaptive_intervals(0.01, 10.0)
+    ev.start_sampler(1.0, [received.append], intervals=intervals, status_interval=0.02)
+    time.sleep(0.1)
+    assert len(received) == 1
+    assert received[0].state is ReadyState
+
+    dll.state = 13
+    time.sleep(0.1)
+    ev.stop_sampler()
+
+    assert received[1].state is CleaningState
+    assert received[1].timestamp - received[0].timestamp < 0.15
+    assert len(received) > 5
+
+
+def test_sampler_suspended(ev, dll):
+    dll.state = 32
+    received = []
+    ev.start_sampler(0.01, [received.append])
+    time.sleep(0.05)
+    ev.stop_sampler()
+
+    assert received[-1].state is ConfigurationState
+    assert received[-1].pressure_Pa is None
+    assert dll.calls["evbGetPressure"] == 0
+
+
+def test_concurrent_setters_while_sampling(ev, dll):
+    ev.start_sampler(0.01)
+    errors = []
+
+    def purge():
+        time.sleep(0.05)  # while the unit is disabled by the other setter
+        try:
+            ev.purge = False
+        except EvactronException as ex:
+            errors.append(ex)
+
+    thread = threading.Thread(target=purge)
+    thread.start()
+    ev.cycles = 3
+    thread.join()
+    ev.stop_sampler()
+
+    assert errors == []
+    assert ev.cycles == 3
+    assert ev.purge is False
+    assert dll.enabled
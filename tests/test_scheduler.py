@@ -0,0 +1,83 @@
+""""""
+
+# Standard library modules.
+import time
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, EvactronException
+from pyevactron.scheduler import (
+    CommandScheduler,
+    CONTROL,
+    TELEMETRY,
+    INTERACTIVE,
+    priority,
+)
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def test_priority_order():
+    scheduler = CommandScheduler()
+    scheduler.start()
+
+    order = []
+    release = threading.Event()
+    scheduler.submit(release.wait)  # blocks the worker
+
+    futures = [scheduler.submit(order.append, i, priority=TELEMETRY) for i in range(10)]
+    futures.append(scheduler.submit(order.append, "control", priority=CONTROL))
+    release.set()
+    for future in futures:
+        future.result()
+    scheduler.stop()
+
+    assert order[0] == "control"
+    statistics = scheduler.statistics()
+    assert statistics["telemetry"].completed == 10
+    assert statistics["control"].completed == 1
+
+
+def test_bounded_queue():
+    scheduler = CommandScheduler(maxsize={TELEMETRY: 1})
+    scheduler.start()
+
+    release = threading.Event()
+    scheduler.submit(release.wait, priority=INTERACTIVE)
+    scheduler.submit(time.sleep, 0, priority=TELEMETRY)
+    with pytest.raises(EvactronException):
+        scheduler.submit(time.sleep, 0, priority=TELEMETRY)
+    release.set()
+    scheduler.stop()
+
+    assert scheduler.statistics()["telemetry"].rejected == 1
+
+
+def test_control_preempts_telemetry():
+    dll = SimulatedDLL(latency=0.01)
+    with EvactronInterface(1, dll) as ev:
+        scheduler = ev.start_scheduler()
+
+        def poll():
+            with priority(TELEMETRY):
+                for _ in range(20):
+                    scheduler.submit(getattr, ev, "pressure_Pa", priority=TELEMETRY)
+
+        threads = [threading.Thread(target=poll) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        start = time.perf_counter()
+        ev.disable()
+        elapsed = time.perf_counter() - start
+
+        assert not dll.enabled
+        assert elapsed < 0.05  # far less than the 60 queued reads
+
+    assert ev.scheduler is None
@@ -0,0 +1,216 @@
+""""""
+
+# Standard library modules.
+import math
+import time
+import sqlite3
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface
+from pyevactron.sqlitesink import SQLiteSink, query_history
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def filepath(tmp_path):
+    return str(tmp_path.joinpath("history.sqlite"))
+
+
+@pytest.fixture
+def ev(dll):
+    with EvactronInterface(1, dll) as ev:
+        ev.start_sampler(0.01, configuration_interval=0.05)
+        yield ev
+
+
+def _unit(sink, ev):
+    """
+    Adds the unit of *ev* to *sink* once the first snapshot of its sampler
+    was taken, and returns the sink of the unit, to be fed directly.
+    """
+    sampler = ev.start_sampler(60.0)
+    while not sampler.statistics().samples:
+        time.sleep(0.001)
+    sink.add_unit(ev)
+    return sink._units[ev._comm_port]
+
+
+def _select(filepath, sql):
+    connection = sqlite3.connect(filepath)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+def test_sink(ev, dll, filepath):
+    sink = SQLiteSink(filepath, max_age=0.01)
+    sink.add_unit(ev)
+    time.sleep(0.1)
+
+    dll.state = 13
+    dll.dynamic_fault = 3
+    ev.cycles = 4
+    time.sleep(0.2)
+
+    sink.remove_unit(ev)
+    assert sink.flush(5.0)
+    sink.close()
+
+    statistics = sink.statistics()
+    assert statistics.dropped == 0
+    assert statistics.pending == 0
+    assert statistics.written > statistics.batches > 0
+
+    assert _select(filepath, "PRAGMA journal_mode") == [("wal",)]
+    assert _select(filepath, "SELECT DISTINCT port FROM snapshots") == [(1,)]
+    assert (10, 13) in _select(
+        filepath, "SELECT previous_state, state FROM transitions"
+    )
+    assert (3, 0, 1) in _select(filepath, "SELECT fault, latched, raised FROM faults")
+    assert ("cycles", "4", 0) in _select(
+        filepath, "SELECT name, value, external FROM configuration"
+    )
+
+    plan = _select(
+        filepath, "EXPLAIN QUERY PLAN SELECT * FROM snapshots WHERE port=1 AND time>0"
+    )
+    assert "snapshots_port_time" in plan[0][-1]
+
+
+def test_sink_never_blocks(filepath):
+    sink = SQLiteSink(filepath, batch_size=10**6, max_age=60.0, maxsize=10)
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        unit = _unit(sink, ev)
+
+        snapshot = ev.snapshot()
+        start = time.perf_counter()
+        for _ in range(100):
+            unit(snapshot)
+        assert time.perf_counter() - start < 0.1
+
+        sink.remove_unit(ev)
+        assert ev.sampler.running
+
+    statistics = sink.statistics()
+    assert statistics.dropped >= 90
+    assert sink.flush(5.0)
+    sink.close()
+    assert _select(filepath, "SELECT COUNT(*) FROM snapshots")[0][0] == 10
+
+
+def test_sink_retention(filepath):
+    sink = SQLiteSink(filepath, max_age=0.01)
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        unit = _unit(sink, ev)
+        snapshot = ev.snapshot()
+        unit(snapshot._replace(timestamp=time.time() - 7200))
+        unit(snapshot)
+        sink.remove_unit(ev)
+    sink.flush(5.0)
+    sink.close()
+
+    sink = SQLiteSink(filepath, retention=3600)
+    assert sink.flush(5.0)
+    sink.close()
+    assert sink.statistics().purged == 1
+    assert _select(filepath, "SELECT COUNT(*) FROM snapshots")[0][0] == 1
+
+
+def test_sink_rollups_compaction(filepath):
+    sink = SQLiteSink(filepath, max_age=0.01, rollups=(1.0, 60.0))
+    start = math.floor(time.time() / 60.0) * 60.0 - 7200.0
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        unit = _unit(sink, ev)
+        snapshot = ev.snapshot()
+        for index in range(1200):
+            pressure = 100.0 if index == 601 else 40.0
+            unit(snapshot._replace(timestamp=start + index * 0.1, pressure_Pa=pressure))
+        sink.remove_unit(ev)
+    sink.flush(5.0)
+    sink.close()
+
+    # The streaming rollups are written, raw snapshots remain
+    history = query_history(filepath, 1, start, start + 120.0, max_points=100)
+    assert history.window == 1.0
+    assert len(history.rows) == 120
+    row = dict(zip(history.columns, history.rows[60]))
+    assert row["count"] == 10
+    assert row["pressure_Pa_max"] == 100.0
+    assert row["pressure_Pa_min"] == 40.0
+    assert row["pressure_Pa_mean"] == pytest.approx(46.0)
+
+    history = query_history(filepath, 1, start, start + 120.0, max_points=1)
+    assert history.window == 60.0
+    assert [row[3] for row in history.rows] == [600, 600]
+
+    history = query_history(filepath, 1, start, start + 1.0, max_points=10)
+    assert history.window == 0.0
+    assert len(history.rows) == 10
+
+    # Compaction: old snapshots without rollups are aggregated and deleted
+    connection = sqlite3.connect(filepath)
+    with connection:
+        connection.execute("DELETE FROM rollups WHERE window = 60.0")
+    connection.close()
+
+    sink = SQLiteSink(filepath, rollups=(1.0, 60.0), raw_retention=3600.0)
+    sink.close()
+    assert sink.statistics().compacted == 1200
+
+    history = query_history(filepath, 1, start, start + 1.0, max_points=10)
+    assert history.window == 1.0
+    history = query_history(filepath, 1, start, start + 120.0, max_points=1)
+    assert history.window == 60.0
+    assert len(history.rows) == 2
+    assert _select(filepath, "SELECT COUNT(*) FROM snapshots")[0][0] == 0
+
+
+def test_sink_rollups_restart(filepath):
+    start = math.floor(time.time() / 3600.0) * 3600.0 - 7200.0
+
+    def record(pressure, offset, read=10):
+        sink = SQLiteSink(filepath, max_age=0.01, rollups=(3600.0,))
+        with EvactronInterface(1, SimulatedDLL()) as ev:
+            unit = _unit(sink, ev)
+            snapshot = ev.snapshot()
+            for index in range(10):
+                timestamp = start + offset + index
+                value = pressure if index < read else None
+                unit(snapshot._replace(timestamp=timestamp, pressure_Pa=value))
+            sink.remove_unit(ev)
+        sink.flush(5.0)
+        sink.close()
+
+    def hour():
+        history = query_history(filepath, 1, start, start + 3600.0, max_points=1)
+        assert history.window == 3600.0
+        (row,) = history.rows
+        return dict(zip(history.columns, row))
+
+    # The incomplete window written on close is merged after a restart
+    # and its means are weighted by the number of values read
+    record(5.0, 0.0, read=2)
+    record(1.0, 60.0)
+    row = hour()
+    assert row["count"] == 20
+    assert row["pressure_Pa_count"] == 12
+    assert row["pressure_Pa_min"] == 1.0
+    assert row["pressure_Pa_max"] == 5.0
+    assert row["pressure_Pa_mean"] == pytest.approx(20.0 / 12)
+    assert row["pressure_Pa_last"] == 1.0
+
+    # Compaction replaces it with the aggregate of the raw snapshots
+    sink = SQLiteSink(filepath, rollups=(3600.0,), raw_retention=3600.0)
+    sink.close()
+    assert sink.statistics().compacted == 20
+    row = hour()
+    assert row["count"] == 20
+    assert row["pressure_Pa_count"] == 12
+    assert row["pressure_Pa_max"] == 5.0
+    assert row["pressure_Pa_mean"] == pytest.approx(20.0 / 12)
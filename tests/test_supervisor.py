@@ -0,0 +1,70 @@
+""""""
+
+# Standard library modules.
+import time
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, EvactronException
+
+# Globals and constants variables.
+
+
+def _wait(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_supervisor_heartbeat_when_idle(ev, dll):
+    supervisor = ev.start_supervisor(heartbeat_interval=0.05)
+    time.sleep(0.2)
+    assert dll.calls["evbIsConnected"] >= 2
+    assert supervisor.statistics().heartbeats >= 2
+
+
+def test_supervisor_no_heartbeat_when_busy(ev, dll):
+    ev.start_supervisor(heartbeat_interval=0.05)
+    ev.start_sampler(0.01)
+    time.sleep(0.2)
+    assert dll.calls["evbIsConnected"] == 0
+
+
+def test_supervisor_reconnect(ev, dll):
+    ev.cycles = 3
+    supervisor = ev.start_supervisor(
+        heartbeat_interval=0.05, backoff_initial=0.01, backoff_max=0.04
+    )
+
+    dll.link_up = False
+    dll.cycles = 1  # device reset
+    with pytest.raises(EvactronException):
+        ev.pressure_Pa
+    _wait(lambda: not supervisor.connected)
+    time.sleep(0.2)
+    dll.link_up = True
+    _wait(lambda: supervisor.connected)
+
+    assert ev.pressure_Pa > 0.0
+    assert dll.cycles == 3
+
+    statistics = supervisor.statistics()
+    assert statistics.connected
+    assert statistics.outages == statistics.reconnects == 1
+    assert statistics.failed_attempts >= 3
+    assert statistics.downtime_s >= 0.2
+    assert statistics.time_to_recover_last_s == statistics.downtime_s
+
+
+def test_supervisor_stopped_on_disconnect(dll):
+    with EvactronInterface(1, dll) as ev:
+        ev.start_scheduler()
+        supervisor = ev.start_supervisor(heartbeat_interval=0.05)
+        ev.stop_scheduler()
+        ev.pressure_Pa
+
+    assert ev.supervisor is None
+    assert not supervisor._thread
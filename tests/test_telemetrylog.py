@@ -0,0 +1,112 @@
+""""""
+
+# Standard library modules.
+import os
+import datetime
+
+# Third party modules.
+import numpy as np
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, Snapshot, CleaningState
+from pyevactron.telemetrylog import (
+    TelemetryLogWriter,
+    TelemetryLogReader,
+    device_identity,
+)
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def _snapshot(timestamp):
+    return Snapshot(
+        timestamp,
+        CleaningState,
+        1,
+        datetime.time(0, 1, 0),
+        timestamp * 10.0,
+        20.0,
+        1.0,
+        3.5,
+        None,
+        None,
+    )
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path.joinpath("log"))
+
+
+def test_log_write_read(directory):
+    with TelemetryLogWriter(directory, {"comm_port": 1}, chunk=4) as writer:
+        for timestamp in range(10):
+            writer(_snapshot(float(timestamp)))
+
+    reader = TelemetryLogReader(directory)
+    assert len(reader) == 10
+    assert reader.device == {"comm_port": 1}
+    assert reader.units["pressure_Pa"] == "Pa"
+
+    columns = reader.columns()
+    assert columns.timestamp.tolist() == list(range(10))
+    assert columns.state.tolist() == [13] * 10
+    assert columns.pressure_Pa.dtype == np.float32
+    assert isinstance(columns.pressure_Pa, np.memmap)
+
+    window = reader.between(2.5, 5.0)
+    assert window.pressure_Pa.tolist() == [30.0, 40.0]
+    assert np.shares_memory(window.pressure_Pa, columns.pressure_Pa)
+
+
+def test_log_commit_visibility(directory):
+    writer = TelemetryLogWriter(directory, commit_every=1000)
+    reader = TelemetryLogReader(directory)
+    assert len(reader) == 0
+    assert len(reader.columns().timestamp) == 0
+
+    writer(_snapshot(0.0))
+    writer(_snapshot(1.0))
+    assert reader.refresh() == 0
+
+    writer.commit()
+    assert reader.refresh() == 2
+    assert reader.columns().timestamp.tolist() == [0.0, 1.0]
+    writer.close()
+
+
+def test_log_crash(directory):
+    writer = TelemetryLogWriter(directory, commit_every=1000)
+    for timestamp in range(3):
+        writer(_snapshot(float(timestamp)))
+    writer.commit()
+    writer(_snapshot(3.0))
+    writer.commit()
+
+    # Torn write of the latest commit
+    with open(os.path.join(directory, "header"), "r+b") as fp:
+        fp.seek(8)
+        fp.write(b"\xff" * 4)
+    del writer
+
+    assert len(TelemetryLogReader(directory)) == 3
+
+    with TelemetryLogWriter(directory) as writer:
+        writer(_snapshot(10.0))
+
+    reader = TelemetryLogReader(directory)
+    assert reader.columns().timestamp.tolist() == [0.0, 1.0, 2.0, 10.0]
+
+
+def test_log_sampler_sink(directory):
+    with EvactronInterface(1, SimulatedDLL()) as ev:
+        writer = TelemetryLogWriter(directory, device_identity(ev))
+        ev.start_sampler(0.01, [writer])
+        ev.stop_sampler()
+        writer.close()
+
+    reader = TelemetryLogReader(directory)
+    assert reader.device["comm_port"] == 1
+    assert len(reader) >= 1
@@ -0,0 +1,92 @@
+""""""
+
+# Standard library modules.
+import io
+import json
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronInterface, EvactronException, _LockedDLL
+from pyevactron.tracing import Tracer
+from pyevactron.simulator import SimulatedDLL
+
+# Globals and constants variables.
+
+
+def _spans(tracer):
+    return [event for event in tracer.events() if event["ph"] == "X"]
+
+
+def test_tracing_calls(ev):
+    tracer = ev.start_tracing()
+    ev.pressure_Pa
+
+    (span,) = _spans(tracer)
+    assert span["name"] == "evbGetPressure"
+    assert span["pid"] == 1
+    assert span["tid"] == threading.get_ident()
+    assert span["args"]["method"] == "pressure_Pa"
+    assert "test_tracing_calls" in span["args"]["caller"]
+
+    names = [(e["name"], e["args"]["name"]) for e in tracer.events() if e["ph"] == "M"]
+    assert ("process_name", "Evactron (port 1)") in names
+    assert ("thread_name", threading.current_thread().name) in names
+
+
+def test_tracing_setter_phases(ev):
+    tracer = ev.start_tracing()
+    ev.cycles = 3
+
+    spans = dict((span["name"], span) for span in _spans(tracer))
+    transaction = spans["set cycles"]
+    for name in ("disable", "sleep", "write", "enable"):
+        span = spans[name]
+        assert transaction["ts"] <= span["ts"]
+        assert span["ts"] + span["dur"] <= transaction["ts"] + transaction["dur"]
+    assert spans["sleep"]["dur"] >= 0.1e6
+    assert spans["evbSetCycleCount"]["args"]["method"] == "_configure"
+
+
+def test_tracing_lock_wait(ev):
+    tracer = ev.start_tracing()
+
+    with ev._lock:
+        thread = threading.Thread(target=lambda: ev.pressure_Pa, name="reader")
+        thread.start()
+        thread.join(0.05)
+    thread.join()
+
+    (wait,) = [span for span in _spans(tracer) if span["cat"] == "lock"]
+    assert wait["dur"] >= 0.04e6
+    assert wait["tid"] == thread.ident
+
+
+def test_tracing_shared_tracer_dump(dll):
+    tracer = Tracer()
+    with EvactronInterface(1, dll) as ev1, EvactronInterface(2, SimulatedDLL()) as ev2:
+        ev1.start_tracing(tracer)
+        ev2.start_tracing(tracer)
+        ev1.pressure_Pa
+        ev2.pressure_Pa
+
+    fp = io.StringIO()
+    tracer.dump(fp)
+    trace = json.loads(fp.getvalue())
+    pids = [e["pid"] for e in trace["traceEvents"] if e["name"] == "evbGetPressure"]
+    assert sorted(pids) == [1, 2]
+
+
+def test_tracing_stopped(ev):
+    tracer = ev.start_tracing()
+    with pytest.raises(EvactronException):
+        ev.start_tracing()
+    ev.stop_tracing()
+    ev.pressure_Pa
+
+    assert _spans(tracer) == []
+    assert type(ev._dll) is _LockedDLL
+    assert ev._dll._lock is ev._lock
+    assert ev.tracer is None
@@ -0,0 +1,114 @@
+""""""
+
+# Standard library modules.
+import time
+import asyncio
+import threading
+
+# Third party modules.
+import pytest
+
+# Local modules.
+from pyevactron.interface import EvactronException, CleaningState, ReadyState
+from pyevactron.aio import AsyncEvactronInterface
+
+# Globals and constants variables.
+
+
+def _later(delay, func):
+    timer = threading.Timer(delay, func)
+    timer.start()
+    return timer
+
+
+def test_wait_for_state_polling(ev, dll):
+    _later(0.1, lambda: setattr(dll, "state", 13))
+    snapshot = ev.wait_for_state(CleaningState, timeout=2.0)
+    assert snapshot.state is CleaningState
+
+
+def test_wait_for_state_timeout(ev):
+    with pytest.raises(TimeoutError):
+        ev.wait_for_state([CleaningState], timeout=0.1)
+
+
+def test_wait_until_idle_sampler(ev, dll):
+    dll.state = 13
+    ev.start_sampler(0.01)
+    _later(0.05, lambda: setattr(dll, "state", 10))
+    assert ev.wait_until_idle(timeout=2.0).state is ReadyState
+    ev.stop_sampler()
+
+
+def test_wait_for_fault_clear(ev, dll):
+    dll.latched_fault = 7
+    _later(0.1, lambda: setattr(dll, "latched_fault", 0))
+    snapshot = ev.wait_for_fault_clear(timeout=2.0)
+    assert snapshot.latched_fault is None
+
+
+def test_concurrent_waiters_share_polling(ev, dll):
+    results = []
+
+    def wait():
+        results.append(ev.wait_for_state(CleaningState, timeout=5.0))
+
+    threads = [threading.Thread(target=wait) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.3)
+    dll.state = 13
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 20
+    assert dll.calls["evbGetStatusEx"] < 20
+
+
+def test_async_wait(dll):
+    async def run():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            waiters = [ev.wait_for_state(CleaningState, 2.0) for _ in range(5)]
+            asyncio.get_running_loop().call_later(0.1, setattr, dll, "state", 13)
+            return await asyncio.gather(*waiters)
+
+    snapshots = asyncio.run(run())
+    assert all(s.state is CleaningState for s in snapshots)
+
+
+def test_disconnect_fails_waiters(ev):
+    errors = []
+
+    def wait():
+        try:
+            ev.wait_for_state(CleaningState)
+        except EvactronException as ex:
+            errors.append(ex)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.1)
+    monitor = ev._monitor
+    assert monitor._thread is not None
+
+    ev.disconnect()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+    # The polling thread is woken up and exits
+    deadline = time.monotonic() + 2.0
+    while monitor._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert monitor._thread is None
+
+
+def test_async_disconnect_fails_waiters(dll):
+    async def run():
+        async with AsyncEvactronInterface(1, dll) as ev:
+            waiter = asyncio.ensure_future(ev.wait_for_state(CleaningState))
+            await asyncio.sleep(0.1)
+        return await waiter
+
+    with pytest.raises(EvactronException):
+        asyncio.run(run())